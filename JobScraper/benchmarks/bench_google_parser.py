@@ -0,0 +1,120 @@
+"""
+Google result parser benchmark — single-pass GoogleResultParser vs. the
+original two-regex parse_google_results, on saved fixture pages.
+
+    python JobScraper/benchmarks/bench_google_parser.py [--repeat 200]
+    python JobScraper/benchmarks/bench_google_parser.py --write-fixtures
+
+Each fixture has a .expected.json with the (url, title) pairs a correct
+parser returns; the run fails if the new parser disagrees with it.
+"""
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from corpus import google_results_page
+from manual_search import GOOGLE_RESULT_LIMIT, parse_google_results
+
+FIXTURE_DIR = os.path.join(HERE, "fixtures")
+SITE        = "careers.fedex.icims.com"
+
+# Saved to FIXTURE_DIR by --write-fixtures; "large" is only built in memory
+FIXTURES = {
+    "google_modern": {"n_results": 10, "padding_kb": 48},
+    "google_legacy": {"n_results": 10, "padding_kb": 16, "legacy": True},
+}
+LARGE = {"n_results": 100, "padding_kb": 600}
+
+
+# The pre-HTMLParser implementation, kept here as the comparison baseline
+def baseline(page, site, company_name):
+    url_pattern   = re.compile(r'href="(https?://' + re.escape(site.replace('www.', '')) + r'[^"]*)"')
+    title_pattern = re.compile(r'<h3[^>]*>([^<]+)</h3>')
+    urls   = url_pattern.findall(page)
+    titles = title_pattern.findall(page)
+    results, seen = [], set()
+    for i, url in enumerate(urls[:5]):
+        if url in seen:
+            continue
+        seen.add(url)
+        title = titles[i] if i < len(titles) else "Job Opening"
+        title = title.replace('&#39;', "'").replace('&amp;', '&').replace('&quot;', '"')
+        results.append({"title": title, "apply_url": url})
+    return results
+
+
+def expected_pairs(expected):
+    return [[url, " ".join(html.unescape(title).split())] for url, title in expected]
+
+
+def write_fixtures():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for name, options in FIXTURES.items():
+        page, expected = google_results_page(SITE, **options)
+        with open(os.path.join(FIXTURE_DIR, f"{name}.html"), "w") as f:
+            f.write(page)
+        with open(os.path.join(FIXTURE_DIR, f"{name}.expected.json"), "w") as f:
+            json.dump(expected_pairs(expected)[:GOOGLE_RESULT_LIMIT], f, indent=2)
+        print(f"wrote {name}.html ({len(page) / 1024:.0f} KB)")
+
+
+def load_fixtures():
+    pages = {}
+    for name in FIXTURES:
+        with open(os.path.join(FIXTURE_DIR, f"{name}.html")) as f:
+            page = f.read()
+        with open(os.path.join(FIXTURE_DIR, f"{name}.expected.json")) as f:
+            pages[name] = (page, json.load(f))
+    page, expected = google_results_page(SITE, **LARGE)
+    pages["google_large"] = (page, expected_pairs(expected)[:GOOGLE_RESULT_LIMIT])
+    return pages
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best  = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat",         type=int, default=200)
+    parser.add_argument("--write-fixtures", action="store_true")
+    args = parser.parse_args()
+
+    if args.write_fixtures:
+        write_fixtures()
+        return
+
+    report, failures = {}, 0
+    for name, (page, expected) in load_fixtures().items():
+        old_s, old = timed(lambda: baseline(page, SITE, "FedEx"), args.repeat)
+        new_s, new = timed(lambda: parse_google_results(page, SITE, "FedEx"), args.repeat)
+        got     = [[r["apply_url"], r["title"]] for r in new]
+        correct = got == expected
+        failures += not correct
+        report[name] = {
+            "page_kb":          round(len(page) / 1024, 1),
+            "baseline_ms":      round(old_s * 1000, 3),
+            "parser_ms":        round(new_s * 1000, 3),
+            "speedup":          round(old_s / new_s, 2) if new_s else None,
+            "parser_correct":   correct,
+            "baseline_correct": [[r["apply_url"], r["title"]] for r in old] == expected,
+        }
+    print(json.dumps(report, indent=2))
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Title matcher benchmark — compiled TitleMatcher vs. the original
+any(k in t ...) scans used by matches_keywords / classify_job.
+
+    python JobScraper/benchmarks/bench_matcher.py [--titles 200000] [--seed 7]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import make_title
+from job_scraper import (
+    JAVA_KEYWORDS, PYTHON_KEYWORDS, load_config, title_matcher,
+)
+
+CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ats_config.json"
+)
+
+
+def generate_titles(n, seed):
+    rng = random.Random(seed)
+    return [make_title(rng) for _ in range(n)]
+
+
+# The pre-matcher implementation, kept here as the comparison baseline
+def baseline(title, include_kws, exclude_kws):
+    t    = title.lower()
+    keep = any(k in t for k in include_kws) and not any(k in t for k in exclude_kws)
+    if any(k in t for k in JAVA_KEYWORDS):
+        return keep, "Java"
+    if any(k in t for k in PYTHON_KEYWORDS):
+        return keep, "Python"
+    return keep, "Software"
+
+
+def timed(fn, titles):
+    start   = time.perf_counter()
+    results = [fn(t) for t in titles]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--titles", type=int, default=200_000)
+    parser.add_argument("--seed",   type=int, default=7)
+    args = parser.parse_args()
+
+    filters = load_config(CONFIG_PATH)["filters"]
+    include = filters["keywords"]
+    exclude = filters["exclude_keywords"]
+    titles  = generate_titles(args.titles, args.seed)
+
+    start   = time.perf_counter()
+    matcher = title_matcher(filters)
+    build   = time.perf_counter() - start
+
+    old_s, old = timed(lambda t: baseline(t, include, exclude), titles)
+    new_s, new = timed(matcher.match, titles)
+
+    mismatches = sum(1 for a, b in zip(old, new) if a != b)
+    report = {
+        "titles":          len(titles),
+        "build_ms":        round(build * 1000, 3),
+        "baseline_s":      round(old_s, 4),
+        "matcher_s":       round(new_s, 4),
+        "baseline_us_per": round(old_s / len(titles) * 1e6, 3),
+        "matcher_us_per":  round(new_s / len(titles) * 1e6, 3),
+        "speedup":         round(old_s / new_s, 2) if new_s else None,
+        "mismatches":      mismatches,
+    }
+    print(json.dumps(report, indent=2))
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
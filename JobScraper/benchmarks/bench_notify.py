@@ -0,0 +1,181 @@
+"""
+Notification benchmark — the async Notifier (reused SMTP session + webhook,
+digests, instant alerts) vs. the original send-at-the-end path (one fresh
+SMTP connection per message, sent on the event loop), against the local
+stand-in sinks in mock_notify_server.py.
+
+    python JobScraper/benchmarks/bench_notify.py [--boards 40] [--messages 20] \\
+        [--smtp-latency 0.05]
+
+Boards "finish" one every --board-interval seconds and one early board
+carries a high-score posting. Reports time to the first alert, total wall
+time, worst event-loop stall and SMTP connections opened.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import smtplib
+import subprocess
+import sys
+import time
+import urllib.request
+from email.mime.text import MIMEText
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import job_scraper as js
+from corpus import LOCATIONS, make_title
+
+PREFERENCES = {"preferred_skills": ["java", "python", "distributed"], "level": "senior"}
+STAR_TITLE  = "Senior Java Python Distributed Systems Engineer"
+
+
+def board_jobs(rng, board, per_board, star):
+    jobs = [{
+        "category":  "Software",
+        "title":     make_title(rng),
+        "company":   f"Board{board}",
+        "ats":       "Mock",
+        "state":     "Remote",
+        "location":  rng.choice(LOCATIONS),
+        "posted_at": "2026-01-01 00:00 UTC",
+        "apply_url": f"https://example.com/{board}/{i}",
+        "score":     0,
+    } for i in range(per_board)]
+    if star:
+        jobs[0]["title"] = STAR_TITLE
+    return jobs
+
+
+def server_call(base, path, method="GET"):
+    req = urllib.request.Request(base + path, method=method)
+    with urllib.request.urlopen(req, timeout=10) as r:
+        return json.load(r)
+
+
+def start_server(args):
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "mock_notify_server.py"),
+         "--smtp-port", str(args.port), "--http-port", str(args.port + 1),
+         "--smtp-latency", str(args.smtp_latency)],
+        stdout=subprocess.PIPE, text=True, cwd=HERE,
+    )
+    line = proc.stdout.readline()
+    if not line:
+        proc.wait()
+        raise SystemExit(f"mock server exited with {proc.returncode}")
+    return proc, json.loads(line)
+
+
+async def watch_loop(stalls, interval=0.005):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - start - interval)
+
+
+def baseline_send(sink, subject, jobs):
+    # The pre-Notifier shape: string-built body, fresh connection per message
+    body = f"Found {len(jobs)} new USA jobs!\n\n"
+    for job in jobs:
+        body += f"{'=' * 50}\nTitle    : {job['title']}\nApply    : {job['apply_url']}\n\n"
+    msg            = MIMEText(body, "plain")
+    msg["From"]    = sink["sender"]
+    msg["To"]      = sink["recipient"]
+    msg["Subject"] = subject
+    with smtplib.SMTP(sink["host"], sink["port"]) as server:
+        server.send_message(msg)
+
+
+async def run_baseline(args, sinks, boards):
+    stalls  = []
+    watcher = asyncio.create_task(watch_loop(stalls))
+    start   = time.time()
+    found   = []
+    for jobs in boards:
+        await asyncio.sleep(args.board_interval)
+        found.extend(jobs)
+    # Old pipeline: everything is mailed once the whole run is done
+    for i in range(args.messages):
+        baseline_send(sinks["smtp"], f"digest {i}", found[:30])
+        await asyncio.sleep(0)
+    watcher.cancel()
+    return start, time.time() - start, max(stalls, default=0)
+
+
+async def run_notifier(args, sinks, boards):
+    config   = {
+        "preferences":   PREFERENCES,
+        "notifications": {"sinks": [sinks["smtp"], sinks["webhook"]],
+                          "instant_score": args.instant_score,
+                          "digest_seconds": 3600},
+    }
+    seen     = set()
+    notifier = js.start_notifier(config)
+    stalls   = []
+    watcher  = asyncio.create_task(watch_loop(stalls))
+    start    = time.time()
+    found    = []
+    for jobs in boards:
+        await asyncio.sleep(args.board_interval)
+        js.offer_high_scores(notifier, config, seen, None, jobs)
+        found.extend(jobs)
+    js.rank_jobs(found, PREFERENCES)
+    for i in range(args.messages):
+        # One digest per batch, as a daemon checkpoint would send them
+        await notifier.publish(found[i * 30:(i + 1) * 30] or found[:30])
+        await asyncio.sleep(0)
+        while not notifier.queue.empty():
+            await asyncio.sleep(0.001)
+    await notifier.close()
+    watcher.cancel()
+    return start, time.time() - start, max(stalls, default=0)
+
+
+def first_alert(stats, start):
+    times = [m["at"] for m in stats["smtp_messages"] + stats["webhook_messages"]]
+    return round(min(times) - start, 3) if times else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--boards",         type=int,   default=40)
+    parser.add_argument("--per-board",      type=int,   default=50)
+    parser.add_argument("--board-interval", type=float, default=0.02)
+    parser.add_argument("--messages",       type=int,   default=20)
+    parser.add_argument("--smtp-latency",   type=float, default=0.05)
+    parser.add_argument("--instant-score",  type=float, default=40)
+    parser.add_argument("--port",           type=int,   default=18125)
+    parser.add_argument("--seed",           type=int,   default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng    = random.Random(args.seed)
+    boards = [board_jobs(rng, b, args.per_board, star=(b == 1)) for b in range(args.boards)]
+    proc, sinks = start_server(args)
+    report = {}
+    try:
+        for name, run in (("baseline", run_baseline), ("notifier", run_notifier)):
+            server_call(sinks["stats"], "/__reset", "POST")
+            start, wall, stall = asyncio.run(run(args, sinks, boards))
+            stats = server_call(sinks["stats"], "/__stats")
+            report[name] = {
+                "first_alert_s":    first_alert(stats, start),
+                "wall_s":           round(wall, 3),
+                "max_loop_stall_s": round(stall, 3),
+                "smtp_connections": stats["smtp_connections"],
+                "smtp_messages":    len(stats["smtp_messages"]),
+                "webhook_messages": len(stats["webhook_messages"]),
+            }
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Microbenchmarks for the filter / organize hot path on synthetic postings.
+
+Runs parse_jobs, parse_date, is_usa_location, extract_state,
+matches_keywords, classify_job, rank_jobs, filter_new_jobs,
+collapse_near_duplicates, organize_jobs (full sort and top-k) and save_output (JSON and NDJSON) against generated Greenhouse /
+Lever / Ashby / Workday payloads, fully offline. Results are written as JSON so two commits can be compared:
+
+    python JobScraper/benchmarks/bench_pipeline.py --output before.json
+    ... change things ...
+    python JobScraper/benchmarks/bench_pipeline.py --output after.json --compare before.json
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import job_scraper as js
+from corpus import SHAPES, generate_postings
+
+CONFIG_PATH   = os.path.join(os.path.dirname(HERE), "ats_config.json")
+DEFAULT_SIZES = "1000,100000,1000000"
+ATS_NAMES     = {"greenhouse": "Greenhouse", "lever": "Lever",
+                 "ashby": "Ashby", "workday": "Workday"}
+PREFERENCES   = {
+    "preferred_skills":    ["java", "kafka", "python", "aws", "distributed"],
+    "preferred_states":    ["Texas", "California", "New York"],
+    "preferred_companies": ["ACME"],
+    "level":               "senior",
+}
+TOP_K         = 25
+
+
+def ats_descriptor(config, shape):
+    ats = dict(next(a for a in config["ats_sources"] if a["name"] == ATS_NAMES[shape]))
+    if shape == "workday":
+        ats["date_format"] = "relative"   # postedOn is "Posted 3 Days Ago"
+    return ats
+
+
+def job_entries(raw, ats):
+    # Unfiltered entries so the post-filter stages see the full corpus size
+    entries = []
+    for job in raw:
+        title    = js.get_field(job, ats["title_field"]) or ""
+        location = str(js.get_field(job, ats["location_field"]) or "")
+        entries.append({
+            "category":  js.classify_job(title),
+            "title":     title,
+            "company":   "ACME",
+            "ats":       ats["name"],
+            "state":     js.extract_state(location),
+            "location":  location,
+            "posted_at": "2026-01-01 00:00 UTC",
+            "apply_url": js.get_field(job, ats["url_field"]) or "",
+            "score":     0,
+        })
+    return entries
+
+
+def build_cases(shape, raw, ats, filters, workdir):
+    titles    = [js.get_field(j, ats["title_field"]) or "" for j in raw]
+    locations = [str(js.get_field(j, ats["location_field"]) or "") for j in raw]
+    dates     = [js.get_field(j, ats["date_field"]) for j in raw]
+    entries   = job_entries(raw, ats)
+    organized = js.organize_jobs(entries)
+    include   = filters["keywords"]
+    exclude   = filters["exclude_keywords"]
+    fmt       = ats["date_format"]
+    state     = {}
+
+    def clear_locations():
+        js.LOCATION_CACHE.clear()
+
+    def cold_ranking():
+        # Title scores are cached on the model; start each run without them
+        js.compile_ranking_model.cache_clear()
+
+    def fresh_store():
+        if "store" in state:
+            state["store"].close()
+        path = os.path.join(workdir, f"seen-{shape}.db")
+        if os.path.exists(path):
+            os.remove(path)
+        state["store"] = js.SeenJobsStore(path)
+
+    def fresh_index():
+        if "index" in state:
+            state["index"].close()
+        path = os.path.join(workdir, f"near-{shape}.db")
+        if os.path.exists(path):
+            os.remove(path)
+        state["index"] = js.NearDuplicateIndex(path)
+        js.shingle_hashes.cache_clear()
+
+    return [
+        ("parse_jobs",       len(raw),     None,
+         lambda: js.parse_jobs(raw, ats, "ACME", filters)),
+        ("parse_date",       len(dates),   None,
+         lambda: [js.parse_date(d, fmt) for d in dates]),
+        ("is_usa_location",  len(locations), clear_locations,
+         lambda: [js.is_usa_location(l) for l in locations]),
+        ("extract_state",    len(locations), clear_locations,
+         lambda: [js.extract_state(l) for l in locations]),
+        ("matches_keywords", len(titles),  None,
+         lambda: [js.matches_keywords(t, include, exclude) for t in titles]),
+        ("classify_job",     len(titles),  None,
+         lambda: [js.classify_job(t) for t in titles]),
+        ("rank_jobs",        len(entries), cold_ranking,
+         lambda: js.rank_jobs(entries, PREFERENCES)),
+        ("filter_new_jobs",  len(entries), fresh_store,
+         lambda: js.filter_new_jobs(entries, state["store"])),
+        ("collapse_near_duplicates", len(entries), fresh_index,
+         lambda: js.collapse_near_duplicates(entries, state["index"])),
+        ("organize_jobs",    len(entries), None,
+         lambda: js.organize_jobs(entries)),
+        ("organize_jobs_top_k", len(entries), None,
+         lambda: js.organize_jobs(entries, TOP_K)),
+        ("save_output",      len(entries), None,
+         lambda: js.save_output(organized)),
+        ("save_output_ndjson", len(entries), None,
+         lambda: js.save_output(organized, {"format": "ndjson"})),
+    ]
+
+
+def measure(calls, setup, run, repeat, memory):
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best  = min(best, time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        if setup:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "calls":        calls,
+        "seconds":      round(best, 6),
+        "ops_per_sec":  round(calls / best, 1) if best else None,
+        "us_per_call":  round(best / calls * 1e6, 4) if calls else None,
+        "peak_mem_mb":  round(peak / 2 ** 20, 3) if peak is not None else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"\n{'benchmark':<42} {'before us':>11} {'after us':>11} {'change':>8}")
+    print("-" * 76)
+    for key, result in current.items():
+        old = baseline.get(key)
+        if not old or not old.get("us_per_call") or not result.get("us_per_call"):
+            continue
+        change = result["us_per_call"] / old["us_per_call"] - 1
+        flag   = "  REGRESSION" if change > threshold else ""
+        print(f"{key:<42} {old['us_per_call']:>11.3f} "
+              f"{result['us_per_call']:>11.3f} {change:>+7.1%}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes",     default=DEFAULT_SIZES,
+                        help=f"comma-separated corpus sizes (default {DEFAULT_SIZES})")
+    parser.add_argument("--shapes",    default=",".join(SHAPES))
+    parser.add_argument("--repeat",    type=int, default=3, help="best-of repetitions")
+    parser.add_argument("--seed",      type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("--output",    default="bench_results.json")
+    parser.add_argument("--compare",   help="baseline JSON to flag regressions against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown fraction counted as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    config  = js.load_config(CONFIG_PATH)
+    filters = config["filters"]
+    sizes   = [int(s) for s in args.sizes.split(",") if s]
+    shapes  = [s for s in args.shapes.split(",") if s]
+    output  = os.path.abspath(args.output)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)   # save_output writes jobs_output.json into cwd
+        try:
+            for shape in shapes:
+                ats = ats_descriptor(config, shape)
+                for n in sizes:
+                    raw = generate_postings(shape, n, seed=args.seed)
+                    for name, calls, setup, run in build_cases(shape, raw, ats, filters, workdir):
+                        key = f"{shape}/{n}/{name}"
+                        results[key] = measure(calls, setup, run, args.repeat,
+                                               not args.no_memory)
+                        r = results[key]
+                        mem = f"{r['peak_mem_mb']:>9.2f} MB" if r["peak_mem_mb"] is not None else ""
+                        print(f"{key:<42} {r['ops_per_sec']:>14,.0f}/s "
+                              f"{r['us_per_call']:>10.3f} us {mem}", flush=True)
+                    del raw
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit":       git_commit(),
+        "python":       platform.python_version(),
+        "platform":     platform.platform(),
+        "seed":         args.seed,
+        "repeat":       args.repeat,
+        "results":      results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved → {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Transport benchmark — run_all_fetches through the per-host connection pools
+(keep-alive, DNS cache, warm-up, compressed bodies) vs. the original single
+shared ClientSession, against the local mock ATS server.
+
+    python JobScraper/benchmarks/bench_transport.py [--companies 400] \\
+        [--handshake 0.05] [--bandwidth 2000] [--latency fixed:0.01]
+
+The mock charges --handshake seconds for the first request on every new
+connection and serves bodies at --bandwidth KB/s, gzipped when asked, so
+connection reuse and compression both show up in wall time. Each profile
+runs in a fresh child process; reports wall time, boards/s, req/s,
+wire / decoded MB and connections the server accepted. Scheduler rate
+limits are lifted so the transport is what's being measured.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import job_scraper as js
+from load_harness import build_config, server_call, start_server
+from mock_ats_server import VENDORS
+
+# Per-host politeness limits lifted well above what the mock can serve, so
+# the connection pool rather than the scheduler is the bottleneck
+OPEN_LIMITS = {"rate": 1000, "burst": 1000, "max_in_flight": 64}
+
+PROFILES = {
+    "legacy":         None,
+    "tuned_identity": {"compression": False},
+    "tuned":          {},
+}
+
+
+class SharedSession:
+    # The pre-Transport shape: one ClientSession for every host, a 20
+    # connection pool and one 12 s total timeout per request, no warm-up
+    def __init__(self, settings=None):
+        self.settings = {**js.TRANSPORT_DEFAULTS, "warmup_hosts": 0}
+        self.session  = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20),
+            timeout=aiohttp.ClientTimeout(total=12),
+            headers=js.HEADERS,
+            auto_decompress=False,
+        )
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session.post(url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.session.head(url, **kwargs)
+
+    async def warm(self, origins):
+        pass
+
+    async def close(self):
+        await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def run_child(n, urls, profile):
+    logging.getLogger().setLevel(logging.WARNING)
+    config    = build_config(n, urls)
+    overrides = PROFILES[profile]
+    scheduler = config["scheduler"]
+    scheduler["default"] = OPEN_LIMITS
+    scheduler["hosts"]   = dict.fromkeys(scheduler["hosts"], OPEN_LIMITS)
+    if overrides is None:
+        js.Transport = SharedSession
+    else:
+        config["transport"] = {**config.get("transport", {}), **overrides}
+    config["metrics"] = {"enabled": True}
+    metrics = js.start_metrics(config)
+    js.BOARD_HEALTH.clear()
+    js.WORKDAY_FACET_CACHE.clear()
+
+    start  = time.perf_counter()
+    jobs   = asyncio.run(js.run_all_fetches(config))
+    wall   = time.perf_counter() - start
+    boards = len(metrics.sources)
+    totals = js.summarize_sources(metrics.sources.values())
+    return {
+        "boards":         boards,
+        "jobs_matched":   len(jobs),
+        "wall_s":         round(wall, 3),
+        "boards_per_sec": round(boards / wall, 1),
+        "wire_mb":        round(totals["bytes"] / 2 ** 20, 2),
+        "decoded_mb":     round(totals["decoded_bytes"] / 2 ** 20, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--companies", type=int,   default=400)
+    parser.add_argument("--handshake", type=float, default=0.05)
+    parser.add_argument("--bandwidth", type=float, default=2000)
+    parser.add_argument("--latency",   default="fixed:0.01")
+    parser.add_argument("--port-base", type=int,   default=18280)
+    parser.add_argument("--profiles",  default=",".join(PROFILES))
+    parser.add_argument("--child",     help=argparse.SUPPRESS)
+    parser.add_argument("--urls",      help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            print(json.dumps(run_child(args.companies, json.loads(args.urls), args.child)))
+        return
+
+    proc, urls = start_server(args.port_base, [
+        "--compress", "--handshake", str(args.handshake),
+        "--bandwidth", str(args.bandwidth), "--latency", args.latency,
+    ])
+    stats_url = urls[VENDORS[0]]
+    report    = {}
+    try:
+        for profile in [p for p in args.profiles.split(",") if p]:
+            server_call(stats_url, "/__reset", "POST")
+            child = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", profile,
+                 "--companies", str(args.companies), "--urls", json.dumps(urls)],
+                capture_output=True, text=True,
+            )
+            if child.returncode:
+                sys.stderr.write(child.stderr)
+                raise SystemExit(f"{profile} run failed")
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            server = server_call(stats_url, "/__stats")
+            result["requests"]    = server["requests"]
+            result["req_per_sec"] = round(server["requests"] / result["wall_s"], 1)
+            result["connections"] = server["connections"]
+            report[profile] = result
+            print(f"{profile:<15} {result['wall_s']:>7.2f} s  "
+                  f"{result['boards_per_sec']:>7.1f} boards/s  "
+                  f"{result['req_per_sec']:>7.1f} req/s  "
+                  f"{result['wire_mb']:>7.2f} / {result['decoded_mb']:>7.2f} MB  "
+                  f"{result['connections']:>5} conns", flush=True)
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Synthetic job-board payloads shaped like the real ATS responses.
+
+Shared by the benchmark suite and the mock ATS server so both exercise the
+same field layouts that ats_config.json points at. google_results_page
+builds Google-style result pages for the manual_search parser benchmark.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+# Shapes the microbenchmarks iterate over; MAKERS below also covers the
+# remaining ATS sources for the mock server.
+SHAPES = ["greenhouse", "lever", "ashby", "workday"]
+
+SENIORITY = ["", "", "", "Senior", "Staff", "Lead", "Principal", "Junior", "Associate", "Sr."]
+TECH      = ["", "", "Java", "Python", "Backend", "Full Stack", "Platform", "Data",
+             "Frontend", "iOS", "Machine Learning", "Spring Boot", "Go", "Distributed Systems"]
+ROLE      = ["Software Engineer", "Software Engineer", "Developer", "Engineer", "SDE",
+             "Engineering Manager", "Data Scientist", "Account Executive", "Product Manager",
+             "Designer", "Solutions Engineer", "Recruiter", "API Engineer", "Support Engineer"]
+SUFFIX    = ["", "", "", "II", "III", "- Payments", "(Remote)", "- Infrastructure"]
+LOCATIONS = [
+    "San Francisco, CA", "New York, NY", "Remote - US", "Seattle, WA", "Austin, TX",
+    "Boston, MA", "Chicago, IL", "Denver, CO", "United States", "Remote",
+    "London, UK", "Toronto, Canada", "Bengaluru, India", "Berlin, Germany",
+    "Atlanta, Georgia", "Raleigh, North Carolina", "2 Locations", "Dublin, Ireland",
+    "Salt Lake City, UT", "Remote, United States", "Portland, OR", "Kansas City, MO",
+]
+TEAMS     = ["Engineering", "Infrastructure", "Data", "Sales", "Product", "Security"]
+
+
+def make_title(rng):
+    return " ".join(p for p in (
+        rng.choice(SENIORITY), rng.choice(TECH), rng.choice(ROLE), rng.choice(SUFFIX)
+    ) if p)
+
+
+def posted_at(rng, now, max_age_hours=72):
+    # Skewed towards recent so a realistic share lands inside hours_limit
+    return now - timedelta(hours=max_age_hours * rng.random() ** 2)
+
+
+def workday_posted_on(dt, now):
+    days = (now - dt).days
+    if days == 0:
+        return "Posted Today"
+    if days == 1:
+        return "Posted Yesterday"
+    return "Posted 30+ Days Ago" if days >= 30 else f"Posted {days} Days Ago"
+
+
+def greenhouse_posting(rng, i, company, now):
+    dt = posted_at(rng, now)
+    return {
+        "id":              4000000 + i,
+        "internal_job_id": 2000000 + i,
+        "title":           make_title(rng),
+        "updated_at":      dt.isoformat(timespec="seconds"),
+        "requisition_id":  f"R-{i:06d}",
+        "location":        {"name": rng.choice(LOCATIONS)},
+        "absolute_url":    f"https://boards.greenhouse.io/{company}/jobs/{4000000 + i}?gh_jid={4000000 + i}",
+        "metadata":        None,
+        "data_compliance": [{"type": "gdpr", "requires_consent": False}],
+    }
+
+
+def lever_posting(rng, i, company, now):
+    dt  = posted_at(rng, now)
+    pid = f"{rng.getrandbits(64):016x}-{i:08d}"
+    return {
+        "id":         pid,
+        "text":       make_title(rng),
+        "createdAt":  int(dt.timestamp() * 1000),
+        "categories": {
+            "location":   rng.choice(LOCATIONS),
+            "team":       rng.choice(TEAMS),
+            "commitment": "Full-time",
+        },
+        "hostedUrl":  f"https://jobs.lever.co/{company}/{pid}",
+        "applyUrl":   f"https://jobs.lever.co/{company}/{pid}/apply",
+        "descriptionPlain": "We are looking for an engineer to join the team. " * 4,
+    }
+
+
+def ashby_posting(rng, i, company, now):
+    dt = posted_at(rng, now)
+    return {
+        "id":            f"{rng.getrandbits(64):016x}",
+        "title":         make_title(rng),
+        "locationName":  rng.choice(LOCATIONS),
+        "publishedDate": dt.isoformat(),
+        "jobUrl":        f"https://jobs.ashbyhq.com/{company}/{i}",
+    }
+
+
+def workday_posting(rng, i, company, now):
+    dt = posted_at(rng, now)
+    return {
+        "title":         make_title(rng),
+        "externalPath":  f"/job/{company}/Software-Engineer_R{i:07d}",
+        "locationsText": rng.choice(LOCATIONS),
+        "postedOn":      workday_posted_on(dt, now),
+        "bulletFields":  [f"R{i:07d}"],
+    }
+
+
+def workable_posting(rng, i, company, now):
+    dt   = posted_at(rng, now)
+    code = f"{rng.getrandbits(40):010X}"
+    return {
+        "shortcode":    code,
+        "title":        make_title(rng),
+        "published_on": dt.date().isoformat(),
+        "location":     {"city": rng.choice(LOCATIONS), "country": "United States"},
+        "url":          f"https://apply.workable.com/{company}/j/{code}/",
+    }
+
+
+def smartrecruiters_posting(rng, i, company, now):
+    dt  = posted_at(rng, now)
+    pid = f"{7440000000000 + i}"
+    return {
+        "id":           pid,
+        "name":         make_title(rng),
+        "releasedDate": dt.isoformat(timespec="milliseconds"),
+        "location":     {"city": rng.choice(LOCATIONS), "remote": False},
+        "ref":          f"https://api.smartrecruiters.com/v1/companies/{company}/postings/{pid}",
+    }
+
+
+def jobvite_posting(rng, i, company, now):
+    dt  = posted_at(rng, now)
+    jid = f"o{rng.getrandbits(32):08x}"
+    return {
+        "id":          jid,
+        "title":       make_title(rng),
+        "date":        dt.isoformat(timespec="seconds"),
+        "location":    rng.choice(LOCATIONS),
+        "jobApplyUrl": f"https://jobs.jobvite.com/{company}/job/{jid}/apply",
+    }
+
+
+MAKERS = {
+    "greenhouse":      greenhouse_posting,
+    "lever":           lever_posting,
+    "ashby":           ashby_posting,
+    "workday":         workday_posting,
+    "workable":        workable_posting,
+    "smartrecruiters": smartrecruiters_posting,
+    "jobvite":         jobvite_posting,
+}
+
+
+def generate_postings(shape, n, seed=0, company="acme", now=None):
+    rng  = random.Random(f"{shape}:{seed}:{company}")
+    now  = now or datetime.now(timezone.utc)
+    make = MAKERS[shape]
+    return [make(rng, i, company, now) for i in range(n)]
+
+
+# Titles carry entities and punctuation the old regex parser mangled
+GOOGLE_TITLE_EXTRAS = [
+    "", "", " &amp; Platform", " &#8211; Remote", " (Java/Spring)", " &ndash; US",
+    " | O&#39;Fallon, MO", " &quot;Core&quot; Team", " &#x2F; Backend",
+]
+
+
+def google_result_block(rng, site, i, legacy):
+    url   = f"https://{site}/careers/job/{rng.randint(100000, 999999)}-{i}"
+    title = make_title(rng) + rng.choice(GOOGLE_TITLE_EXTRAS)
+    if legacy:
+        return (
+            f'<div class="g"><h3 class="r"><a href="/url?q={url}&amp;sa=U&amp;ved=0ah{i}">'
+            f"{title}</a></h3><div class=\"s\"><cite>{site}</cite></div></div>\n"
+        ), url, title
+    thumb = (
+        f'<a href="{url}" class="thumb"><img src="data:image/png;base64,iVBOR{i}" alt=""></a>'
+        if rng.random() < 0.3 else ""
+    )
+    return (
+        f'<div class="g"><div class="tF2Cxc">{thumb}<a href="{url}" data-ved="2ah{i}" '
+        f'ping="/url?sa=t&amp;source=web"><br><h3 class="LC20lb MBeuO DKV0Md">{title}</h3>'
+        f'<div class="TbwUpd"><cite class="qLRx3b">{site} &rsaquo; careers</cite></div></a>'
+        f'</div><div class="VwiC3b"><span>Posted {rng.randint(1, 20)} hours ago &middot; '
+        f"We are hiring a {make_title(rng)} to join our team.</span></div></div>\n"
+    ), url, title
+
+
+def google_results_page(site, n_results=10, seed=0, padding_kb=64, legacy=False):
+    """
+    A results page for `site:` with inline script/style padding, an ad and a
+    "People also ask" heading without a link ahead of the organic results.
+    Returns (html, expected) where expected lists (url, title) in page order.
+    """
+    rng     = random.Random(f"google:{site}:{seed}")
+    script  = "var _g={kEI:'x'};" + "".join(
+        f"function f{i}(a,b){{return a<b?'&lt;'+a:b+{i}}};" for i in range(padding_kb * 20)
+    )
+    style   = "".join(f".c{i}{{margin:{i % 9}px;color:#{i % 4096:03x}}}" for i in range(padding_kb * 10))
+    parts   = [
+        f"<!doctype html><html><head><title>site:{site} - Google Search</title>",
+        f"<style>{style}</style><script nonce=\"n\">{script}</script></head><body>",
+        '<div id="tads"><a href="https://ads.example.com/?url=https://' + site + '/promo">'
+        "<span>Sponsored</span><div>Hiring now</div></a></div>",
+        '<div class="related-question-pair"><h3>People also ask</h3>'
+        "<div>What does a software engineer do?</div></div>",
+    ]
+    expected = []
+    for i in range(n_results):
+        block, url, title = google_result_block(rng, site, i, legacy)
+        parts.append(block)
+        expected.append((url, title))
+    parts.append(f"<script>{script[: len(script) // 4]}</script></body></html>")
+    return "".join(parts), expected
@@ -0,0 +1,221 @@
+"""
+End-to-end load test of run_all_fetches against the local mock ATS server.
+
+Starts mock_ats_server.py, then for each company count builds a config that
+spreads N boards across the seven sources in the same proportions as
+ats_config.json, points every base_url at the mock, and runs the real
+scheduler / fetch / parse path in a fresh child process (so peak RSS is per
+run). --transport takes a JSON object merged over the config's "transport"
+block. Unrecognised options are forwarded to the mock server:
+
+    python JobScraper/benchmarks/load_harness.py --companies 100,1000,10000 \\
+        --latency lognormal:-3,0.6 --error-rate 0.01 --rate-429 0.005
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import job_scraper as js
+from mock_ats_server import BASE_PATHS, VENDORS, percentiles
+
+CONFIG_PATH       = os.path.join(os.path.dirname(HERE), "ats_config.json")
+DEFAULT_COMPANIES = "100,1000,10000"
+
+# All Workday tenants share one mock port, so the per-tenant production
+# limits would otherwise collapse into a single bucket
+WORKDAY_LIMITS = {"rate": 200, "burst": 200, "max_in_flight": 64}
+
+
+def vendor_of(ats):
+    return ats["name"].lower()
+
+
+def split_companies(sources, n):
+    # Largest-remainder split so the shares add up to exactly n
+    sizes  = [len(a["companies"]) for a in sources]
+    total  = sum(sizes) or 1
+    exact  = [n * s / total for s in sizes]
+    counts = [int(x) for x in exact]
+    order  = sorted(range(len(sizes)), key=lambda i: exact[i] - counts[i], reverse=True)
+    for i in order[:n - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def build_config(n, urls):
+    config  = js.load_config(CONFIG_PATH)
+    sources = [a for a in config["ats_sources"] if vendor_of(a) in urls]
+    hosts   = {}
+
+    for ats, count in zip(sources, split_companies(sources, n)):
+        vendor = vendor_of(ats)
+        real   = urlsplit(ats["base_url"]).netloc
+        ats["base_url"] = urls[vendor] + BASE_PATHS[vendor]
+        mock   = urlsplit(ats["base_url"]).netloc
+
+        if vendor == "workday":
+            ats["companies"] = [
+                {"slug": f"wd{i:05d}", "instance": "1", "site": "External",
+                 "display": f"WD{i:05d}"}
+                for i in range(count)
+            ]
+            hosts[mock] = WORKDAY_LIMITS
+        else:
+            ats["companies"] = [f"{vendor}{i:05d}" for i in range(count)]
+            limits = config.get("scheduler", {}).get("hosts", {}).get(real)
+            if limits:
+                hosts[mock] = limits
+
+    config["ats_sources"] = sources
+    config.setdefault("scheduler", {})["hosts"] = hosts
+    return config
+
+
+def run_child(n, urls, transport=None):
+    logging.getLogger().setLevel(logging.WARNING)
+    config = build_config(n, urls)
+    config["transport"] = {**config.get("transport", {}), **(transport or {})}
+    metrics = js.start_metrics(config)
+    js.BOARD_HEALTH.clear()
+    js.WORKDAY_FACET_CACHE.clear()
+
+    latencies = {}
+    errors    = {}
+    original  = js.fetch_jobs_async
+
+    async def timed_fetch(session, ats, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await original(session, ats, *args, **kwargs)
+        except Exception as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            raise
+        finally:
+            latencies.setdefault(ats["name"], []).append(time.perf_counter() - start)
+
+    js.fetch_jobs_async = timed_fetch
+    start = time.perf_counter()
+    jobs  = asyncio.run(js.run_all_fetches(config))
+    wall  = time.perf_counter() - start
+
+    everything = [x for v in latencies.values() for x in v]
+    totals     = js.summarize_sources(metrics.sources.values()) if metrics else {}
+    return {
+        "companies":      n,
+        "boards_fetched": len(everything),
+        "jobs_matched":   len(jobs),
+        "wall_s":         round(wall, 3),
+        "boards_per_sec": round(len(everything) / wall, 1) if wall else None,
+        "board_latency_s": {
+            "all": percentiles(everything),
+            **{name: percentiles(v) for name, v in latencies.items()},
+        },
+        "client_errors":  errors,
+        "wire_bytes":     totals.get("bytes"),
+        "decoded_bytes":  totals.get("decoded_bytes"),
+        "peak_rss_mb":    round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def server_call(base, path, method="GET"):
+    req = urllib.request.Request(base + path, method=method)
+    with urllib.request.urlopen(req, timeout=10) as r:
+        return json.load(r)
+
+
+def start_server(port_base, server_args):
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "mock_ats_server.py"),
+         "--port-base", str(port_base), *server_args],
+        stdout=subprocess.PIPE, text=True, cwd=HERE,
+    )
+    line = proc.stdout.readline()
+    if not line:
+        proc.wait()
+        raise SystemExit(f"mock server exited with {proc.returncode}")
+    return proc, json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--companies", default=DEFAULT_COMPANIES,
+                        help=f"comma-separated board counts (default {DEFAULT_COMPANIES})")
+    parser.add_argument("--port-base", type=int, default=18080)
+    parser.add_argument("--output",    default="load_results.json")
+    parser.add_argument("--transport", default="{}",
+                        help='JSON merged over the "transport" config block')
+    parser.add_argument("--child",     type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--urls",      help=argparse.SUPPRESS)
+    args, server_args = parser.parse_known_args()
+
+    if args.child is not None:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            print(json.dumps(run_child(args.child, json.loads(args.urls),
+                                       json.loads(args.transport))))
+        return
+
+    proc, urls = start_server(args.port_base, server_args)
+    stats_url  = urls[VENDORS[0]]
+    runs       = []
+    try:
+        for n in [int(x) for x in args.companies.split(",") if x]:
+            server_call(stats_url, "/__reset", "POST")
+            child = subprocess.run(
+                [sys.executable, os.path.abspath(__file__),
+                 "--child", str(n), "--urls", json.dumps(urls),
+                 "--transport", args.transport],
+                capture_output=True, text=True,
+            )
+            if child.returncode:
+                sys.stderr.write(child.stderr)
+                raise SystemExit(f"run with {n} companies failed")
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            server = server_call(stats_url, "/__stats")
+            result["requests"]     = server["requests"]
+            result["req_per_sec"]  = round(server["requests"] / result["wall_s"], 1)
+            result["statuses"]     = server["statuses"]
+            result["bytes_served"] = server["bytes_out"]
+            result["connections"]  = server["connections"]
+            result["server_latency_s"] = server["latency_s"]
+            runs.append(result)
+
+            lat = result["board_latency_s"]["all"]
+            print(f"{n:>7} companies  {result['wall_s']:>8.2f} s  "
+                  f"{result['req_per_sec']:>8,.0f} req/s  "
+                  f"p50 {lat['p50'] or 0:.3f}  p95 {lat['p95'] or 0:.3f}  "
+                  f"p99 {lat['p99'] or 0:.3f} s  {result['peak_rss_mb']:>7.1f} MB",
+                  flush=True)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python":       platform.python_version(),
+        "platform":     platform.platform(),
+        "server_args":  server_args,
+        "runs":         runs,
+    }
+    output = os.path.abspath(args.output)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved → {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Local mock of the ATS endpoints in ats_config.json.
+
+Serves Greenhouse, Lever, Ashby (GraphQL), Workable, SmartRecruiters,
+Jobvite and Workday CXS on one port per vendor, so per-host scheduling in
+the scraper sees one "host" per vendor just like production. Board sizes,
+latency, error / 429 rates, dead boards and slow-loris bodies are all
+configurable:
+
+    python JobScraper/benchmarks/mock_ats_server.py --port-base 18080 \\
+        --board-size 20:200 --latency lognormal:-3,0.6 --error-rate 0.01
+
+--outage greenhouse,lever makes those vendors answer everything with a 503
+(after --outage-latency seconds), like a vendor-wide incident. --handshake
+delays the first request on each new connection (TCP + TLS set-up),
+--bandwidth is a KB/s link shared by every response, and --compress gzips bodies for
+clients that accept it.
+
+GET /__stats on any port returns request counts and latency percentiles;
+POST /__reset clears them.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import math
+import random
+import time
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+from corpus import generate_postings
+
+VENDORS = ["greenhouse", "lever", "ashby", "workable", "smartrecruiters", "jobvite", "workday"]
+
+# Path templates the harness substitutes for each source's base_url
+BASE_PATHS = {
+    "greenhouse":      "/v1/boards/{company}/jobs?content=false",
+    "lever":           "/v0/postings/{company}?mode=json",
+    "ashby":           "/api/non-user-graphql",
+    "workable":        "/api/v3/accounts/{company}/jobs",
+    "smartrecruiters": "/v1/companies/{company}/postings?status=PUBLIC&limit=100",
+    "jobvite":         "/api/company/{company}/jobs?&callback=",
+    "workday":         "/wday/cxs/{company}/{site}/jobs",
+}
+
+US_COUNTRY_ID = "bc33aa3152ec42d4995f4791a106ed09"
+
+
+def parse_latency(spec):
+    """fixed:S | uniform:A,B | exp:MEAN | lognormal:MU,SIGMA  (seconds)"""
+    kind, _, args = spec.partition(":")
+    nums = [float(x) for x in args.split(",") if x]
+    if kind == "fixed":
+        return lambda rng: nums[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(nums[0], nums[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / nums[0])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(nums[0], nums[1])
+    raise ValueError(f"unknown latency spec: {spec}")
+
+
+def percentiles(values, points=(50, 95, 99)):
+    if not values:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(values)
+    return {
+        f"p{p}": round(ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)], 6)
+        for p in points
+    }
+
+
+class MockATS:
+    def __init__(self, args):
+        self.args      = args
+        self.rng       = random.Random(args.seed)
+        self.latency   = parse_latency(args.latency)
+        lo, _, hi      = args.board_size.partition(":")
+        self.size_lo   = int(lo)
+        self.size_hi   = int(hi or lo)
+        self.outage    = set(filter(None, args.outage.split(",")))
+        self.boards    = {}
+        self.gz_cache  = {}
+        self.link_free = 0.0
+        self.reset()
+
+    def reset(self):
+        self.started   = time.monotonic()
+        self.requests  = {v: 0 for v in VENDORS}
+        self.statuses  = {}
+        self.latencies = []
+        self.bytes_out = 0
+        self.peers     = set()
+
+    # -- board contents ----------------------------------------------------
+    def is_dead(self, vendor, company):
+        return random.Random(f"dead:{vendor}:{company}").random() < self.args.dead_rate
+
+    def board(self, vendor, company):
+        key = (vendor, company)
+        if key not in self.boards:
+            rng  = random.Random(f"size:{vendor}:{company}:{self.args.seed}")
+            size = rng.randint(self.size_lo, self.size_hi)
+            self.boards[key] = generate_postings(vendor, size, self.args.seed, company)
+        return self.boards[key]
+
+    def gzipped(self, body):
+        # Compressed once per distinct body, like a vendor's CDN cache; keeps
+        # the mock's own CPU out of a single-core benchmark
+        if body not in self.gz_cache:
+            self.gz_cache[body] = gzip.compress(body, compresslevel=6)
+        return self.gz_cache[body]
+
+    async def transmit(self, size):
+        # One shared downlink: responses queue behind each other's bytes
+        now = time.monotonic()
+        self.link_free = max(now, self.link_free) + size / (self.args.bandwidth * 1024)
+        await asyncio.sleep(self.link_free - now)
+
+    # -- request plumbing --------------------------------------------------
+    @web.middleware
+    async def handshake(self, request, handler):
+        # Every route, including unknown ones (the scraper's warm-up HEADs)
+        peer = request.transport.get_extra_info("peername")
+        if peer not in self.peers:
+            self.peers.add(peer)
+            await asyncio.sleep(self.args.handshake)
+        return await handler(request)
+
+    def record(self, vendor, status, started, size=0):
+        self.requests[vendor] += 1
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        self.latencies.append(time.monotonic() - started)
+        self.bytes_out += size
+
+    async def respond(self, request, vendor, company, make_body):
+        started = time.monotonic()
+        await asyncio.sleep(max(0.0, self.latency(self.rng)))
+
+        if vendor in self.outage:
+            await asyncio.sleep(self.args.outage_latency)
+            self.record(vendor, 503, started)
+            return web.Response(status=503)
+        if self.is_dead(vendor, company):
+            self.record(vendor, 404, started)
+            return web.Response(status=404)
+        roll = self.rng.random()
+        if roll < self.args.rate_429:
+            self.record(vendor, 429, started)
+            return web.Response(status=429, headers={"Retry-After": str(self.args.retry_after)})
+        if roll < self.args.rate_429 + self.args.error_rate:
+            self.record(vendor, 500, started)
+            return web.Response(status=500)
+
+        body = json.dumps(make_body(self.board(vendor, company))).encode()
+        if self.rng.random() < self.args.slowloris:
+            return await self.slow_loris(request, vendor, body, started)
+
+        headers = {}
+        if self.args.compress and "gzip" in request.headers.get("Accept-Encoding", ""):
+            body    = self.gzipped(body)
+            headers = {"Content-Encoding": "gzip"}
+        if self.args.bandwidth:
+            await self.transmit(len(body))
+        self.record(vendor, 200, started, len(body))
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    async def slow_loris(self, request, vendor, body, started):
+        resp = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await resp.prepare(request)
+        try:
+            for i in range(0, len(body), self.args.slowloris_chunk):
+                await resp.write(body[i:i + self.args.slowloris_chunk])
+                await asyncio.sleep(self.args.slowloris_delay)
+            await resp.write_eof()
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        self.record(vendor, "200-slow", started, len(body))
+        return resp
+
+    # -- vendor handlers ---------------------------------------------------
+    async def greenhouse(self, request):
+        company = request.match_info["company"]
+        return await self.respond(request, "greenhouse", company,
+                                  lambda b: {"jobs": b, "meta": {"total": len(b)}})
+
+    async def lever(self, request):
+        company = request.match_info["company"]
+        skip    = int(request.query.get("skip", 0))
+        limit   = request.query.get("limit")
+        end     = skip + int(limit) if limit else None
+        return await self.respond(request, "lever", company, lambda b: b[skip:end])
+
+    async def ashby(self, request):
+        payload = await request.json()
+        company = payload.get("variables", {}).get("organizationHostedJobsPageName", "")
+        return await self.respond(request, "ashby", company,
+                                  lambda b: {"data": {"jobBoard": {"jobPostings": b}}})
+
+    async def workable(self, request):
+        company = request.match_info["company"]
+        return await self.respond(request, "workable", company,
+                                  lambda b: {"total": len(b), "results": b})
+
+    async def smartrecruiters(self, request):
+        company = request.match_info["company"]
+        offset  = int(request.query.get("offset", 0))
+        limit   = int(request.query.get("limit", 100))
+        return await self.respond(
+            request, "smartrecruiters", company,
+            lambda b: {"offset": offset, "limit": limit, "totalFound": len(b),
+                       "content": b[offset:offset + limit]},
+        )
+
+    async def jobvite(self, request):
+        company = request.match_info["company"]
+        return await self.respond(request, "jobvite", company, lambda b: {"jobs": b})
+
+    async def workday(self, request):
+        company = request.match_info["company"]
+        payload = await request.json()
+        offset  = int(payload.get("offset", 0))
+        limit   = int(payload.get("limit", 20))
+        text    = (payload.get("searchText") or "").lower()
+
+        def body(board):
+            hits = [j for j in board if text in j["title"].lower()] if text else board
+            return {
+                "total":       len(hits),
+                "jobPostings": hits[offset:offset + limit],
+                "facets": [{
+                    "facetParameter": "locationCountry",
+                    "descriptor":     "Country",
+                    "values": [{"descriptor": "United States of America",
+                                "id": US_COUNTRY_ID, "count": len(board)}],
+                }],
+            }
+        return await self.respond(request, "workday", company, body)
+
+    # -- introspection -----------------------------------------------------
+    async def stats(self, request):
+        elapsed = time.monotonic() - self.started
+        total   = sum(self.requests.values())
+        return web.json_response({
+            "at":          datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "elapsed_s":   round(elapsed, 3),
+            "requests":    total,
+            "req_per_sec": round(total / elapsed, 1) if elapsed else None,
+            "by_vendor":   self.requests,
+            "statuses":    self.statuses,
+            "bytes_out":   self.bytes_out,
+            "connections": len(self.peers),
+            "latency_s":   percentiles(self.latencies),
+        })
+
+    async def reset_stats(self, request):
+        self.reset()
+        return web.json_response({"ok": True})
+
+    def app(self):
+        app = web.Application(middlewares=[self.handshake])
+        app.router.add_get("/v1/boards/{company}/jobs", self.greenhouse)
+        app.router.add_get("/v0/postings/{company}", self.lever)
+        app.router.add_post("/api/non-user-graphql", self.ashby)
+        app.router.add_get("/api/v3/accounts/{company}/jobs", self.workable)
+        app.router.add_get("/v1/companies/{company}/postings", self.smartrecruiters)
+        app.router.add_get("/api/company/{company}/jobs", self.jobvite)
+        app.router.add_post("/wday/cxs/{company}/{site}/jobs", self.workday)
+        app.router.add_get("/__stats", self.stats)
+        app.router.add_post("/__reset", self.reset_stats)
+        return app
+
+
+def add_arguments(parser):
+    parser.add_argument("--host",            default="127.0.0.1")
+    parser.add_argument("--port-base",       type=int, default=18080,
+                        help="first port; vendors get consecutive ports in VENDORS order")
+    parser.add_argument("--board-size",      default="20:200", help="postings per board, N or LO:HI")
+    parser.add_argument("--latency",         default="lognormal:-3,0.6",
+                        help="fixed:S | uniform:A,B | exp:MEAN | lognormal:MU,SIGMA")
+    parser.add_argument("--error-rate",      type=float, default=0.0, help="share of 500s")
+    parser.add_argument("--rate-429",        type=float, default=0.0, help="share of 429s")
+    parser.add_argument("--retry-after",     type=int,   default=1)
+    parser.add_argument("--dead-rate",       type=float, default=0.0, help="share of boards that 404")
+    parser.add_argument("--slowloris",       type=float, default=0.0, help="share of trickled bodies")
+    parser.add_argument("--slowloris-chunk", type=int,   default=256)
+    parser.add_argument("--slowloris-delay", type=float, default=0.05)
+    parser.add_argument("--outage",          default="", help="comma-separated vendors that 503")
+    parser.add_argument("--outage-latency",  type=float, default=0.0)
+    parser.add_argument("--handshake",       type=float, default=0.0,
+                        help="seconds added to the first request on each connection")
+    parser.add_argument("--bandwidth",       type=float, default=0.0,
+                        help="KB/s shared by all response bodies (0 = unlimited)")
+    parser.add_argument("--compress",        action="store_true",
+                        help="gzip bodies when the client sends Accept-Encoding: gzip")
+    parser.add_argument("--seed",            type=int,   default=0)
+
+
+async def serve(args):
+    mock   = MockATS(args)
+    runner = web.AppRunner(mock.app(), access_log=None)
+    await runner.setup()
+    for i, vendor in enumerate(VENDORS):
+        await web.TCPSite(runner, args.host, args.port_base + i).start()
+    print(json.dumps({
+        v: f"http://{args.host}:{args.port_base + i}" for i, v in enumerate(VENDORS)
+    }), flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Local stand-ins for the notification sinks: a minimal SMTP server and a
+generic webhook endpoint, so the notifier can be exercised offline.
+
+    python JobScraper/benchmarks/mock_notify_server.py --smtp-port 18125 \\
+        --http-port 18126 --smtp-latency 0.2 --webhook-error-rate 0.05
+
+The SMTP side accepts EHLO / AUTH / MAIL / RCPT / DATA without checking
+anything; the webhook is POST /hook. GET /__stats on the HTTP port returns
+received messages, SMTP connection counts and webhook statuses; POST
+/__reset clears them. Prints the sink settings as JSON once listening.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from aiohttp import web
+
+
+class MockSinks:
+    def __init__(self, args):
+        self.args = args
+        self.rng  = random.Random(args.seed)
+        self.reset()
+
+    def reset(self):
+        self.smtp_connections = 0
+        self.smtp_messages    = []
+        self.webhook_messages = []
+        self.webhook_statuses = {}
+        self.webhook_peers    = set()
+
+    # -- SMTP --------------------------------------------------------------
+    async def smtp_session(self, reader, writer):
+        self.smtp_connections += 1
+        writer.write(b"220 mock ESMTP ready\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            verb = line[:4].upper()
+            if verb == b"EHLO":
+                writer.write(b"250-mock\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif verb == b"AUTH":
+                writer.write(b"235 2.7.0 accepted\r\n")
+            elif verb == b"DATA":
+                writer.write(b"354 end with .\r\n")
+                await writer.drain()
+                data = await reader.readuntil(b"\r\n.\r\n")
+                await asyncio.sleep(self.args.smtp_latency)
+                self.smtp_messages.append({"at": time.time(), "subject": subject_of(data),
+                                           "bytes": len(data)})
+                writer.write(b"250 2.0.0 queued\r\n")
+            elif verb == b"QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:   # HELO, MAIL, RCPT, RSET, NOOP
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+    # -- webhook -----------------------------------------------------------
+    async def hook(self, request):
+        self.webhook_peers.add(request.transport.get_extra_info("peername"))
+        body = await request.json()
+        await asyncio.sleep(self.args.webhook_latency)
+        status = 500 if self.rng.random() < self.args.webhook_error_rate else 204
+        self.webhook_statuses[str(status)] = self.webhook_statuses.get(str(status), 0) + 1
+        if status == 204:
+            self.webhook_messages.append({
+                "at":      time.time(),
+                "subject": body.get("subject") or body.get("text", "").split("\n", 1)[0],
+                "jobs":    len(body.get("jobs", [])),
+            })
+        return web.Response(status=status)
+
+    # -- introspection -----------------------------------------------------
+    async def stats(self, request):
+        return web.json_response({
+            "smtp_connections":    self.smtp_connections,
+            "smtp_messages":       self.smtp_messages,
+            "webhook_connections": len(self.webhook_peers),
+            "webhook_messages":    self.webhook_messages,
+            "webhook_statuses":    self.webhook_statuses,
+        })
+
+    async def reset_stats(self, request):
+        self.reset()
+        return web.json_response({"ok": True})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/hook", self.hook)
+        app.router.add_get("/__stats", self.stats)
+        app.router.add_post("/__reset", self.reset_stats)
+        return app
+
+
+def subject_of(data):
+    for line in data.split(b"\r\n"):
+        if line.lower().startswith(b"subject:"):
+            return line[8:].strip().decode("utf-8", "replace")
+        if not line:
+            break
+    return ""
+
+
+def add_arguments(parser):
+    parser.add_argument("--host",               default="127.0.0.1")
+    parser.add_argument("--smtp-port",          type=int,   default=18125)
+    parser.add_argument("--http-port",          type=int,   default=18126)
+    parser.add_argument("--smtp-latency",       type=float, default=0.0,
+                        help="seconds before each DATA is acknowledged")
+    parser.add_argument("--webhook-latency",    type=float, default=0.0)
+    parser.add_argument("--webhook-error-rate", type=float, default=0.0, help="share of 500s")
+    parser.add_argument("--seed",               type=int,   default=0)
+
+
+async def serve(args):
+    mock   = MockSinks(args)
+    smtp   = await asyncio.start_server(mock.smtp_session, args.host, args.smtp_port)
+    runner = web.AppRunner(mock.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.http_port).start()
+    print(json.dumps({
+        "smtp":    {"type": "smtp", "host": args.host, "port": args.smtp_port, "ssl": False,
+                    "sender": "scraper@example.com", "recipient": "me@example.com"},
+        "webhook": {"type": "webhook", "url": f"http://{args.host}:{args.http_port}/hook"},
+        "stats":   f"http://{args.host}:{args.http_port}",
+    }), flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        smtp.close()
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,43 @@
 import json
 import re
+import argparse
 import asyncio
+import codecs
+import contextvars
+import cProfile
 import aiohttp
+import gzip
 import hashlib
+import heapq
 import logging
+import math
 import os
+import pstats
+import random
+import signal
+import socket
 import smtplib
+import sqlite3
+import subprocess
+import sys
+import threading
 import time
+import tracemalloc
+import zlib
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timezone, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from functools import wraps
+from email.utils import parsedate_to_datetime
+from functools import lru_cache, partial
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+try:
+    import brotli           # optional: "br" response bodies in DecodedResponse
+except ImportError:
+    brotli = None
 
 # =============================================================================
 #  STEP 1 — LOGGING SETUP
@@ -58,6 +85,15 @@ def validate_config(config):
             if key not in ats:
                 errors.append(f"ATS '{name}' missing field: '{key}'")
 
+    for sink in config.get("notifications", {}).get("sinks", []):
+        kind = sink.get("type")
+        if kind not in SINK_FIELDS:
+            errors.append(f"Notification sink has unknown type: '{kind}'")
+            continue
+        for key in SINK_FIELDS[kind]:
+            if key not in sink:
+                errors.append(f"Notification sink '{kind}' missing field: '{key}'")
+
     if errors:
         logger.error("Config validation failed:")
         for e in errors:
@@ -70,11 +106,42 @@ def validate_config(config):
 # =============================================================================
 #  STEP 3 — DATE PARSERS
 # =============================================================================
+# Workday's postedOn: "Posted Today", "Posted Yesterday", "Posted 30+ Days Ago"
+RELATIVE_DATE = re.compile(
+    r"posted\s+(?:(today)|(yesterday)|(\d+)\+?\s+days?\s+ago)", re.I
+)
+
+@lru_cache(maxsize=256)
+def relative_days_ago(value):
+    m = RELATIVE_DATE.search(value)
+    if not m:
+        return None
+    if m.group(1):
+        return 0
+    if m.group(2):
+        return 1
+    return int(m.group(3))
+
+def parse_relative_date(value):
+    # A day label is mapped to the latest time it allows, so a posting that
+    # could still be inside hours_limit is kept: "Today" → now, "Yesterday"
+    # → start of today, "N Days Ago" → N - 1 days ago. Repeats across runs
+    # are dropped by seen_jobs.
+    days = relative_days_ago(str(value))
+    if days is None:
+        return None
+    now = datetime.now(timezone.utc)
+    if days == 1:
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return now - timedelta(days=max(0, days - 1))
+
 def parse_date(value, fmt):
     if not value:
         return None
     try:
-        if fmt == "iso":
+        if fmt == "relative":
+            return parse_relative_date(value) or parse_date(value, "iso")
+        elif fmt == "iso":
             return datetime.fromisoformat(
                 str(value).replace("Z", "+00:00")
             ).astimezone(timezone.utc)
@@ -119,13 +186,11 @@ PYTHON_KEYWORDS = [
     "data engineer", "data scientist", "pyspark"
 ]
 
+CATEGORY_KEYWORDS = [("Java", JAVA_KEYWORDS), ("Python", PYTHON_KEYWORDS)]
+
 def classify_job(title):
-    t = title.lower()
-    if any(k in t for k in JAVA_KEYWORDS):
-        return "Java"
-    if any(k in t for k in PYTHON_KEYWORDS):
-        return "Python"
-    return "Software"
+    matcher = compile_title_matcher((), ())
+    return matcher.category(matcher.scan(title))
 
 
 # =============================================================================
@@ -252,80 +317,418 @@ USA_CONFIRMED = (
     ]
 )
 
+REMOTE_INDICATORS = [
+    "remote - us","remote, us","us remote","remote - united states",
+    "remote, united states","work from home - us","anywhere in the us","remote (us",
+]
+
+# One resolver answers both is_usa_location and extract_state from a single
+# scan over a compiled keyword trie (see trie_pattern in STEP 7). When several
+# state / city / abbreviation entries hit, the earliest table entry wins —
+# the same precedence the original per-table loops had.
+class LocationResolver:
+    def __init__(self):
+        self.tags = {}
+        for rank, kw in enumerate(NON_USA):
+            self.tag(kw, "non_usa", rank)
+        for rank, kw in enumerate(USA_CONFIRMED):
+            self.tag(kw, "usa", rank)
+        for rank, kw in enumerate(REMOTE_INDICATORS):
+            self.tag(kw, "remote", rank)
+        for rank, (kw, state) in enumerate(USA_STATES.items()):
+            self.tag(kw, "state", rank, state)
+        for rank, (kw, state) in enumerate(CITY_TO_STATE.items()):
+            self.tag(kw, "city", rank, state)
+        for rank, (kw, state) in enumerate(STATE_ABBR.items()):
+            self.tag(kw, "abbr", rank, state)
+
+        self.prefixes = {
+            k: [(len(p), p) for p in self.tags if k.startswith(p)]
+            for k in self.tags
+        }
+        self.regex = re.compile("(?=(" + trie_pattern(self.tags) + "))")
+
+    def tag(self, keyword, kind, rank, state=None):
+        self.tags.setdefault(keyword, []).append((kind, rank, state))
+
+    def resolve(self, loc):
+        non_usa = usa = remote = False
+        best    = {"state": None, "city": None, "abbr": None}
+
+        for m in self.regex.finditer(loc):
+            start = m.start()
+            for length, keyword in self.prefixes[m.group(1)]:
+                end = start + length
+                for kind, rank, state in self.tags[keyword]:
+                    if kind == "non_usa":
+                        non_usa = True
+                    elif kind == "usa":
+                        usa = True
+                    elif kind == "remote":
+                        remote = True
+                    else:
+                        # ", ca" must not run into another letter (", canada")
+                        if kind == "abbr" and end < len(loc) and "a" <= loc[end] <= "z":
+                            continue
+                        if best[kind] is None or rank < best[kind][0]:
+                            best[kind] = (rank, state)
+
+        if remote or loc in ("remote", "work from home"):
+            state = "Remote"
+        else:
+            found = best["state"] or best["city"] or best["abbr"]
+            state = found[1] if found else "Other USA"
+        return (usa and not non_usa), state
+
+@lru_cache(maxsize=1)
+def location_resolver():
+    return LocationResolver()
+
+# Bounded LRU keyed by the normalized location string. Location text repeats
+# heavily across boards, so most postings never reach the resolver.
+LOCATION_CACHE_FILE = "location_cache.json"
+LOCATION_CACHE_SIZE = 50_000
+LOCATION_CACHE      = OrderedDict()
+
+def resolve_location(location):
+    loc = str(location).lower().strip()
+    hit = LOCATION_CACHE.get(loc)
+    if hit is not None:
+        LOCATION_CACHE.move_to_end(loc)
+        return hit
+    hit = location_resolver().resolve(loc)
+    LOCATION_CACHE[loc] = hit
+    if len(LOCATION_CACHE) > LOCATION_CACHE_SIZE:
+        LOCATION_CACHE.popitem(last=False)
+    return hit
+
+def location_tables_fingerprint():
+    # Persisted answers are only valid for the tables that produced them
+    tables = [NON_USA, USA_CONFIRMED, REMOTE_INDICATORS,
+              USA_STATES, CITY_TO_STATE, STATE_ABBR]
+    return hashlib.sha1(json.dumps(tables).encode()).hexdigest()
+
+def load_location_cache():
+    if not os.path.exists(LOCATION_CACHE_FILE):
+        return
+    try:
+        with open(LOCATION_CACHE_FILE, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable {LOCATION_CACHE_FILE}: {e}")
+        return
+    if data.get("fingerprint") != location_tables_fingerprint():
+        return
+    for loc, (is_usa, state) in data.get("entries", [])[-LOCATION_CACHE_SIZE:]:
+        LOCATION_CACHE[loc] = (is_usa, state)
+
+def save_location_cache():
+    with open(LOCATION_CACHE_FILE, "w") as f:
+        json.dump({
+            "fingerprint": location_tables_fingerprint(),
+            "entries":     [[loc, list(hit)] for loc, hit in LOCATION_CACHE.items()],
+        }, f)
+
 def is_usa_location(location):
     if not location or str(location).strip() in ("", "Not specified", "None", "null"):
         return False
-    loc = str(location).lower().strip()
-    if any(x in loc for x in NON_USA):
-        return False
-    if any(x in loc for x in USA_CONFIRMED):
-        return True
-    if loc.strip() in ("remote", "anywhere", "worldwide", "global", "work from home"):
-        return False
-    return False
+    return resolve_location(location)[0]
 
 def extract_state(location):
     if not location:
         return "Other USA"
-    loc = location.lower().strip()
-    remote_indicators = [
-        "remote - us","remote, us","us remote","remote - united states",
-        "remote, united states","work from home - us","anywhere in the us","remote (us",
-    ]
-    if any(r in loc for r in remote_indicators):
-        return "Remote"
-    if loc in ("remote", "work from home"):
-        return "Remote"
-    for name, state in USA_STATES.items():
-        if name in loc:
-            return state
-    for city, state in CITY_TO_STATE.items():
-        if city in loc:
-            return state
-    for abbr, state in STATE_ABBR.items():
-        pattern = re.escape(abbr) + r'(?=[^a-z]|$)'
-        if re.search(pattern, loc):
-            return state
-    return "Other USA"
+    return resolve_location(location)[1]
 
 
 # =============================================================================
 #  STEP 7 — KEYWORD FILTER
 # =============================================================================
-def matches_keywords(title, include_kws, exclude_kws):
-    t = title.lower()
-    return (
-        any(k in t for k in include_kws) and
-        not any(k in t for k in exclude_kws)
+# All include / exclude / category keywords are compiled into one regex
+# shaped like a trie, wrapped in a lookahead so finditer() reports the
+# longest keyword starting at every position in a single pass.
+def trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [
+            re.escape(ch) + emit(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+class TitleMatcher:
+    def __init__(self, include, exclude, categories=None, whole_words=False):
+        self.categories  = CATEGORY_KEYWORDS if categories is None else categories
+        self.whole_words = whole_words
+        groups = [("include", include), ("exclude", exclude)] + list(self.categories)
+        self.bits   = {name: 1 << i for i, (name, _) in enumerate(groups)}
+        self.always = 0
+
+        flags = {}
+        for name, kws in groups:
+            for k in kws:
+                k = k.lower()
+                if k:
+                    flags[k] = flags.get(k, 0) | self.bits[name]
+                else:
+                    self.always |= self.bits[name]   # "" in t is always True
+
+        # Any shorter keyword matching at the same start is a prefix of the
+        # longest one, so a hit on `k` implies every keyword that prefixes it.
+        self.prefixes = {
+            k: [(len(p), f) for p, f in flags.items() if k.startswith(p)]
+            for k in flags
+        }
+        self.closure = {}
+        for k, prefixes in self.prefixes.items():
+            mask = 0
+            for _, f in prefixes:
+                mask |= f
+            self.closure[k] = mask
+        self.regex = (
+            re.compile("(?=(" + trie_pattern(flags) + "))") if flags else None
+        )
+
+    def scan(self, title):
+        mask = self.always
+        if self.regex is None:
+            return mask
+        t = title.lower()
+        if not self.whole_words:
+            for m in self.regex.finditer(t):
+                mask |= self.closure[m.group(1)]
+            return mask
+
+        for m in self.regex.finditer(t):
+            start = m.start()
+            if start and t[start - 1].isalnum():
+                continue
+            for length, f in self.prefixes[m.group(1)]:
+                end = start + length
+                if end == len(t) or not t[end].isalnum():
+                    mask |= f
+        return mask
+
+    def category(self, mask):
+        for name, _ in self.categories:
+            if mask & self.bits[name]:
+                return name
+        return "Software"
+
+    def match(self, title):
+        mask = self.scan(title)
+        keep = (
+            bool(mask & self.bits["include"]) and
+            not mask & self.bits["exclude"]
+        )
+        return keep, self.category(mask)
+
+@lru_cache(maxsize=16)
+def compile_title_matcher(include, exclude, whole_words=False):
+    return TitleMatcher(include, exclude, whole_words=whole_words)
+
+def title_matcher(filters):
+    return compile_title_matcher(
+        tuple(filters["keywords"]),
+        tuple(filters["exclude_keywords"]),
+        bool(filters.get("whole_words", False)),
     )
 
+def matches_keywords(title, include_kws, exclude_kws):
+    keep, _ = compile_title_matcher(tuple(include_kws), tuple(exclude_kws)).match(title)
+    return keep
+
 
 # =============================================================================
 #  STEP 8 — DUPLICATE DETECTION ACROSS RUNS
 # =============================================================================
-SEEN_JOBS_FILE = "seen_jobs.json"
+# Seen jobs live in SQLite as 64-bit keys with a first-seen timestamp.
+# Entries older than the TTL are expired at load time and only keys first
+# seen in this run are written back. seen_jobs.json (the old MD5 list) is
+# imported once if present, into a separate legacy table: those hashes were
+# taken over the raw apply_url, so a job misses on its canonical key, is
+# looked up by its legacy key instead and then re-saved under the canonical
+# one. Legacy rows go as they are adopted or expire with the TTL. Instant
+# alerts are recorded in their own table the moment they go out, so a run
+# that dies before saving doesn't alert them again on the next one.
+SEEN_JOBS_FILE     = "seen_jobs.json"
+SEEN_JOBS_DB       = "seen_jobs.db"
+SEEN_JOBS_TTL_DAYS = 30
+
+class SeenJobsStore:
+    def __init__(self, path=SEEN_JOBS_DB, ttl_days=SEEN_JOBS_TTL_DAYS):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " key INTEGER PRIMARY KEY, first_seen INTEGER NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS seen_first_seen ON seen(first_seen)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS legacy_seen ("
+            " key INTEGER PRIMARY KEY, first_seen INTEGER NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS alerted ("
+            " key INTEGER PRIMARY KEY, sent_at INTEGER NOT NULL)"
+        )
+        cutoff = int(time.time() - ttl_days * 86400)
+        with self.conn:
+            self.expired = self.conn.execute(
+                "DELETE FROM seen WHERE first_seen < ?", (cutoff,)
+            ).rowcount
+            self.conn.execute("DELETE FROM legacy_seen WHERE first_seen < ?", (cutoff,))
+            self.conn.execute("DELETE FROM alerted WHERE sent_at < ?", (cutoff,))
+        self.legacy  = self.conn.execute("SELECT COUNT(*) FROM legacy_seen").fetchone()[0]
+        self.new     = {}
+        self.adopted = []
+
+    def __contains__(self, key):
+        if key in self.new:
+            return True
+        row = self.conn.execute(
+            "SELECT 1 FROM seen WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        stored = self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        return stored + len(self.new)
+
+    def add(self, key, first_seen=None):
+        if key not in self.new:
+            self.new[key] = int(first_seen or time.time())
+
+    def import_legacy(self, path):
+        with open(path, "r") as f:
+            hashes = json.load(f)
+        now = int(time.time())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO legacy_seen (key, first_seen) VALUES (?, ?)",
+                ((hash_to_key(bytes.fromhex(h)), now) for h in hashes),
+            )
+        self.legacy = self.conn.execute("SELECT COUNT(*) FROM legacy_seen").fetchone()[0]
+        return len(hashes)
+
+    def adopt_legacy(self, legacy_key, key):
+        # True if legacy_key was imported; the job is then stored under key
+        if not self.legacy:
+            return False
+        row = self.conn.execute(
+            "SELECT first_seen FROM legacy_seen WHERE key = ?", (legacy_key,)
+        ).fetchone()
+        if row is None:
+            return False
+        self.add(key, row[0])
+        self.adopted.append((legacy_key,))
+        return True
+
+    def was_alerted(self, key):
+        row = self.conn.execute(
+            "SELECT 1 FROM alerted WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+    def record_alerts(self, keys):
+        # Committed straight away, unlike self.new; nothing else is pending
+        # on the connection between saves
+        now = int(time.time())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO alerted (key, sent_at) VALUES (?, ?)",
+                ((key, now) for key in keys),
+            )
+
+    def save(self):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen (key, first_seen) VALUES (?, ?)",
+                self.new.items(),
+            )
+            self.conn.executemany("DELETE FROM legacy_seen WHERE key = ?", self.adopted)
+        self.legacy -= len(self.adopted)
+        self.new     = {}
+        self.adopted = []
 
-def load_seen_jobs():
+    def close(self):
+        self.conn.close()
+
+def load_seen_jobs(config=None):
+    settings = (config or {}).get("seen_jobs", {})
+    store    = SeenJobsStore(
+        settings.get("path", SEEN_JOBS_DB),
+        settings.get("ttl_days", SEEN_JOBS_TTL_DAYS),
+    )
+    if store.expired:
+        logger.info(f"Expired {store.expired} seen job hashes older than TTL")
     if os.path.exists(SEEN_JOBS_FILE):
-        with open(SEEN_JOBS_FILE, "r") as f:
-            return set(json.load(f))
-    return set()
+        imported = store.import_legacy(SEEN_JOBS_FILE)
+        os.replace(SEEN_JOBS_FILE, SEEN_JOBS_FILE + ".migrated")
+        logger.info(f"Imported {imported} hashes from {SEEN_JOBS_FILE}")
+    return store
 
 def save_seen_jobs(seen):
-    with open(SEEN_JOBS_FILE, "w") as f:
-        json.dump(list(seen), f)
+    seen.save()
+    seen.close()
+
+# Query params that only identify where a click came from
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "referrer",
+    "source", "src", "gh_src", "lever-source", "lever-origin", "trk",
+    "_hsenc", "_hsmi",
+}
+
+def canonical_url(url):
+    parts = urlsplit(str(url).strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+    return f"//{parts.netloc.lower()}{path}" + (f"?{urlencode(query)}" if query else "")
+
+def hash_to_key(digest):
+    # First 8 bytes as a signed int so it fits SQLite's INTEGER PRIMARY KEY
+    return int.from_bytes(digest[:8], "big", signed=True)
 
 def job_hash(job):
+    key = f"{job['title']}_{job['company']}_{canonical_url(job['apply_url'])}"
+    return hash_to_key(hashlib.md5(key.encode()).digest())
+
+def legacy_job_hash(job):
+    # seen_jobs.json's key: the same MD5, over the raw apply_url
     key = f"{job['title']}_{job['company']}_{job['apply_url']}"
-    return hashlib.md5(key.encode()).hexdigest()
+    return hash_to_key(hashlib.md5(key.encode()).digest())
 
-def filter_new_jobs(all_jobs, seen_jobs):
+def is_seen(job, key, seen_jobs):
+    if key in seen_jobs:
+        return True
+    adopt = getattr(seen_jobs, "adopt_legacy", None)
+    return adopt is not None and adopt(legacy_job_hash(job), key)
+
+def unseen_jobs(jobs, seen_jobs):
     new_jobs = []
-    for job in all_jobs:
+    for job in jobs:
         h = job_hash(job)
-        if h not in seen_jobs:
+        if not is_seen(job, h, seen_jobs):
             new_jobs.append(job)
             seen_jobs.add(h)
+    return new_jobs
+
+def filter_new_jobs(all_jobs, seen_jobs):
+    new_jobs = unseen_jobs(all_jobs, seen_jobs)
     logger.info(
         f"Duplicate filter: {len(all_jobs)} total → "
         f"{len(new_jobs)} new | "
@@ -335,388 +738,2250 @@ def filter_new_jobs(all_jobs, seen_jobs):
 
 
 # =============================================================================
-#  STEP 9 — JOB SCORING
+#  STEP 9 — NEAR-DUPLICATE CLUSTERS (MinHash LSH over title + company)
 # =============================================================================
-def score_job(job, preferences):
-    if not preferences:
-        job["score"] = 0
-        return job
+# The same role often comes back with a reworded title, once per city, or
+# from a company's Greenhouse and Workday boards at once. Each new posting
+# gets a MinHash signature over character trigrams of its normalized title
+# (abbreviations expanded, requisition ids and its own location words
+# stripped). The signature is cut into bands; each band hashed together
+# with the normalized company, category, location and seniority level is
+# an LSH key in near_dupes.db, so a lookup is one indexed probe per band
+# and only postings sharing a band are compared. A candidate must also
+# clear an exact Jaccard check on the normalized title words, so "Software
+# Engineer" and "Software Engineer, Python" stay apart. Matches within a
+# run collapse into one entry listing every URL. A match from an earlier
+# run is dropped only when its normalized title is the same (a repost);
+# otherwise it is logged and kept as a new role.
+NEAR_DUP_DB        = "near_dupes.db"
+NEAR_DUP_THRESHOLD = 0.7
+NEAR_DUP_CONFIRM   = 0.8    # token Jaccard a MinHash candidate must reach
+NEAR_DUP_TTL_DAYS  = 30
+NEAR_DUP_BANDS     = 12
+NEAR_DUP_ROWS      = 4
+NEAR_DUP_PERMS     = NEAR_DUP_BANDS * NEAR_DUP_ROWS
+NEAR_DUP_WORD      = array("I").itemsize
 
-    score = 0
-    title = job["title"].lower()
-
-    for skill in preferences.get("preferred_skills", []):
-        if skill.lower() in title:
-            score += 10
+TITLE_ALIASES = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "eng": "engineer",
+    "engr": "engineer", "swe": "software engineer", "sde": "software engineer",
+    "dev": "developer", "mgr": "manager", "fullstack": "full stack",
+    "i": "1", "ii": "2", "iii": "3", "iv": "4",
+}
+TITLE_NOISE      = {"remote", "hybrid", "onsite", "usa", "us", "and", "the", "of"}
+# A different level is a different role, however similar the rest reads
+TITLE_LEVELS     = {
+    "intern", "junior", "associate", "senior", "staff", "principal", "lead",
+    "distinguished", "manager", "director", "head", "vp", "1", "2", "3", "4", "5",
+}
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "corp", "corporation", "co", "company", "plc", "gmbh", "the"}
 
-    if job.get("state") in preferences.get("preferred_states", []):
-        score += 5
+NEAR_DUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    id         INTEGER PRIMARY KEY,
+    cluster    INTEGER NOT NULL,
+    signature  BLOB NOT NULL,
+    title      TEXT NOT NULL,
+    first_seen INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    key     INTEGER NOT NULL,
+    posting INTEGER NOT NULL,
+    PRIMARY KEY (key, posting)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bands_posting        ON bands(posting);
+CREATE INDEX IF NOT EXISTS postings_first_seen  ON postings(first_seen);
+"""
+# Bumped whenever stored signatures, band keys or columns change meaning
+NEAR_DUP_PARAMS = f"shake128:{NEAR_DUP_BANDS}x{NEAR_DUP_ROWS}x{NEAR_DUP_WORD}:v2"
 
-    if job.get("company") in preferences.get("preferred_companies", []):
-        score += 8
+def title_tokens(title, location=""):
+    words = re.findall(r"[a-z0-9+#]+", str(title).lower())
+    place = set(re.findall(r"[a-z]+", str(location).lower()))
+    tokens = [
+        alias
+        for w in words
+        if w not in place and w not in TITLE_NOISE
+        and not (len(w) >= 4 and any(c.isdigit() for c in w))   # R0012345
+        for alias in TITLE_ALIASES.get(w, w).split()
+    ]
+    return tokens or words
 
-    level = preferences.get("level", "")
-    if level == "senior" and "senior" in title:
-        score += 5
-    if level == "junior" and ("junior" in title or "associate" in title):
-        score += 5
+def company_key(company):
+    words = re.findall(r"[a-z0-9]+", str(company).lower())
+    return " ".join(w for w in words if w not in COMPANY_SUFFIXES) or " ".join(words)
 
-    job["score"] = score
-    return job
+def location_key(job):
+    # The resolved state where there is one, else the location text itself
+    state = job.get("state")
+    if state and state != "Other USA":
+        return state.lower()
+    return " ".join(re.findall(r"[a-z0-9]+", str(job.get("location", "")).lower()))
 
+def title_key(tokens):
+    # Sorted distinct words with a plural "s" dropped: word order and
+    # "Engineers" vs "Engineer" don't make a different role
+    return " ".join(sorted({
+        t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t
+        for t in tokens
+    }))
 
-# =============================================================================
-#  STEP 10 — RETRY DECORATOR
-# =============================================================================
-def retry(max_attempts=3, delay=2):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            for attempt in range(max_attempts):
-                try:
-                    result = func(*args, **kwargs)
-                    if result is not None:
-                        return result
-                except Exception as e:
-                    if attempt == max_attempts - 1:
-                        logger.warning(f"Failed after {max_attempts} attempts: {e}")
-                        return None
-                time.sleep(delay * (2 ** attempt))
-            return None
-        return wrapper
-    return decorator
+def token_jaccard(a, b):
+    a, b = set(a.split()), set(b.split())
+    return len(a & b) / len(a | b) if a or b else 1.0
 
+@lru_cache(maxsize=65536)
+def shingle_hashes(shingle):
+    # One SHAKE digest = PERMS independent hash values; trigrams repeat
+    # across titles, so most lookups are cache hits
+    return tuple(array("I", hashlib.shake_128(shingle.encode()).digest(NEAR_DUP_PERMS * NEAR_DUP_WORD)))
 
-# =============================================================================
-#  STEP 11 — ASYNC FETCH STRATEGIES
-# =============================================================================
-HEADERS = {"User-Agent": "Mozilla/5.0"}
+def minhash_signature(tokens):
+    # Word-boundary trigrams: order-insensitive, tolerant of plurals / typos
+    shingles = {
+        padded[i:i + 3]
+        for token in tokens
+        for padded in (f" {token} ",)
+        for i in range(len(padded) - 2)
+    }
+    return array("I", map(min, zip(*map(shingle_hashes, shingles))))
 
-async def fetch_rest_get_async(session, url):
-    for attempt in range(3):
-        try:
-            async with session.get(
-                url, timeout=aiohttp.ClientTimeout(total=12)
-            ) as r:
-                if r.status == 200:
-                    return await r.json(content_type=None)
-        except Exception as e:
-            if attempt == 2:
-                logger.warning(f"GET failed {url}: {e}")
-            await asyncio.sleep(2 ** attempt)
-    return None
+def band_keys(job, tokens, signature):
+    salt = "|".join((
+        company_key(job["company"]), str(job.get("category", "")).lower(),
+        location_key(job), " ".join(sorted(TITLE_LEVELS.intersection(tokens))),
+    ))
+    return [
+        hash_to_key(hashlib.md5(
+            f"{salt}|{band}|".encode()
+            + signature[band * NEAR_DUP_ROWS:(band + 1) * NEAR_DUP_ROWS].tobytes()
+        ).digest())
+        for band in range(NEAR_DUP_BANDS)
+    ]
 
-async def fetch_graphql_async(session, url, query, company):
-    payload = {
-        "operationName": "ApiJobBoardWithTeams",
-        "query": query,
-        "variables": {"organizationHostedJobsPageName": company}
-    }
-    for attempt in range(3):
-        try:
-            async with session.post(
-                url, json=payload,
-                timeout=aiohttp.ClientTimeout(total=12),
-                headers={"Content-Type": "application/json", **HEADERS}
-            ) as r:
-                if r.status == 200:
-                    data = await r.json(content_type=None)
-                    return (data.get("data", {})
-                                .get("jobBoard", {})
-                                .get("jobPostings", []))
-        except Exception as e:
-            if attempt == 2:
-                logger.warning(f"GraphQL failed {url}: {e}")
-            await asyncio.sleep(2 ** attempt)
-    return None
+def near_duplicate_keys(job):
+    """(signature, band keys, title key) of a posting, as NearDuplicateIndex takes them"""
+    tokens    = title_tokens(job["title"], job.get("location", ""))
+    signature = minhash_signature(tokens)
+    return signature, band_keys(job, tokens, signature), title_key(tokens)
 
-async def fetch_workday_async(session, ats, company_obj, filters):
-    slug     = company_obj["slug"]
-    instance = company_obj["instance"]
-    site     = company_obj["site"]
-    display  = company_obj["display"]
-    url = (
-        f"https://{slug}.wd{instance}.myworkdayjobs.com"
-        f"/wday/cxs/{slug}/{site}/jobs"
-    )
+def signature_similarity(a, b):
+    return sum(map(int.__eq__, a, b)) / len(a)
 
-    all_matched = []
-    seen_titles = set()
-
-    for keyword in ["java", "software engineer", "backend", "python", "full stack"]:
-        payload = {
-            "appliedFacets": {},
-            "limit": 20,
-            "offset": 0,
-            "searchText": keyword
-        }
-        for attempt in range(3):
-            try:
-                async with session.post(
-                    url, json=payload,
-                    timeout=aiohttp.ClientTimeout(total=12),
-                    headers={"Content-Type": "application/json", **HEADERS}
-                ) as r:
-                    if r.status != 200:
-                        break
-                    data      = await r.json(content_type=None)
-                    jobs_list = data.get("jobPostings", [])
-
-                    for job in jobs_list:
-                        title     = job.get("title", "")
-                        date_raw  = job.get("postedOn", "")
-                        location  = job.get("locationsText", "")
-                        ext_path  = job.get("externalPath", "")
-                        apply_url = (
-                            f"https://{slug}.wd{instance}.myworkdayjobs.com{ext_path}"
-                        )
-                        posted_at = parse_date(date_raw, "iso")
-
-                        if not is_within_hours(posted_at, filters["hours_limit"]): continue
-                        if not matches_keywords(title, filters["keywords"],
-                                                filters["exclude_keywords"]): continue
-                        if not is_usa_location(str(location)): continue
-                        if title in seen_titles: continue
-
-                        seen_titles.add(title)
-                        all_matched.append({
-                            "category":  classify_job(title),
-                            "title":     title,
-                            "company":   display,
-                            "ats":       "Workday",
-                            "state":     extract_state(str(location)),
-                            "location":  str(location),
-                            "posted_at": (
-                                posted_at.strftime("%Y-%m-%d %H:%M UTC")
-                                if posted_at else "Unknown"
-                            ),
-                            "apply_url": apply_url,
-                            "score":     0
-                        })
-                    break
-            except Exception as e:
-                if attempt == 2:
-                    logger.warning(f"Workday failed {display}/{keyword}: {e}")
-                await asyncio.sleep(2 ** attempt)
+class NearDuplicateIndex:
+    def __init__(self, path=NEAR_DUP_DB, ttl_days=NEAR_DUP_TTL_DAYS,
+                 threshold=NEAR_DUP_THRESHOLD, confirm=NEAR_DUP_CONFIRM):
+        self.threshold = threshold
+        self.confirm   = confirm
+        self.conn      = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        row    = self.conn.execute("SELECT value FROM meta WHERE name = 'params'").fetchone()
+        cutoff = int(time.time() - ttl_days * 86400)
+        if row is None or row[0] != NEAR_DUP_PARAMS:
+            # Signatures / band keys from other settings aren't comparable
+            with self.conn:
+                self.conn.execute("DROP TABLE IF EXISTS bands")
+                self.conn.execute("DROP TABLE IF EXISTS postings")
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES ('params', ?)",
+                    (NEAR_DUP_PARAMS,),
+                )
+        self.conn.executescript(NEAR_DUP_SCHEMA)
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM bands WHERE posting IN "
+                "(SELECT id FROM postings WHERE first_seen < ?)", (cutoff,)
+            )
+            self.expired = self.conn.execute(
+                "DELETE FROM postings WHERE first_seen < ?", (cutoff,)
+            ).rowcount
 
-    return all_matched
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
 
+    def lookup(self, signature, keys, title):
+        """
+        (cluster id, title key) of the closest indexed posting whose MinHash
+        similarity clears the threshold and whose title words clear the
+        Jaccard confirm check, else None.
+        """
+        rows = self.conn.execute(
+            "SELECT DISTINCT p.cluster, p.signature, p.title FROM bands b"
+            " JOIN postings p ON p.id = b.posting"
+            f" WHERE b.key IN ({', '.join('?' * len(keys))})", keys,
+        ).fetchall()
+        best, best_score = None, self.threshold
+        for cluster, blob, other in rows:
+            score = signature_similarity(signature, array("I", blob))
+            if score >= best_score and token_jaccard(title, other) >= self.confirm:
+                best, best_score = (cluster, other), score
+        return best
 
-# =============================================================================
-#  STEP 12 — PAGINATION SUPPORT
-# =============================================================================
-async def fetch_paginated_async(session, base_url, jobs_key, page_size=50):
-    all_jobs = []
-    offset   = 0
+    def add(self, posting, cluster, signature, keys, title, first_seen=None):
+        # Uncommitted until save(), like SeenJobsStore.new
+        self.conn.execute(
+            "INSERT OR IGNORE INTO postings (id, cluster, signature, title, first_seen)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (posting, cluster, signature.tobytes(), title, int(first_seen or time.time())),
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO bands (key, posting) VALUES (?, ?)",
+            [(key, posting) for key in keys],
+        )
 
-    while True:
-        sep  = "&" if "?" in base_url else "?"
-        url  = f"{base_url}{sep}limit={page_size}&offset={offset}"
-        data = await fetch_rest_get_async(session, url)
+    def save(self):
+        self.conn.commit()
 
-        if not data:
-            break
+    def close(self):
+        self.conn.close()
 
-        jobs = data.get(jobs_key, []) if jobs_key else (
-            data if isinstance(data, list) else []
-        )
-        if not jobs:
-            break
+def load_near_duplicates(config=None):
+    settings = (config or {}).get("near_duplicates", {})
+    if not settings.get("enabled", True):
+        return None
+    index = NearDuplicateIndex(
+        settings.get("path", NEAR_DUP_DB),
+        settings.get("ttl_days", NEAR_DUP_TTL_DAYS),
+        settings.get("threshold", NEAR_DUP_THRESHOLD),
+        settings.get("confirm", NEAR_DUP_CONFIRM),
+    )
+    if index.expired:
+        logger.info(f"Expired {index.expired} near-duplicate signatures older than TTL")
+    return index
 
-        all_jobs.extend(jobs)
+def save_near_duplicates(index):
+    if index is not None:
+        index.save()
+        index.close()
 
-        if len(jobs) < page_size:
-            break
+def merge_posting(entry, job):
+    locations = entry.setdefault("locations", [entry["location"]])
+    urls      = entry.setdefault("apply_urls", [entry["apply_url"]])
+    if job["location"] not in locations:
+        locations.append(job["location"])
+    if job["apply_url"] not in urls:
+        urls.append(job["apply_url"])
+    entry["score"] = max(entry.get("score", 0), job.get("score", 0))
 
-        offset += page_size
-        await asyncio.sleep(0.3)
+def earlier_repost(match, title):
+    # Only a same-title match from an earlier run counts as already alerted
+    return match is not None and match[1] == title
 
-    return all_jobs
+def collapse_near_duplicates(jobs, index):
+    if index is None or not jobs:
+        return jobs
+    clusters  = {}      # cluster id → this run's entry for it
+    collapsed = []
+    merged = alerted = kept = 0
+    for job in jobs:
+        posting                = job_hash(job)
+        signature, keys, title = near_duplicate_keys(job)
+        match                  = index.lookup(signature, keys, title)
+        if match is not None and match[0] not in clusters and not earlier_repost(match, title):
+            logger.info(
+                f"  Near-duplicate kept: '{job['title']}' at {job['company']} "
+                f"resembles an earlier alert ('{match[1]}') but is not a repost"
+            )
+            kept += 1
+            match = None
+        cluster = posting if match is None else match[0]
+        index.add(posting, cluster, signature, keys, title)
+        if match is None:
+            clusters[posting] = job
+            collapsed.append(job)
+        elif cluster in clusters:
+            merge_posting(clusters[cluster], job)
+            merged += 1
+        else:
+            alerted += 1
+    logger.info(
+        f"Near-duplicate filter: {len(jobs)} new → {len(collapsed)} | "
+        f"{merged} merged into clusters | {alerted} reposts of earlier alerts | "
+        f"{kept} similar to earlier alerts kept"
+    )
+    return collapsed
 
 
 # =============================================================================
-#  STEP 13 — PARSE RAW JOB LIST → FILTERED JOBS
+#  STEP 10 — JOB RANKING (BM25 over titles + company / state / level boosts)
 # =============================================================================
-def parse_jobs(jobs_list, ats, company_display, filters, preferences=None):
-    matched = []
-    for job in jobs_list:
-        title     = get_field(job, ats["title_field"]) or ""
-        date_raw  = get_field(job, ats["date_field"])
-        location  = get_field(job, ats["location_field"]) or ""
-        url       = get_field(job, ats["url_field"]) or ""
-        posted_at = parse_date(date_raw, ats["date_format"])
+# "preferences" compiles once into a RankingModel: preferred skills become a
+# weighted term vocabulary compiled into one regex (multi-word skills match
+# across punctuation, and "java" no longer hits "javascript") and the
+# company / state / level preferences become boosts. Skill hits are weighted
+# by BM25, with IDF and average title length from a fixed corpus rather than
+# the batch being ranked: a prior of RANK_PRIOR_DOCS titles plus up to
+# RANK_CORPUS_SIZE titles sampled from fetched boards before the keyword
+# filter (job history only holds postings that passed it, so it would
+# overcount the preferred skills). Once the sample is full it is frozen in
+# RANK_CORPUS_FILE, so a posting's score doesn't depend on what it is ranked
+# with or on how many runs came before, and instant_score keeps its meaning.
+# IDF is scaled so a skill as common as the prior assumes, in a title of
+# average length, earns exactly its weight — scores stay on the additive
+# weights' scale. Each distinct title is scored once and cached. The
+# console listing can then show only the top-k per category / state.
+RANK_SKILL_POINTS     = 10
+RANK_STATE_BOOST      = 5
+RANK_COMPANY_BOOST    = 8
+RANK_LEVEL_BOOST      = 5
+RANK_TITLE_CACHE_SIZE = 100_000
+BM25_K1               = 1.2
+BM25_B                = 0.75
+RANK_PRIOR_DOCS       = 1000    # pseudo-titles behind the corpus statistics
+RANK_PRIOR_DF         = 0.05    # share of them assumed to mention each skill
+RANK_PRIOR_AVGDL      = 4.0     # words per title
+RANK_CORPUS_FILE      = "ranking_corpus.json"
+RANK_CORPUS_SIZE      = 5000    # sampled titles, then the corpus is frozen
+RANK_CORPUS_PER_BOARD = 20
+RANKING_CORPUS        = []      # frozen / filling corpus loaded at startup
+RANKING_SAMPLE        = None    # board → titles sampled this run; None when not sampling
+RANK_LEVEL_TERMS      = {
+    "senior": {"senior", "sr"},
+    "junior": {"junior", "jr", "associate"},
+}
 
-        if not is_within_hours(posted_at, filters["hours_limit"]):      continue
-        if not matches_keywords(title, filters["keywords"],
-                                filters["exclude_keywords"]):           continue
-        if not is_usa_location(str(location)):                          continue
+RANK_TOKEN      = re.compile(r"[a-z0-9+#]+")
+RANK_WORD_CHARS = "[a-z0-9+#]"
 
-        job_entry = {
-            "category":  classify_job(title),
-            "title":     title,
-            "company":   company_display,
-            "ats":       ats["name"],
-            "state":     extract_state(str(location)),
-            "location":  str(location),
-            "posted_at": (
-                posted_at.strftime("%Y-%m-%d %H:%M UTC")
-                if posted_at else "Unknown"
-            ),
-            "apply_url": url,
-            "score":     0
-        }
-        score_job(job_entry, preferences)
-        matched.append(job_entry)
+def rank_tokens(text):
+    return RANK_TOKEN.findall(str(text).lower())
 
-    return matched
+def term_regex(term):
+    # Words of a skill may be split by any run of punctuation in a title
+    return "[^a-z0-9+#]+".join(re.escape(word) for word in term.split())
 
+class RankingModel:
+    def __init__(self, preferences):
+        skills = preferences.get("preferred_skills", [])
+        skills = skills.items() if isinstance(skills, dict) else [(s, 1) for s in skills]
+        boosts = preferences.get("boosts", {})
 
-# =============================================================================
-#  STEP 14 — ASYNC MAIN FETCH ROUTER
-# =============================================================================
-async def fetch_jobs_async(session, ats, company, filters, preferences=None):
-    ftype = ats.get("fetch_type", "rest_get")
+        self.terms   = {}      # normalized skill → column
+        self.weights = []
+        for skill, weight in skills:
+            term = " ".join(rank_tokens(skill))
+            if term and term not in self.terms:
+                self.terms[term] = len(self.weights)
+                self.weights.append(float(weight) * boosts.get("skill", RANK_SKILL_POINTS))
+        self.states        = frozenset(preferences.get("preferred_states", []))
+        self.companies     = frozenset(preferences.get("preferred_companies", []))
+        self.state_boost   = boosts.get("state", RANK_STATE_BOOST)
+        self.company_boost = boosts.get("company", RANK_COMPANY_BOOST)
+        self.level_boost   = boosts.get("level", RANK_LEVEL_BOOST)
+        self.k1            = preferences.get("bm25_k1", BM25_K1)
+        self.b             = preferences.get("bm25_b", BM25_B)
 
-    if ftype == "workday_post":
-        return await fetch_workday_async(session, ats, company, filters)
+        # One regex, one capture group per skill (longest first, so "java ee"
+        # wins over "java") plus one for the level words; group → column,
+        # with None marking the level group
+        level_terms  = RANK_LEVEL_TERMS.get(preferences.get("level", ""), set())
+        groups       = sorted(self.terms.items(), key=lambda kv: -len(kv[0]))
+        alternatives = [f"({term_regex(term)})" for term, _ in groups]
+        self.group_columns = [None] + [column for _, column in groups]
+        if level_terms:
+            alternatives.append("(" + "|".join(sorted(map(re.escape, level_terms))) + ")")
+            self.group_columns.append(None)
+        self.regex = re.compile(
+            f"(?<!{RANK_WORD_CHARS})(?:{'|'.join(alternatives)})(?!{RANK_WORD_CHARS})"
+        ) if alternatives else None
+        self.set_corpus(())
 
-    company_slug    = company
-    company_display = company.upper()
+    def features(self, title):
+        """(word count, level boost, {column: term frequency}) of a title"""
+        lowered = str(title).lower()
+        counts  = {}
+        level   = 0
+        if self.regex is not None:
+            for m in self.regex.finditer(lowered):
+                column = self.group_columns[m.lastindex]
+                if column is None:
+                    level = self.level_boost
+                else:
+                    counts[column] = counts.get(column, 0) + 1
+        return len(lowered.split()), level, counts
 
-    if ftype == "graphql":
-        jobs_list = await fetch_graphql_async(
-            session, ats["base_url"], ats["graphql_query"], company_slug
+    def set_corpus(self, titles):
+        """Fixes IDF / average length from the prior plus `titles`"""
+        n     = RANK_PRIOR_DOCS
+        words = RANK_PRIOR_DOCS * RANK_PRIOR_AVGDL
+        df    = [RANK_PRIOR_DOCS * RANK_PRIOR_DF] * len(self.weights)
+        for title in titles:
+            length, _, counts = self.features(title)
+            n     += 1
+            words += length
+            for column in counts:
+                df[column] += 1
+        prior          = math.log(1 + (1 - RANK_PRIOR_DF) / RANK_PRIOR_DF)
+        self.documents = n
+        self.avgdl     = words / n
+        self.idf       = [math.log(1 + (n - d + 0.5) / (d + 0.5)) / prior for d in df]
+        self.title_scores = {}
+
+    def title_score(self, title):
+        length, level, counts = self.features(title)
+        k1, b = self.k1, self.b
+        norm  = k1 * (1 - b + b * length / self.avgdl)
+        return level + sum(
+            self.weights[column] * self.idf[column] * tf * (k1 + 1) / (tf + norm)
+            for column, tf in counts.items()
         )
-        if jobs_list is None:
-            return []
-        return parse_jobs(jobs_list, ats, company_display, filters, preferences)
 
-    url      = ats["base_url"].replace("{company}", company_slug)
-    jobs_key = ats.get("jobs_key")
+    def score(self, jobs):
+        """Scores for `jobs` in order; each title is scored once per corpus"""
+        cache = self.title_scores
+        if len(cache) >= RANK_TITLE_CACHE_SIZE:
+            cache.clear()
+        states, companies = self.states, self.companies
+        sb, cb = self.state_boost, self.company_boost
+        scores = []
+        for job in jobs:
+            title = job["title"]
+            score = cache.get(title)
+            if score is None:
+                score = cache[title] = self.title_score(title)
+            boost = sb * (job.get("state") in states) + cb * (job.get("company") in companies)
+            scores.append(round(score + boost, 2))
+        return scores
 
-    if ats.get("paginated"):
-        jobs_list = await fetch_paginated_async(session, url, jobs_key)
-    else:
-        data = await fetch_rest_get_async(session, url)
-        if data is None:
-            return []
-        jobs_list = (
-            data.get(jobs_key, []) if jobs_key
-            else (data if isinstance(data, list) else [])
-        )
+@lru_cache(maxsize=4)
+def compile_ranking_model(key):
+    return RankingModel(json.loads(key))
 
-    return parse_jobs(jobs_list, ats, company_display, filters, preferences)
+def ranking_model(preferences):
+    return compile_ranking_model(json.dumps(preferences, sort_keys=True))
 
+def sample_ranking_titles(board, jobs_list, title_field):
+    # Called by parse_jobs before any filter runs; a few titles per board so
+    # the big boards don't make up the whole corpus
+    taken = RANKING_SAMPLE.setdefault(board, [])
+    room  = min(
+        RANK_CORPUS_PER_BOARD - len(taken),
+        RANK_CORPUS_SIZE - len(RANKING_CORPUS) - sum(map(len, RANKING_SAMPLE.values())),
+    )
+    if room > 0:
+        taken.extend(str(get_field(job, title_field) or "") for job in jobs_list[:room])
 
-async def run_all_fetches(config):
-    filters     = config["filters"]
+def load_ranking_corpus(config):
+    """Fixes the ranking statistics from the saved corpus for this run"""
+    global RANKING_CORPUS, RANKING_SAMPLE
     preferences = config.get("preferences")
-    all_jobs    = []
+    if not preferences:
+        RANKING_SAMPLE = None
+        return
+    if os.path.exists(RANK_CORPUS_FILE):
+        try:
+            with open(RANK_CORPUS_FILE, "r") as f:
+                RANKING_CORPUS = json.load(f).get("titles", [])[:RANK_CORPUS_SIZE]
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {RANK_CORPUS_FILE}: {e}")
+    frozen = len(RANKING_CORPUS) >= RANK_CORPUS_SIZE
+    if frozen:
+        RANKING_SAMPLE = None
+    elif RANKING_SAMPLE is None:
+        RANKING_SAMPLE = {}
+    model = ranking_model(preferences)
+    model.set_corpus(RANKING_CORPUS)
+    logger.info(
+        f"Ranking corpus: {len(RANKING_CORPUS)} sampled titles + {RANK_PRIOR_DOCS} prior"
+        f"{' (frozen)' if frozen else ''} | avg title {model.avgdl:.1f} words"
+    )
 
-    connector = aiohttp.TCPConnector(limit=20)
-    async with aiohttp.ClientSession(
-        connector=connector, headers=HEADERS
-    ) as session:
+def save_ranking_corpus():
+    # New samples only count from the next run; scores within a run use the
+    # corpus loaded at startup
+    global RANKING_CORPUS
+    if not RANKING_SAMPLE:
+        return
+    titles = RANKING_CORPUS + [t for taken in RANKING_SAMPLE.values() for t in taken]
+    RANKING_CORPUS = titles[:RANK_CORPUS_SIZE]
+    RANKING_SAMPLE.clear()
+    with open(RANK_CORPUS_FILE, "w") as f:
+        json.dump({"titles": RANKING_CORPUS}, f)
 
-        for ats in config["ats_sources"]:
-            ats_name  = ats["name"]
-            companies = ats["companies"]
-            logger.info(f"[{ats_name}] — {len(companies)} companies")
+def rank_jobs(jobs, preferences):
+    if not jobs:
+        return jobs
+    if not preferences:
+        for job in jobs:
+            job["score"] = 0
+        return jobs
+    model  = ranking_model(preferences)
+    scores = model.score(jobs)
+    for job, score in zip(jobs, scores):
+        job["score"] = score
+    return jobs
 
-            tasks = [
-                fetch_jobs_async(session, ats, company, filters, preferences)
-                for company in companies
-            ]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
 
-            for company, jobs in zip(companies, results):
-                if isinstance(jobs, Exception):
-                    logger.warning(f"  Error fetching {company}: {jobs}")
-                    continue
-                if not jobs:
-                    jobs = []
+# =============================================================================
+#  STEP 11 — RETRY POLICY (decorrelated jitter, Retry-After, circuit breakers)
+# =============================================================================
+# Every fetch strategy sends its requests through RETRY_POLICY.request:
+#   2xx / 3xx / 404 / 410   → handed to the caller (404/410: board is gone)
+#   429 / 5xx               → retried; a Retry-After header holds the whole
+#                             host until then, otherwise decorrelated jitter
+#   timeouts, dropped conns → retried with decorrelated jitter
+#   other 4xx, bad JSON     → not retried (the same request fails the same way)
+# 5xx and transport errors count against the host's circuit breaker: after
+# breaker_failures in a row the host is skipped for breaker_cooldown
+# seconds, then one trial request decides whether it opens again.
+RETRY_DEFAULTS = {
+    "max_attempts":     3,
+    "base_delay":       0.5,
+    "max_delay":        20,
+    "max_retry_after":  60,     # longer Retry-After → skip the host until then
+    "breaker_failures": 5,
+    "breaker_cooldown": 120,
+}
 
-                display = (
-                    company["display"]
-                    if isinstance(company, dict)
-                    else company.upper()
-                )
+def retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
 
-                # Only log companies where jobs were actually found — no "none" noise
-                if jobs:
-                    logger.info(f"  {display:<30} {len(jobs)} found")
+class CircuitBreaker:
+    def __init__(self, failures, cooldown):
+        self.threshold  = failures
+        self.cooldown   = cooldown
+        self.failures   = 0
+        self.opened_at  = None
+        self.trial      = False     # half-open: one request in flight decides
+        self.not_before = 0.0       # host-wide Retry-After hold (monotonic)
+        self.rejected   = 0
 
-                all_jobs.extend(jobs)
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        if self.trial or time.monotonic() - self.opened_at < self.cooldown:
+            self.rejected += 1
+            return False
+        self.trial = True
+        return True
 
-    return all_jobs
+    def success(self):
+        self.failures  = 0
+        self.opened_at = None
+        self.trial     = False
 
+    def failure(self):
+        """Records a failure; True when this one opens the breaker"""
+        self.failures += 1
+        if self.trial or (self.opened_at is None and self.failures >= self.threshold):
+            self.opened_at = time.monotonic()
+            self.trial     = False
+            return True
+        return False
 
-# =============================================================================
-#  STEP 15 — ORGANIZE: Category > State > Jobs
-# =============================================================================
-CATEGORIES = ["Java", "Python", "Software"]
+    def hold(self, seconds):
+        self.not_before = max(self.not_before, time.monotonic() + seconds)
 
-def organize_jobs(all_jobs):
-    result = {cat: {} for cat in CATEGORIES}
+class RetryPolicy:
+    def __init__(self, settings=None, scheduler=None):
+        self.settings  = {**RETRY_DEFAULTS, **(settings or {})}
+        self.scheduler = scheduler  # RequestScheduler whose host limits gate each attempt
+        self.breakers  = {}
+        self.retries  = 0
+        self.opened   = 0
 
-    for job in all_jobs:
-        cat   = job.get("category", "Software")
-        state = job.get("state") or "Other USA"
-        result[cat].setdefault(state, []).append(job)
+    def breaker(self, host):
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(
+                self.settings["breaker_failures"], self.settings["breaker_cooldown"]
+            )
+        return self.breakers[host]
 
-    for cat in CATEGORIES:
-        for state in result[cat]:
-            result[cat][state].sort(
-                key=lambda x: x.get("score", 0), reverse=True
+    def backoff(self, previous):
+        # Decorrelated jitter: each sleep is drawn from [base, 3 × the last one]
+        s = self.settings
+        return min(s["max_delay"], random.uniform(s["base_delay"], previous * 3))
+
+    def slot(self, host):
+        return self.scheduler.limiter(host) if self.scheduler else nullcontext()
+
+    def failed(self, breaker, host):
+        if breaker.failure():
+            self.opened += 1
+            logger.warning(
+                f"Circuit open for {host}: {breaker.failures} failures in a row, "
+                f"skipping it for {self.settings['breaker_cooldown']}s"
             )
 
-    for cat in CATEGORIES:
-        states        = result[cat]
-        sorted_states = sorted([
-            s for s in states if s not in ("Remote", "Other USA")
-        ])
-        if "Other USA" in states:
-            sorted_states.append("Other USA")
-        if "Remote" in states:
-            sorted_states.append("Remote")
-        result[cat] = {s: states[s] for s in sorted_states}
+    async def request(self, url, label, make_request, handle):
+        """
+        Sends make_request() until handle(response) can be called or the
+        attempts run out. Returns handle's result, or None on failure.
+        """
+        s       = self.settings
+        host    = urlsplit(url).netloc
+        breaker = self.breaker(host)
+        delay   = s["base_delay"]
+        error   = None
+        for attempt in range(s["max_attempts"]):
+            hold = breaker.not_before - time.monotonic()
+            if hold > s["max_retry_after"]:
+                breaker.rejected += 1
+                return None
+            if hold > 0:
+                await asyncio.sleep(hold)
+            if not breaker.allow():
+                return None
 
-    return result
+            wait = None
+            try:
+                # The host slot is held for this one attempt, body included
+                async with self.slot(host), MeteredRequest(make_request(), attempt) as r:
+                    if r.status == 429 or r.status >= 500:
+                        error = f"HTTP {r.status}"
+                        wait  = retry_after(r.headers.get("Retry-After"))
+                        if r.status >= 500:
+                            self.failed(breaker, host)
+                        else:
+                            breaker.success()
+                    else:
+                        breaker.success()
+                        if r.status >= 400 and r.status not in NOT_FOUND_STATUS:
+                            logger.warning(f"{label}: HTTP {r.status}, not retrying")
+                            return None
+                        return await handle(DecodedResponse(r))
+            except ValueError as e:
+                logger.warning(f"{label}: unreadable response: {e}")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                error = e
+                self.failed(breaker, host)
+            except asyncio.CancelledError:
+                breaker.trial = False
+                raise
+
+            if attempt == s["max_attempts"] - 1:
+                break
+            self.retries += 1
+            if wait is not None:
+                breaker.hold(wait)      # slept at the top of the next attempt
+                if wait > s["max_retry_after"]:
+                    logger.warning(f"{host}: Retry-After {wait:.0f}s, skipping it until then")
+                    return None
+                continue
+            delay = self.backoff(delay)
+            await asyncio.sleep(delay)
+
+        logger.warning(f"{label} failed after {attempt + 1} attempts: {error}")
+        return None
+
+RETRY_POLICY = RetryPolicy()    # replaced per run by start_retry_policy
+
+def start_retry_policy(config, scheduler=None):
+    global RETRY_POLICY
+    RETRY_POLICY = RetryPolicy(config.get("retry"), scheduler)
+    return RETRY_POLICY
+
+def log_retry_stats(policy):
+    rejected = sum(b.rejected for b in policy.breakers.values())
+    logger.info(
+        f"Retry policy: {policy.retries} retries | {policy.opened} circuits opened | "
+        f"{rejected} requests skipped on open circuits / Retry-After holds"
+    )
 
 
 # =============================================================================
-#  STEP 16 — PRINT RESULTS (console — jobs found only)
+#  STEP 12 — RUN METRICS (per-ATS / per-company, Prometheus + JSON report)
 # =============================================================================
-def print_results(organized):
-    total = sum(
-        len(jobs)
-        for cat_data in organized.values()
-        for jobs in cat_data.values()
-    )
-    print(f"\nJOB SCRAPER  |  USA ONLY  |  Last 24h")
-    print(f"Run time   : {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    print(f"Total jobs : {total}")
-    print("=" * 60)
+# fetch_jobs_async tags each board's task with its (ats, company); requests
+# and parse calls made underneath — including gathered sub-tasks, which
+# inherit the context — are attributed to that source.
+METRICS_PROM_FILE    = "scraper_metrics.prom"
+METRICS_REPORT_FILE  = "run_report.json"
+METRICS_LAG_INTERVAL = 0.1
+DROP_REASONS         = ("hours", "keywords", "location", "duplicate")
+METRICS              = None   # RunMetrics for the current run; None disables
+METRICS_SOURCE       = contextvars.ContextVar("metrics_source", default=("-", "-"))
 
-    for cat in CATEGORIES:
-        cat_jobs  = organized[cat]
-        cat_total = sum(len(j) for j in cat_jobs.values())
-        if cat_total == 0:
-            continue
-        print(f"\n{'=' * 60}")
-        print(f"  CATEGORY: {cat} ({cat_total} jobs)")
-        print(f"{'=' * 60}")
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))]
 
-        for state, jobs in cat_jobs.items():
-            print(f"\n  [{state}] - {len(jobs)} job(s)")
-            print(f"  {'-' * 56}")
-            for i, job in enumerate(jobs, 1):
+class RunMetrics:
+    def __init__(self):
+        self.started  = time.time()
+        self.sources  = {}
+        self.loop_lag = []
+
+    def source(self, key=None):
+        key = key or METRICS_SOURCE.get()
+        s   = self.sources.get(key)
+        if s is None:
+            s = self.sources[key] = {
+                "requests": 0, "retries": 0, "bytes": 0, "decoded_bytes": 0,
+                "statuses": {}, "latency": [], "parse_s": 0.0, "postings": 0, "kept": 0,
+                "dropped": dict.fromkeys(DROP_REASONS, 0),
+            }
+        return s
+
+    def request(self, seconds, status, size, attempt):
+        s = self.source()
+        s["requests"] += 1
+        s["retries"]  += attempt > 0
+        s["bytes"]    += size
+        s["latency"].append(seconds)
+        s["statuses"][str(status)] = s["statuses"].get(str(status), 0) + 1
+
+    def decoded(self, size):
+        self.source()["decoded_bytes"] += size
+
+    def parsed(self, seconds, postings, kept, dropped):
+        s = self.source()
+        s["parse_s"]  += seconds
+        s["postings"] += postings
+        s["kept"]     += kept
+        for reason, n in dropped.items():
+            s["dropped"][reason] += n
+
+class MeteredRequest:
+    # Wraps session.get/post; records latency, status and wire body bytes per attempt
+    def __init__(self, request, attempt=0):
+        self.request  = request
+        self.attempt  = attempt
+        self.response = None
+
+    async def __aenter__(self):
+        self.started = time.perf_counter()
+        try:
+            self.response = await self.request.__aenter__()
+        except BaseException as e:
+            self.record(e)
+            raise
+        return self.response
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            return await self.request.__aexit__(exc_type, exc, tb)
+        finally:
+            self.record(exc)
+
+    def record(self, exc):
+        if METRICS is None:
+            return
+        r = self.response
+        if isinstance(exc, asyncio.TimeoutError):
+            status = "timeout"
+        elif r is None:
+            status = "error"
+        else:
+            status = r.status
+        size = r.content.total_bytes if r is not None else 0
+        METRICS.request(time.perf_counter() - self.started, status, size, self.attempt)
+
+def record_parse(started, postings, kept, dropped):
+    if METRICS is not None:
+        METRICS.parsed(time.perf_counter() - started, postings, kept, dropped)
+    if PROFILER is not None:
+        PROFILER.add("parse", time.perf_counter() - started)
+
+def parse_tally():
+    return {"seconds": 0.0, "postings": 0, "kept": 0, "dropped": dict.fromkeys(DROP_REASONS, 0)}
+
+def record_tally(tally, counted=True):
+    # Parse time is always spent; postings count only if the board is used
+    if METRICS is not None:
+        if counted:
+            METRICS.parsed(tally["seconds"], tally["postings"], tally["kept"], tally["dropped"])
+        else:
+            METRICS.parsed(tally["seconds"], 0, 0, {})
+    if PROFILER is not None:
+        PROFILER.add("parse", tally["seconds"])
+
+def start_metrics(config):
+    global METRICS
+    settings = config.get("metrics", {})
+    METRICS  = RunMetrics() if settings.get("enabled", True) else None
+    return METRICS
+
+async def monitor_loop_lag(metrics, interval=METRICS_LAG_INTERVAL):
+    # How late each sleep wakes up = time the loop spent blocked (parsing etc.)
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        metrics.loop_lag.append(max(0.0, loop.time() - start - interval))
+
+def summarize_sources(sources):
+    total = {
+        "requests": 0, "retries": 0, "bytes": 0, "decoded_bytes": 0, "statuses": {},
+        "latency": [], "parse_s": 0.0, "postings": 0, "kept": 0,
+        "dropped": dict.fromkeys(DROP_REASONS, 0),
+    }
+    for s in sources:
+        for field in ("requests", "retries", "bytes", "decoded_bytes", "parse_s", "postings", "kept"):
+            total[field] += s[field]
+        total["latency"].extend(s["latency"])
+        for status, n in s["statuses"].items():
+            total["statuses"][status] = total["statuses"].get(status, 0) + n
+        for reason, n in s["dropped"].items():
+            total["dropped"][reason] += n
+
+    latency = sorted(total.pop("latency"))
+    total["fetch_s"] = round(sum(latency), 3)
+    total["latency_s"] = {
+        "p50": round(percentile(latency, 50), 4),
+        "p95": round(percentile(latency, 95), 4),
+        "p99": round(percentile(latency, 99), 4),
+        "max": round(latency[-1], 4) if latency else 0.0,
+    }
+    total["parse_s"] = round(total["parse_s"], 4)
+    total["compression_ratio"] = (
+        round(total["decoded_bytes"] / total["bytes"], 2) if total["bytes"] else None
+    )
+    return total
+
+def build_run_report(metrics):
+    by_ats = {}
+    for (ats, company), s in metrics.sources.items():
+        by_ats.setdefault(ats, {})[company] = s
+
+    ats_report = {}
+    for ats, companies in sorted(by_ats.items()):
+        ats_report[ats] = summarize_sources(companies.values())
+        ats_report[ats]["companies"] = {
+            company: summarize_sources([s]) for company, s in sorted(companies.items())
+        }
+
+    flat = [
+        {"ats": ats, "company": company, **summarize_sources([s])}
+        for (ats, company), s in metrics.sources.items()
+    ]
+    lag = sorted(metrics.loop_lag)
+    return {
+        "started_at": datetime.fromtimestamp(metrics.started, timezone.utc).isoformat(),
+        "duration_s": round(time.time() - metrics.started, 3),
+        "totals":     summarize_sources(metrics.sources.values()),
+        "event_loop_lag_s": {
+            "samples": len(lag),
+            "p50": round(percentile(lag, 50), 4),
+            "p99": round(percentile(lag, 99), 4),
+            "max": round(lag[-1], 4) if lag else 0.0,
+        },
+        "slowest_companies": [
+            {k: c[k] for k in ("ats", "company", "fetch_s", "requests", "bytes", "decoded_bytes")}
+            for c in sorted(flat, key=lambda c: c["fetch_s"], reverse=True)[:10]
+        ],
+        "ats": ats_report,
+    }
+
+def prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_prometheus(report):
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP jobscraper_{name} {help_text}")
+        lines.append(f"# TYPE jobscraper_{name} {kind}")
+        for labels, value in samples:
+            tags = ",".join(f'{k}="{prometheus_label(v)}"' for k, v in labels.items())
+            lines.append(f"jobscraper_{name}{{{tags}}} {value}" if tags
+                         else f"jobscraper_{name} {value}")
+
+    ats    = report["ats"]
+    boards = [
+        ({"ats": a, "company": c}, s)
+        for a, r in ats.items() for c, s in r["companies"].items()
+    ]
+    metric("requests_total", "counter", "HTTP requests by ATS and status.", [
+        ({"ats": a, "status": st}, n)
+        for a, r in ats.items() for st, n in sorted(r["statuses"].items())
+    ])
+    metric("request_retries_total", "counter", "Retried request attempts.",
+           [({"ats": a}, r["retries"]) for a, r in ats.items()])
+    metric("request_latency_seconds", "gauge", "Request latency quantiles per ATS.", [
+        ({"ats": a, "quantile": q}, r["latency_s"][k])
+        for a, r in ats.items()
+        for q, k in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"))
+    ])
+    metric("parse_seconds_total", "counter", "Time spent filtering postings.",
+           [({"ats": a}, r["parse_s"]) for a, r in ats.items()])
+    metric("postings_total", "counter", "Postings downloaded, by filter outcome.", [
+        ({"ats": a, "outcome": outcome}, n)
+        for a, r in ats.items()
+        for outcome, n in (("kept", r["kept"]), *r["dropped"].items())
+    ])
+    metric("company_fetch_seconds_total", "counter", "Summed request time per board.",
+           [(labels, s["fetch_s"]) for labels, s in boards])
+    metric("response_bytes_total", "counter", "Body bytes per ATS, on the wire and decoded.", [
+        ({"ats": a, "encoding": encoding}, r[field])
+        for a, r in ats.items()
+        for encoding, field in (("wire", "bytes"), ("decoded", "decoded_bytes"))
+    ])
+    metric("company_bytes_total", "counter", "Body bytes downloaded (on the wire) per board.",
+           [(labels, s["bytes"]) for labels, s in boards])
+    metric("company_decoded_bytes_total", "counter", "Body bytes after decompression per board.",
+           [(labels, s["decoded_bytes"]) for labels, s in boards])
+    metric("company_postings_total", "counter", "Postings downloaded per board.",
+           [(labels, s["postings"]) for labels, s in boards])
+    metric("company_kept_total", "counter", "Postings kept per board.",
+           [(labels, s["kept"]) for labels, s in boards])
+    lag = report["event_loop_lag_s"]
+    metric("event_loop_lag_seconds", "gauge", "Event-loop wake-up delay quantiles.", [
+        ({"quantile": q}, lag[k]) for q, k in (("0.5", "p50"), ("0.99", "p99"), ("1", "max"))
+    ])
+    metric("run_duration_seconds", "gauge", "Wall time of the last run.",
+           [({}, report["duration_s"])])
+    metric("last_run_timestamp_seconds", "gauge", "Unix time the last run finished.",
+           [({}, int(time.time()))])
+    return "\n".join(lines) + "\n"
+
+def write_metrics(config):
+    if METRICS is None:
+        return
+    settings = config.get("metrics", {})
+    report   = build_run_report(METRICS)
+
+    with open(settings.get("report_file", METRICS_REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2)
+
+    # Textfile collectors may read mid-write, so swap the file in atomically
+    prom = settings.get("prometheus_file", METRICS_PROM_FILE)
+    with open(f"{prom}.tmp", "w") as f:
+        f.write(render_prometheus(report))
+    os.replace(f"{prom}.tmp", prom)
+
+    totals = report["totals"]
+    lag    = report["event_loop_lag_s"]
+    logger.info(
+        f"Metrics: {totals['requests']} requests | {totals['retries']} retries | "
+        f"{totals['bytes'] / 2 ** 20:.1f} MB | p95 {totals['latency_s']['p95']:.2f}s | "
+        f"kept {totals['kept']}/{totals['postings']} postings | "
+        f"loop lag p99 {lag['p99'] * 1000:.0f} ms"
+    )
+
+
+# =============================================================================
+#  STEP 13 — HTTP VALIDATOR CACHE (ETag / Last-Modified / body hash)
+# =============================================================================
+# Covers boards fetched with one GET, plain or streamed. Paginated boards,
+# GraphQL and Workday searches take several requests or POSTs per board,
+# none of which stands for the whole board, so they are fetched in full.
+HTTP_CACHE_FILE = "http_cache.json"
+
+# Returned by fetch_rest_get_async when the board has not changed since
+# the last run — either a 304, or a 200 whose body hashes the same.
+NOT_MODIFIED = object()
+
+# Returned when the board itself is gone (404/410, or a GraphQL board that
+# resolves to null) — retrying can't help, so callers give up immediately.
+BOARD_NOT_FOUND  = object()
+NOT_FOUND_STATUS = (404, 410)
+
+def load_http_cache():
+    entries = {}
+    if os.path.exists(HTTP_CACHE_FILE):
+        try:
+            with open(HTTP_CACHE_FILE, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {HTTP_CACHE_FILE}: {e}")
+    return {
+        "entries":     entries,
+        "requests":    0,
+        "hits_304":    0,
+        "hits_hash":   0,
+        "bytes_saved": 0,
+    }
+
+def save_http_cache(cache):
+    with open(HTTP_CACHE_FILE, "w") as f:
+        json.dump(cache["entries"], f)
+
+def log_http_cache_stats(cache):
+    total = cache["requests"]
+    hits  = cache["hits_304"] + cache["hits_hash"]
+    rate  = (100.0 * hits / total) if total else 0.0
+    logger.info(
+        f"HTTP cache: {hits}/{total} boards unchanged ({rate:.0f}%) | "
+        f"304: {cache['hits_304']} | body-hash: {cache['hits_hash']} | "
+        f"{cache['bytes_saved'] / 1024:.0f} KB not downloaded"
+    )
+
+def filters_fingerprint(filters):
+    return hashlib.sha1(
+        json.dumps(filters or {}, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+
+def cache_entry(cache, url, fingerprint):
+    # An unchanged body only means "nothing new" under the filters that parsed
+    # it; after keywords / hours_limit change the board is fetched in full
+    entry = cache["entries"].get(url) if cache is not None else None
+    if entry and entry.get("filters") != fingerprint:
+        return None
+    return entry
+
+def record_cache_response(cache, url, entry, r, digest, size, fingerprint):
+    # Stores the fresh validators; True when the body matches the last run.
+    # Only call once the body has parsed, so a malformed one is never cached
+    cache["requests"] += 1
+    cache["entries"][url] = {
+        "etag":          r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "hash":          digest,
+        "size":          size,
+        "filters":       fingerprint,
+    }
+    if entry and entry.get("hash") == digest:
+        cache["hits_hash"] += 1
+        return True
+    return False
+
+def record_cache_304(cache, entry):
+    cache["requests"]    += 1
+    cache["hits_304"]    += 1
+    cache["bytes_saved"] += entry.get("size", 0)
+
+def conditional_headers(entry):
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+# =============================================================================
+#  STEP 14 — ASYNC FETCH STRATEGIES
+# =============================================================================
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+async def fetch_rest_get_async(session, url, cache=None, filters=None):
+    fingerprint = filters_fingerprint(filters) if cache is not None else None
+    entry       = cache_entry(cache, url, fingerprint)
+    headers     = conditional_headers(entry) if entry else {}
+
+    async def handle(r):
+        if r.status == 304 and entry:
+            record_cache_304(cache, entry)
+            return NOT_MODIFIED
+        if r.status in NOT_FOUND_STATUS:
+            return BOARD_NOT_FOUND
+        if r.status != 200:
+            return None
+        if cache is None:
+            return await r.json()
+        body   = await r.read()
+        digest = hashlib.sha1(body).hexdigest()
+        # A body hashing the same as last run's already parsed once
+        data   = None if entry and entry.get("hash") == digest else json.loads(body)
+        if record_cache_response(cache, url, entry, r, digest, len(body), fingerprint):
+            return NOT_MODIFIED
+        return data
+
+    return await RETRY_POLICY.request(
+        url, f"GET {url}", lambda: session.get(url, headers=headers), handle
+    )
+
+async def fetch_graphql_async(session, url, query, company):
+    payload = {
+        "operationName": "ApiJobBoardWithTeams",
+        "query": query,
+        "variables": {"organizationHostedJobsPageName": company}
+    }
+    async def handle(r):
+        if r.status in NOT_FOUND_STATUS:
+            return BOARD_NOT_FOUND
+        if r.status != 200:
+            return None
+        data  = await r.json()
+        board = (data.get("data") or {}).get("jobBoard")
+        if board is None:
+            return BOARD_NOT_FOUND
+        return board.get("jobPostings") or []
+
+    return await RETRY_POLICY.request(url, f"GraphQL {url}", lambda: session.post(
+        url, json=payload, headers={"Content-Type": "application/json"}
+    ), handle)
+
+WORKDAY_KEYWORDS  = ["java", "software engineer", "backend", "python", "full stack"]
+WORKDAY_PAGE_SIZE = 20   # CXS rejects limit > 20
+WORKDAY_MAX_PAGES = 5
+
+async def fetch_workday_page(session, url, keyword, offset, label,
+                             applied_facets=None):
+    payload = {
+        "appliedFacets": applied_facets or {},
+        "limit": WORKDAY_PAGE_SIZE,
+        "offset": offset,
+        "searchText": keyword
+    }
+    async def handle(r):
+        if r.status in NOT_FOUND_STATUS:
+            return BOARD_NOT_FOUND
+        if r.status != 200:
+            return None
+        return await r.json()
+
+    return await RETRY_POLICY.request(url, f"Workday {label}", lambda: session.post(
+        url, json=payload, headers={"Content-Type": "application/json"}
+    ), handle)
+
+# Per-tenant facet IDs, discovered once and reused across runs so search
+# POSTs can filter by country / posting date server-side.
+WORKDAY_FACETS_FILE     = "workday_facets.json"
+WORKDAY_FACET_TTL_DAYS  = 7
+WORKDAY_FACET_CACHE     = {}
+WORKDAY_US_DESCRIPTORS  = ("united states of america", "united states", "usa", "us")
+WORKDAY_WINDOW          = re.compile(
+    r"(24 hours)|(today)|(yesterday)|(\d+)\s*days?|(week)|(month)", re.I
+)
+
+def load_workday_facets():
+    if os.path.exists(WORKDAY_FACETS_FILE):
+        try:
+            with open(WORKDAY_FACETS_FILE, "r") as f:
+                WORKDAY_FACET_CACHE.update(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {WORKDAY_FACETS_FILE}: {e}")
+
+def save_workday_facets():
+    with open(WORKDAY_FACETS_FILE, "w") as f:
+        json.dump(WORKDAY_FACET_CACHE, f)
+
+def walk_workday_facets(facets):
+    # Facets can nest, e.g. locationMainGroup → locationCountry → values
+    for facet in facets or []:
+        values = facet.get("values", [])
+        yield facet.get("facetParameter", ""), facet.get("descriptor", ""), values
+        yield from walk_workday_facets(
+            [v for v in values if isinstance(v, dict) and "facetParameter" in v]
+        )
+
+def window_days(descriptor):
+    # Whole days a posted-date facet is guaranteed to cover. Calendar labels
+    # ("Today", "Last 7 Days") lose a day: at 01:00 "Today" covers one hour.
+    m = WORKDAY_WINDOW.search(descriptor)
+    if not m:
+        return None
+    if m.group(1):
+        return 1
+    if m.group(2):
+        return 0
+    if m.group(3):
+        return 1
+    if m.group(4):
+        return int(m.group(4)) - 1
+    return 6 if m.group(5) else 29
+
+def discover_workday_facets(facets):
+    found = {"country": None, "posted": None}
+    for param, descriptor, values in walk_workday_facets(facets):
+        label = f"{param} {descriptor}".lower()
+        if "country" in label and found["country"] is None:
+            for v in values:
+                if str(v.get("descriptor", "")).lower() in WORKDAY_US_DESCRIPTORS:
+                    found["country"] = {"param": param, "id": v.get("id")}
+                    break
+        elif "posted" in label and found["posted"] is None:
+            windows = [
+                {"id": v.get("id"), "descriptor": str(v.get("descriptor", ""))}
+                for v in values if v.get("id")
+            ]
+            windows = [w for w in windows if window_days(w["descriptor"]) is not None]
+            if windows:
+                found["posted"] = {"param": param, "windows": windows}
+    return found
+
+async def get_workday_facets(session, url, tenant_key, label):
+    entry = WORKDAY_FACET_CACHE.get(tenant_key)
+    if entry:
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(entry["discovered"])
+        if age < timedelta(days=WORKDAY_FACET_TTL_DAYS):
+            return entry
+
+    data = await fetch_workday_page(session, url, "", 0, f"{label}/facets")
+    if data is BOARD_NOT_FOUND:
+        return None
+    if data is None:
+        return entry or {}
+
+    entry = discover_workday_facets(data.get("facets", []))
+    entry["discovered"] = datetime.now(timezone.utc).isoformat()
+    WORKDAY_FACET_CACHE[tenant_key] = entry
+    return entry
+
+def workday_applied_facets(facets, hours_limit):
+    applied = {}
+    if facets.get("country"):
+        applied[facets["country"]["param"]] = [facets["country"]["id"]]
+    if facets.get("posted"):
+        # Days come from the descriptor so facets cached before window_days
+        # changed are re-read; a window without one is simply not applied
+        needed  = max(1, -(-hours_limit // 24))
+        covered = lambda w: window_days(w.get("descriptor", "")) or 0
+        windows = [w for w in facets["posted"]["windows"] if covered(w) >= needed]
+        if windows:
+            best = min(windows, key=covered)
+            applied[facets["posted"]["param"]] = [best["id"]]
+    return applied
+
+async def search_workday_keyword(session, url, keyword, filters, max_pages, label,
+                                 applied_facets=None):
+    # Page through one keyword's results until a whole page falls outside
+    # hours_limit, the board runs out, or max_pages is reached.
+    found  = []
+    offset = 0
+    total  = None
+
+    for _ in range(max_pages):
+        data = await fetch_workday_page(
+            session, url, keyword, offset, f"{label}/{keyword}", applied_facets
+        )
+        if data is None or data is BOARD_NOT_FOUND:
+            return data if offset == 0 else found
+        if not data:
+            break
+
+        postings = data.get("jobPostings", [])
+        if total is None:
+            total = data.get("total") or 0
+
+        started   = time.perf_counter()
+        in_window = 0
+        for job in postings:
+            posted_at = parse_date(job.get("postedOn", ""), "relative")
+            if is_within_hours(posted_at, filters["hours_limit"]):
+                in_window += 1
+                found.append((job, posted_at))
+        record_parse(started, len(postings), 0, {"hours": len(postings) - in_window})
+
+        offset += WORKDAY_PAGE_SIZE
+        if not in_window or len(postings) < WORKDAY_PAGE_SIZE or offset >= total:
+            break
+
+    return found
+
+WORKDAY_URL = "https://{company}.wd{instance}.myworkdayjobs.com/wday/cxs/{company}/{site}/jobs"
+
+def workday_url(ats, company_obj):
+    return (
+        ats.get("base_url", WORKDAY_URL)
+        .replace("{company}", company_obj["slug"])
+        .replace("{instance}", str(company_obj["instance"]))
+        .replace("{site}", company_obj["site"])
+    )
+
+async def fetch_workday_async(session, ats, company_obj, filters):
+    slug     = company_obj["slug"]
+    site     = company_obj["site"]
+    display  = company_obj["display"]
+    url      = workday_url(ats, company_obj)
+    origin   = "{0.scheme}://{0.netloc}".format(urlsplit(url))
+    keywords  = ats.get("search_keywords") or WORKDAY_KEYWORDS
+    max_pages = ats.get("max_pages", WORKDAY_MAX_PAGES)
+
+    facets  = await get_workday_facets(session, url, f"{slug}/{site}", display)
+    if facets is None:
+        return BOARD_NOT_FOUND
+    applied = workday_applied_facets(facets, filters["hours_limit"])
+    us_only = facets.get("country") is not None
+
+    searches = await asyncio.gather(*[
+        search_workday_keyword(
+            session, url, keyword, filters, max_pages, display, applied
+        )
+        for keyword in keywords
+    ], return_exceptions=True)
+
+    started     = time.perf_counter()
+    matcher     = title_matcher(filters)
+    all_matched = []
+    seen_paths  = set()
+    dropped     = dict.fromkeys(DROP_REASONS, 0)
+
+    for result in searches:
+        if isinstance(result, Exception):
+            logger.warning(f"Workday failed {display}: {result}")
+    answered = [r for r in searches if isinstance(r, list)]
+    if searches and not answered:
+        # No search got through: a gone board if every one 404'd, otherwise
+        # a transport failure that says nothing about the board
+        if all(r is BOARD_NOT_FOUND for r in searches):
+            return BOARD_NOT_FOUND
+        return None
+
+    for result in answered:
+        for job, posted_at in result:
+            title     = job.get("title", "")
+            location  = job.get("locationsText", "")
+            ext_path  = job.get("externalPath", "")
+            apply_url = f"{origin}{ext_path}"
+
+            if ext_path in seen_paths:
+                dropped["duplicate"] += 1
+                continue
+            seen_paths.add(ext_path)
+
+            keep, category = matcher.match(title)
+            if not keep:
+                dropped["keywords"] += 1
+                continue
+            # With the country facet pushed down the server already
+            # restricted to US postings ("2 Locations" etc. included)
+            if not us_only and not is_usa_location(str(location)):
+                dropped["location"] += 1
+                continue
+
+            all_matched.append({
+                "category":  category,
+                "title":     title,
+                "company":   display,
+                "ats":       "Workday",
+                "state":     extract_state(str(location)),
+                "location":  str(location),
+                "posted_at": (
+                    posted_at.strftime("%Y-%m-%d %H:%M UTC")
+                    if posted_at else "Unknown"
+                ),
+                "apply_url": apply_url,
+                "score":     0
+            })
+
+    # Postings were already counted (and hours-filtered) per search page
+    record_parse(started, 0, len(all_matched), dropped)
+    return all_matched
+
+
+# =============================================================================
+#  STEP 15 — STREAMING BOARD PARSER
+# =============================================================================
+# For sources with "stream": true the array under jobs_key (or the top-level
+# array when jobs_key is null) is decoded one posting at a time while the
+# body is still arriving, and each posting is filtered straight away — so a
+# multi-megabyte board never exists in memory as one object tree. When the
+# cache holds a body hash for the URL, the body is held unparsed up to
+# STREAM_HOLD_BYTES until its hash is known, so an unchanged board is never
+# parsed; a longer one streams as usual and, if unchanged after all, is
+# dropped without counting its postings in the run metrics.
+STREAM_CHUNK_SIZE   = 64 * 1024
+STREAM_HOLD_BYTES   = 4 * 2 ** 20
+NUMBER_CONTINUATION = frozenset("0123456789.eE+-")   # can extend a JSON number
+
+class JsonArrayStream:
+    def __init__(self, jobs_key):
+        self.jobs_key = jobs_key
+        self.decoder  = json.JSONDecoder()
+        self.text     = codecs.getincrementaldecoder("utf-8")()
+        self.buf      = ""
+        self.pos      = 0
+        self.state    = "start"
+        self.key      = None
+
+    def feed(self, chunk, final=False):
+        self.buf += self.text.decode(chunk, final)
+        items     = list(self._drain(final))
+        self.buf  = self.buf[self.pos:]
+        self.pos  = 0
+        return items
+
+    def close(self):
+        items = self.feed(b"", final=True)
+        if self.state != "done":
+            raise ValueError(f"truncated JSON stream (state: {self.state})")
+        return items
+
+    def _skip_ws(self):
+        while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+            self.pos += 1
+        return self.buf[self.pos] if self.pos < len(self.buf) else None
+
+    def _value(self, final):
+        # A value ending exactly at the buffer edge may be cut short
+        # ("12" of "1234"), and so may a number followed by a character
+        # that could continue it ("12" of "12.5" when the chunk ends at
+        # ".") — wait for more input in both cases unless at EOF.
+        try:
+            value, end = self.decoder.raw_decode(self.buf, self.pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+        if not final and (end == len(self.buf) or (
+            self.buf[end] in NUMBER_CONTINUATION and isinstance(value, (int, float))
+        )):
+            return False, None
+        self.pos = end
+        return True, value
+
+    def _drain(self, final):
+        while self.state != "done":
+            ch = self._skip_ws()
+            if ch is None:
+                return
+
+            if self.state == "start":
+                expected = "[" if self.jobs_key is None else "{"
+                if ch != expected:
+                    raise ValueError(f"expected '{expected}', got '{ch}'")
+                self.pos  += 1
+                self.state = "array" if self.jobs_key is None else "key"
+
+            elif self.state == "key":
+                if ch in ",}":
+                    self.pos  += 1
+                    if ch == "}":
+                        self.state = "done"
+                    continue
+                start   = self.pos
+                ok, key = self._value(final)
+                if not ok:
+                    return
+                sep = self._skip_ws()
+                if sep is None:
+                    self.pos = start   # ':' not arrived yet — re-read the key
+                    return
+                if sep != ":":
+                    raise ValueError("expected ':' after object key")
+                self.pos  += 1
+                self.key   = key
+                self.state = "value"
+
+            elif self.state == "value":
+                if self.key == self.jobs_key and ch == "[":
+                    self.pos  += 1
+                    self.state = "array"
+                    continue
+                ok, _ = self._value(final)
+                if not ok:
+                    return
+                self.state = "key"
+
+            elif self.state == "array":
+                if ch == ",":
+                    self.pos += 1
+                    continue
+                if ch == "]":
+                    self.pos  += 1
+                    self.state = "done" if self.jobs_key is None else "key"
+                    continue
+                ok, item = self._value(final)
+                if not ok:
+                    return
+                yield item
+
+async def fetch_rest_stream_async(session, url, ats, company_display, filters, cache=None):
+    fingerprint = filters_fingerprint(filters) if cache is not None else None
+    entry       = cache_entry(cache, url, fingerprint)
+    headers     = conditional_headers(entry) if entry else {}
+
+    async def handle(r):
+        if r.status == 304 and entry:
+            record_cache_304(cache, entry)
+            return NOT_MODIFIED
+        if r.status in NOT_FOUND_STATUS:
+            return BOARD_NOT_FOUND
+        if r.status != 200:
+            return None
+
+        stream  = JsonArrayStream(ats.get("jobs_key"))
+        digest  = hashlib.sha1()
+        size    = 0
+        total   = 0
+        matched = []
+        held    = [] if entry and entry.get("hash") else None
+        tally   = parse_tally()
+
+        def parse(chunk):
+            nonlocal total
+            items = stream.feed(chunk)
+            total += len(items)
+            matched.extend(parse_jobs(items, ats, company_display, filters, tally))
+
+        async for chunk in r.iter_chunked(STREAM_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+            if held is None:
+                parse(chunk)
+                continue
+            held.append(chunk)
+            if size > STREAM_HOLD_BYTES:
+                for part in held:
+                    parse(part)
+                held = None
+
+        if held is not None and digest.hexdigest() == entry["hash"]:
+            # Byte-identical to a body that parsed last run
+            record_cache_response(cache, url, entry, r, digest.hexdigest(), size, fingerprint)
+            return NOT_MODIFIED
+        for part in held or []:
+            parse(part)
+        items = stream.close()
+        total += len(items)
+        matched.extend(parse_jobs(items, ats, company_display, filters, tally))
+
+        if cache is not None and record_cache_response(
+            cache, url, entry, r, digest.hexdigest(), size, fingerprint
+        ):
+            record_tally(tally, counted=False)
+            return NOT_MODIFIED
+        record_tally(tally)
+        return matched, total
+
+    return await RETRY_POLICY.request(
+        url, f"GET (stream) {url}", lambda: session.get(url, headers=headers), handle
+    )
+
+# =============================================================================
+#  STEP 16 — PAGINATION SUPPORT
+# =============================================================================
+# Per-ATS "pagination" descriptor, e.g.
+#   {"style": "offset", "page_size": 100, "total_field": "totalFound"}
+#   {"style": "skip",   "page_size": 100}
+#   {"style": "cursor", "cursor_field": "next", "cursor_param": "cursor"}
+# "sort": "date_desc" lets the fetcher stop at the first page that falls
+# entirely outside hours_limit. A bare "paginated": true means offset/limit.
+PAGINATION_DEFAULTS = {
+    "style":        "offset",
+    "limit_param":  "limit",
+    "offset_param": None,
+    "page_size":    50,
+    "total_field":  None,
+    "cursor_field": None,
+    "cursor_param": "cursor",
+    "sort":         None,
+    "max_pages":    20,
+    "concurrency":  4,
+}
+
+def pagination_settings(ats):
+    p = {**PAGINATION_DEFAULTS, **(ats.get("pagination") or {})}
+    if not p["offset_param"]:
+        p["offset_param"] = "skip" if p["style"] == "skip" else "offset"
+    return p
+
+def page_url(base_url, params):
+    # Replaces rather than appends, so "...?limit=100" in base_url is fine
+    parts = urlsplit(base_url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query.update({k: str(v) for k, v in params.items()})
+    return parts._replace(query=urlencode(query)).geturl()
+
+def page_items(data, jobs_key):
+    if not data:
+        return []
+    if jobs_key:
+        return (get_field(data, jobs_key) or []) if isinstance(data, dict) else []
+    return data if isinstance(data, list) else []
+
+def page_outside_window(jobs, ats, hours):
+    return all(
+        not is_within_hours(
+            parse_date(get_field(job, ats["date_field"]), ats["date_format"]), hours
+        )
+        for job in jobs
+    )
+
+async def fetch_cursor_pages(session, base_url, ats, p, hours):
+    all_jobs = []
+    cursor   = None
+    for _ in range(p["max_pages"]):
+        params = {p["limit_param"]: p["page_size"]}
+        if cursor:
+            params[p["cursor_param"]] = cursor
+        data = await fetch_rest_get_async(session, page_url(base_url, params))
+        if not all_jobs and (data is None or data is BOARD_NOT_FOUND):
+            return data     # first page failed: not evidence the board is empty
+        jobs = page_items(data, ats.get("jobs_key"))
+        all_jobs.extend(jobs)
+        if not jobs or (p["sort"] == "date_desc" and page_outside_window(jobs, ats, hours)):
+            break
+        cursor = get_field(data, p["cursor_field"]) if isinstance(data, dict) else None
+        if not cursor:
+            break
+    return all_jobs
+
+async def fetch_paginated_async(session, base_url, ats, filters):
+    p          = pagination_settings(ats)
+    jobs_key   = ats.get("jobs_key")
+    size       = p["page_size"]
+    hours      = filters["hours_limit"]
+    stop_early = p["sort"] == "date_desc"
+
+    if p["style"] == "cursor":
+        return await fetch_cursor_pages(session, base_url, ats, p, hours)
+
+    def fetch_page(offset):
+        return fetch_rest_get_async(session, page_url(base_url, {
+            p["limit_param"]: size, p["offset_param"]: offset
+        }))
+
+    def is_last(jobs):
+        return (
+            len(jobs) < size or
+            (stop_early and page_outside_window(jobs, ats, hours))
+        )
+
+    first = await fetch_page(0)
+    if first is None or first is BOARD_NOT_FOUND:
+        return first        # transport failure or gone board, not an empty one
+    all_jobs = page_items(first, jobs_key)
+    if is_last(all_jobs):
+        return all_jobs
+
+    total = None
+    if p["total_field"] and isinstance(first, dict):
+        total = get_field(first, p["total_field"])
+    limit = size * p["max_pages"]
+    if isinstance(total, int):
+        limit = min(limit, total)
+
+    # With a known total, prefetch the remaining pages `concurrency` at a
+    # time; otherwise walk forward one page at a time until a short page.
+    window  = p["concurrency"] if isinstance(total, int) else 1
+    offsets = list(range(size, limit, size))
+    for i in range(0, len(offsets), window):
+        pages = await asyncio.gather(*[fetch_page(o) for o in offsets[i:i + window]])
+        for data in pages:
+            jobs = page_items(data, jobs_key)
+            all_jobs.extend(jobs)
+            if is_last(jobs):
+                return all_jobs
+
+    return all_jobs
+
+
+# =============================================================================
+#  STEP 17 — PARSE RAW JOB LIST → FILTERED JOBS
+# =============================================================================
+def parse_jobs(jobs_list, ats, company_display, filters, tally=None):
+    started = time.perf_counter()
+    matcher = title_matcher(filters)
+    matched = []
+    dropped = dict.fromkeys(DROP_REASONS, 0)
+    if RANKING_SAMPLE is not None:
+        sample_ranking_titles(f"{ats['name']}|{company_display}", jobs_list, ats["title_field"])
+    for job in jobs_list:
+        title     = get_field(job, ats["title_field"]) or ""
+        date_raw  = get_field(job, ats["date_field"])
+        location  = get_field(job, ats["location_field"]) or ""
+        url       = get_field(job, ats["url_field"]) or ""
+        posted_at = parse_date(date_raw, ats["date_format"])
+
+        if not is_within_hours(posted_at, filters["hours_limit"]):
+            dropped["hours"] += 1
+            continue
+        keep, category = matcher.match(title)
+        if not keep:
+            dropped["keywords"] += 1
+            continue
+        if not is_usa_location(str(location)):
+            dropped["location"] += 1
+            continue
+
+        job_entry = {
+            "category":  category,
+            "title":     title,
+            "company":   company_display,
+            "ats":       ats["name"],
+            "state":     extract_state(str(location)),
+            "location":  str(location),
+            "posted_at": (
+                posted_at.strftime("%Y-%m-%d %H:%M UTC")
+                if posted_at else "Unknown"
+            ),
+            "apply_url": url,
+            "score":     0
+        }
+        matched.append(job_entry)
+
+    if tally is None:
+        record_parse(started, len(jobs_list), len(matched), dropped)
+        return matched
+    # The caller records it once it knows whether the board is used
+    tally["seconds"]  += time.perf_counter() - started
+    tally["postings"] += len(jobs_list)
+    tally["kept"]     += len(matched)
+    for reason, n in dropped.items():
+        tally["dropped"][reason] += n
+    return matched
+
+
+# =============================================================================
+#  STEP 18 — BOARD HEALTH (negative cache for dead / moved boards)
+# =============================================================================
+# Consecutive 404s or empty boards mark an (ats, company) as dead; dead
+# boards are skipped until their re-check time, which doubles after every
+# further miss. Any board that returns postings again is reset.
+BOARD_HEALTH_FILE     = "board_health.json"
+BOARD_PRUNE_REPORT    = "board_prune_report.json"
+BOARD_NOT_FOUND_LIMIT = 2
+BOARD_EMPTY_LIMIT     = 6
+BOARD_RECHECK_HOURS   = 24
+BOARD_RECHECK_MAX     = 24 * 30
+BOARD_HEALTH          = {}
+
+def board_key(ats, company):
+    if isinstance(company, dict):
+        company = f"{company['slug']}/{company.get('site', '')}"
+    return f"{ats['name']}|{company}"
+
+def load_board_health():
+    if os.path.exists(BOARD_HEALTH_FILE):
+        try:
+            with open(BOARD_HEALTH_FILE, "r") as f:
+                BOARD_HEALTH.update(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {BOARD_HEALTH_FILE}: {e}")
+
+def save_board_health():
+    with open(BOARD_HEALTH_FILE, "w") as f:
+        json.dump(BOARD_HEALTH, f, indent=2)
+
+def board_is_due(key):
+    record = BOARD_HEALTH.get(key)
+    return not record or record.get("next_check", 0) <= time.time()
+
+def record_board_fetch(key, result):
+    # Transport errors say nothing about the board; unchanged keeps history
+    if result is BOARD_NOT_FOUND:
+        record_board_health(key, "not_found")
+    elif result is NOT_MODIFIED and key in BOARD_HEALTH:
+        BOARD_HEALTH[key]["last_checked"] = int(time.time())
+
+def record_board_health(key, outcome):
+    now    = int(time.time())
+    record = BOARD_HEALTH.setdefault(key, {"not_found": 0, "empty": 0})
+    record["last_checked"] = now
+
+    if outcome == "ok":
+        record.update(not_found=0, empty=0, status="ok", next_check=0, last_ok=now)
+        return
+    record[outcome] += 1
+
+    misses = max(
+        record["not_found"] - BOARD_NOT_FOUND_LIMIT + 1,
+        record["empty"] - BOARD_EMPTY_LIMIT + 1,
+    )
+    if misses > 0:
+        hours = min(BOARD_RECHECK_HOURS * 2 ** (misses - 1), BOARD_RECHECK_MAX)
+        record["status"]     = "dead" if outcome == "not_found" else "empty"
+        record["next_check"] = now + int(hours * 3600)
+    else:
+        record["status"]     = "suspect"
+        record["next_check"] = 0
+
+def write_prune_report():
+    dead = sorted(
+        (
+            {"board": key, **record}
+            for key, record in BOARD_HEALTH.items()
+            if record.get("status") in ("dead", "empty")
+        ),
+        key=lambda r: (-r["not_found"], -r["empty"], r["board"]),
+    )
+    with open(BOARD_PRUNE_REPORT, "w") as f:
+        json.dump({
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M UTC"),
+            "boards":       dead,
+        }, f, indent=2)
+    if dead:
+        logger.info(
+            f"Board health: {len(dead)} boards look dead or empty "
+            f"— see {BOARD_PRUNE_REPORT}"
+        )
+
+
+# =============================================================================
+#  STEP 19 — GLOBAL REQUEST SCHEDULER (per-host token bucket + in-flight cap)
+# =============================================================================
+# Every (ats, company) task from every source is queued at once. The host
+# limits apply per HTTP request, not per board: RetryPolicy takes a token
+# and an in-flight slot for each attempt (pages, Workday searches and
+# retries included) and frees the slot as soon as that response is read,
+# so a rate-sensitive host never sees more than max_in_flight requests.
+# Override per host in config:
+#   "scheduler": {"default": {...}, "hosts": {"api.lever.co": {"rate": 2}}}
+DEFAULT_HOST_LIMITS = {"rate": 10.0, "burst": 10, "max_in_flight": 8}
+
+class HostLimiter:
+    def __init__(self, rate, burst, max_in_flight):
+        self.rate      = float(rate or 0)
+        self.capacity  = max(1.0, float(burst or 1))
+        self.tokens    = self.capacity
+        self.updated   = time.monotonic()
+        self.in_flight = asyncio.Semaphore(max(1, int(max_in_flight)))
+        self.lock      = asyncio.Lock()
+
+    async def acquire(self):
+        await self.in_flight.acquire()
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            while True:
+                now          = time.monotonic()
+                self.tokens  = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def release(self):
+        self.in_flight.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
+class RequestScheduler:
+    def __init__(self, settings=None):
+        settings       = settings or {}
+        self.defaults  = {**DEFAULT_HOST_LIMITS, **settings.get("default", {})}
+        self.overrides = settings.get("hosts", {})
+        self.limiters  = {}
+        self.tasks     = {}
+        self.coalesced = 0
+
+    def limiter(self, host):
+        if host not in self.limiters:
+            limits = {**self.defaults, **self.overrides.get(host, {})}
+            self.limiters[host] = HostLimiter(
+                limits["rate"], limits["burst"], limits["max_in_flight"]
+            )
+        return self.limiters[host]
+
+    def submit(self, key, make_coro):
+        # Duplicate (ats, company) entries share the first one's task
+        if key in self.tasks:
+            self.coalesced += 1
+            return self.tasks[key]
+        task = asyncio.ensure_future(make_coro())
+        self.tasks[key] = task
+        return task
+
+    def forget(self, key):
+        # Long-running callers drop finished tasks so the next poll re-fetches
+        self.tasks.pop(key, None)
+
+
+def task_key(ats, company):
+    if isinstance(company, dict):
+        return (ats["name"], company["slug"], company.get("site"))
+    return (ats["name"], company.lower())
+
+
+
+# =============================================================================
+#  STEP 20 — HTTP TRANSPORT (per-host pools, DNS cache, warm-up, compression)
+# =============================================================================
+# Fetchers get a Transport instead of a bare ClientSession: one pooled
+# session whose connector caps sockets overall ("limit") and per host
+# ("limit_per_host"), with keep-alive and a DNS cache TTL. Connect / read /
+# total timeouts can be overridden per host under "transport.hosts"; how
+# many requests a host gets at once is the scheduler's max_in_flight. The
+# busiest hosts get DNS + TCP + TLS done up front with a few HEAD requests
+# before the burst. Sessions run with
+# auto_decompress off and DecodedResponse inflates gzip / deflate / br
+# bodies, so run metrics see both wire and decoded bytes per source.
+TRANSPORT_DEFAULTS = {
+    "limit":              64,
+    "limit_per_host":     16,
+    "keepalive_seconds":  30,
+    "dns_cache_seconds":  600,
+    "connect_timeout":    5,
+    "read_timeout":       10,
+    "total_timeout":      15,
+    "compression":        True,
+    "warmup_hosts":       8,
+    "warmup_connections": 2,
+    "hosts":              {},
+}
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+class BodyDecoder:
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.inflate  = None
+        self.finish   = bytes
+        if encoding in ("gzip", "x-gzip", "deflate"):
+            z = zlib.decompressobj(zlib.MAX_WBITS | (16 if "gzip" in encoding else 0))
+            self.inflate, self.finish = z.decompress, z.flush
+        elif encoding == "br" and brotli is not None:
+            self.inflate = brotli.Decompressor().process
+        elif encoding not in ("", "identity"):
+            raise ValueError(f"unsupported Content-Encoding: {encoding}")
+
+    def decode(self, data, final=False):
+        if self.inflate is None:
+            return data
+        try:
+            data = self.inflate(data) + (self.finish() if final else b"")
+        except Exception as e:    # zlib.error / brotli.error
+            raise ValueError(f"corrupt {self.encoding} body: {e}") from e
+        return data
+
+class DecodedResponse:
+    """What RetryPolicy hands to fetch handlers: the body, inflated here"""
+    def __init__(self, response):
+        self.response = response
+        self.status   = response.status
+        self.headers  = response.headers
+        self.decoder  = BodyDecoder(
+            response.headers.get("Content-Encoding", "").strip().lower()
+        )
+
+    def decode(self, data, final=False):
+        data = self.decoder.decode(data, final)
+        if METRICS is not None:
+            METRICS.decoded(len(data))
+        return data
+
+    async def iter_chunked(self, size):
+        async for chunk in self.response.content.iter_chunked(size):
+            data = self.decode(chunk)
+            if data:
+                yield data
+        tail = self.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    async def read(self):
+        return self.decode(await self.response.read(), final=True)
+
+    async def json(self):
+        return json.loads(await self.read())
+
+def client_timeout(settings):
+    return aiohttp.ClientTimeout(
+        total=settings["total_timeout"],
+        connect=settings["connect_timeout"],
+        sock_read=settings["read_timeout"],
+    )
+
+class Transport:
+    def __init__(self, settings=None):
+        self.settings = {**TRANSPORT_DEFAULTS, **(settings or {})}
+        self.client   = None
+        self.timeouts = {
+            host: client_timeout({**self.settings, **overrides})
+            for host, overrides in self.settings["hosts"].items()
+        }
+        self.headers  = {
+            **HEADERS,
+            "Accept-Encoding": ACCEPT_ENCODING if self.settings["compression"] else "identity",
+        }
+
+    def session(self):
+        if self.client is None:
+            s = self.settings
+            self.client = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=s["limit"],
+                    limit_per_host=s["limit_per_host"],
+                    keepalive_timeout=s["keepalive_seconds"],
+                    ttl_dns_cache=s["dns_cache_seconds"],
+                ),
+                timeout=client_timeout(s),
+                headers=self.headers,
+                auto_decompress=False,
+            )
+        return self.client
+
+    def request(self, method, url, kwargs):
+        timeout = self.timeouts.get(urlsplit(url).netloc)
+        if timeout is not None:
+            kwargs.setdefault("timeout", timeout)
+        return self.session().request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, kwargs)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault("allow_redirects", False)     # as ClientSession.head
+        return self.request("HEAD", url, kwargs)
+
+    async def warm(self, origins):
+        """Opens warmup_connections pooled connections to each origin"""
+        async def touch(origin):
+            try:
+                async with self.head(
+                    origin + "/", allow_redirects=False,
+                    timeout=aiohttp.ClientTimeout(total=self.settings["connect_timeout"] * 2),
+                ):
+                    return True
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                return False
+
+        if not origins:
+            return
+        started = time.perf_counter()
+        opened  = await asyncio.gather(*(
+            touch(origin) for origin in origins
+            for _ in range(self.settings["warmup_connections"])
+        ))
+        logger.info(
+            f"Transport: warmed {sum(opened)}/{len(opened)} connections to "
+            f"{len(origins)} hosts in {time.perf_counter() - started:.2f}s"
+        )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+def board_url(ats, company):
+    if isinstance(company, dict):
+        return workday_url(ats, company)
+    return ats["base_url"].replace("{company}", company)
+
+def warmup_origins(boards, limit):
+    # The hosts with the most boards, i.e. the ATS vendor APIs
+    counts = {}
+    for ats, company in boards:
+        parts  = urlsplit(board_url(ats, company))
+        origin = f"{parts.scheme}://{parts.netloc}"
+        counts[origin] = counts.get(origin, 0) + 1
+    return sorted(counts, key=counts.get, reverse=True)[:limit]
+
+
+# =============================================================================
+#  STEP 21 — ASYNC MAIN FETCH ROUTER
+# =============================================================================
+async def fetch_jobs_async(session, ats, company, filters, cache=None):
+    ftype = ats.get("fetch_type", "rest_get")
+    key   = board_key(ats, company)
+    METRICS_SOURCE.set((
+        ats["name"], company["display"] if isinstance(company, dict) else company
+    ))
+
+    if ftype == "workday_post":
+        jobs = await fetch_workday_async(session, ats, company, filters)
+        if jobs is None or jobs is BOARD_NOT_FOUND:
+            record_board_fetch(key, jobs)
+            return []
+        record_board_health(key, "ok")
+        return jobs
+
+    company_slug    = company
+    company_display = company.upper()
+
+    if ftype == "graphql":
+        jobs_list = await fetch_graphql_async(
+            session, ats["base_url"], ats["graphql_query"], company_slug
+        )
+    else:
+        url      = ats["base_url"].replace("{company}", company_slug)
+        jobs_key = ats.get("jobs_key")
+
+        if ats.get("paginated") or ats.get("pagination"):
+            jobs_list = await fetch_paginated_async(session, url, ats, filters)
+        elif ats.get("stream") and "." not in (jobs_key or ""):
+            result = await fetch_rest_stream_async(
+                session, url, ats, company_display, filters, cache
+            )
+            if not isinstance(result, tuple):
+                record_board_fetch(key, result)
+                return []
+            jobs, total = result
+            record_board_health(key, "ok" if total else "empty")
+            return jobs
+        else:
+            data = await fetch_rest_get_async(session, url, cache, filters)
+            if data is None or data is NOT_MODIFIED or data is BOARD_NOT_FOUND:
+                record_board_fetch(key, data)
+                return []
+            jobs_list = (
+                data.get(jobs_key, []) if jobs_key
+                else (data if isinstance(data, list) else [])
+            )
+
+    if jobs_list is None or jobs_list is BOARD_NOT_FOUND:
+        record_board_fetch(key, jobs_list)
+        return []
+    record_board_health(key, "ok" if jobs_list else "empty")
+    return parse_jobs(jobs_list, ats, company_display, filters)
+
+
+def board_finished(on_jobs, task):
+    # Hands each board's postings to on_jobs as soon as its fetch completes
+    if not task.cancelled() and task.exception() is None:
+        on_jobs(task.result() or [])
+
+async def run_all_fetches(config, cache=None, on_jobs=None):
+    filters   = config["filters"]
+    settings  = config.get("scheduler", {})
+    scheduler = RequestScheduler(settings)
+    policy    = start_retry_policy(config, scheduler)
+    all_jobs  = []
+
+    async with Transport(config.get("transport")) as session:
+        boards  = [(ats, company) for ats in config["ats_sources"] for company in ats["companies"]]
+        due     = [board for board in boards if board_is_due(board_key(*board))]
+        skipped = len(boards) - len(due)
+        await session.warm(warmup_origins(due, session.settings["warmup_hosts"]))
+
+        # Queue every source at once so one slow ATS doesn't hold the others
+        queued  = []
+        watched = set()
+        for ats, company in due:
+            key  = task_key(ats, company)
+            task = scheduler.submit(
+                key,
+                lambda ats=ats, company=company: fetch_jobs_async(
+                    session, ats, company, filters, cache
+                )
+            )
+            if on_jobs and key not in watched:
+                watched.add(key)
+                task.add_done_callback(partial(board_finished, on_jobs))
+            queued.append((ats, company, key, task))
+
+        lag_monitor = (
+            asyncio.create_task(monitor_loop_lag(METRICS)) if METRICS else None
+        )
+        await asyncio.gather(
+            *scheduler.tasks.values(), return_exceptions=True
+        )
+        if lag_monitor:
+            lag_monitor.cancel()
+        logger.info(
+            f"Scheduler: {len(scheduler.tasks)} tasks across "
+            f"{len(scheduler.limiters)} hosts | "
+            f"{scheduler.coalesced} duplicate entries coalesced | "
+            f"{skipped} known-dead boards skipped"
+        )
+        log_retry_stats(policy)
+
+        reported    = set()
+        current_ats = None
+        for ats, company, key, task in queued:
+            if ats is not current_ats and ats["companies"]:
+                current_ats = ats
+                logger.info(f"[{ats['name']}] — {len(ats['companies'])} companies")
+            if key in reported:
+                continue
+            reported.add(key)
+
+            if task.exception() is not None:
+                logger.warning(f"  Error fetching {company}: {task.exception()}")
+                continue
+            jobs = task.result() or []
+
+            display = (
+                company["display"]
+                if isinstance(company, dict)
+                else company.upper()
+            )
+
+            # Only log companies where jobs were actually found — no "none" noise
+            if jobs:
+                logger.info(f"  {display:<30} {len(jobs)} found")
+
+            all_jobs.extend(jobs)
+
+    return all_jobs
+
+
+# =============================================================================
+#  STEP 22 — ORGANIZE: Category > State > Jobs
+# =============================================================================
+CATEGORIES = ["Java", "Python", "Software"]
+
+def organize_jobs(all_jobs, top_k=None):
+    result = {cat: {} for cat in CATEGORIES}
+
+    for job in all_jobs:
+        cat   = job.get("category", "Software")
+        state = job.get("state") or "Other USA"
+        result[cat].setdefault(state, []).append(job)
+
+    # With top_k only the best k per bucket are selected (heap, O(n log k))
+    left_out = 0
+    for cat in CATEGORIES:
+        for state, jobs in result[cat].items():
+            if top_k and len(jobs) > top_k:
+                left_out += len(jobs) - top_k
+                result[cat][state] = heapq.nlargest(
+                    top_k, jobs, key=lambda x: x.get("score", 0)
+                )
+            else:
+                jobs.sort(key=lambda x: x.get("score", 0), reverse=True)
+    if left_out:
+        logger.info(
+            f"Ranking: showing the top {top_k} per state, {left_out} lower-ranked "
+            f"only in the output file"
+        )
+
+    for cat in CATEGORIES:
+        states        = result[cat]
+        sorted_states = sorted([
+            s for s in states if s not in ("Remote", "Other USA")
+        ])
+        if "Other USA" in states:
+            sorted_states.append("Other USA")
+        if "Remote" in states:
+            sorted_states.append("Remote")
+        result[cat] = {s: states[s] for s in sorted_states}
+
+    return result
+
+
+# =============================================================================
+#  STEP 23 — PRINT RESULTS (console — jobs found only)
+# =============================================================================
+def print_results(organized):
+    total = sum(
+        len(jobs)
+        for cat_data in organized.values()
+        for jobs in cat_data.values()
+    )
+    print(f"\nJOB SCRAPER  |  USA ONLY  |  Last 24h")
+    print(f"Run time   : {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    print(f"Total jobs : {total}")
+    print("=" * 60)
+
+    for cat in CATEGORIES:
+        cat_jobs  = organized[cat]
+        cat_total = sum(len(j) for j in cat_jobs.values())
+        if cat_total == 0:
+            continue
+        print(f"\n{'=' * 60}")
+        print(f"  CATEGORY: {cat} ({cat_total} jobs)")
+        print(f"{'=' * 60}")
+
+        for state, jobs in cat_jobs.items():
+            print(f"\n  [{state}] - {len(jobs)} job(s)")
+            print(f"  {'-' * 56}")
+            for i, job in enumerate(jobs, 1):
                 score_label = f" [score: {job['score']}]" if job.get("score") else ""
                 print(f"    {i}. {job['title']}{score_label}")
                 print(f"       Company  : {job['company']}")
-                print(f"       Location : {job['location']}")
+                print(f"       Location : {' | '.join(job.get('locations') or [job['location']])}")
                 print(f"       Posted   : {job['posted_at']}")
-                print(f"       Apply    : {job['apply_url']}")
+                urls = job.get("apply_urls") or [job["apply_url"]]
+                print(f"       Apply    : {urls[0]}")
+                for url in urls[1:]:
+                    print(f"                  {url}")
                 print()
 
 def print_summary(organized):
@@ -742,49 +3007,390 @@ def print_summary(organized):
 
 
 # =============================================================================
-#  STEP 17 — EMAIL NOTIFICATION
+#  STEP 24 — NOTIFICATIONS (async queue → SMTP / webhook sinks, digests)
 # =============================================================================
-def send_email_notification(new_jobs, config):
-    email_cfg = config.get("email")
-    if not email_cfg or not new_jobs:
-        return
+# Accepted postings go through one bounded asyncio queue to a worker that
+# sends them to every sink. Postings scoring at least instant_score go out
+# as soon as their board finishes; the rest wait in a digest, flushed every
+# digest_seconds or once digest_max_jobs are waiting, that lists the top
+# digest_max_jobs by score. An instant candidate is dropped if it reposts an
+# earlier alert or near-duplicates one already sent this run, and sent
+# alerts are recorded in seen_jobs.db straight away. Sinks keep their SMTP
+# session / HTTP pool open between messages (one send at a time on the SMTP
+# session). A top-level "email" block still works as an SMTP sink.
+NOTIFY_DEFAULTS = {
+    "queue_size":      1000,
+    "digest_seconds":  300,
+    "digest_max_jobs": 30,
+    "instant_score":   40,
+    "timeout_seconds": 30,
+}
+SMTP_DEFAULTS = {"host": "smtp.gmail.com", "port": 465, "ssl": True, "starttls": False}
+SINK_FIELDS   = {"smtp": ["sender", "recipient"], "webhook": ["url"]}
 
-    body = (
-        f"Found {len(new_jobs)} new USA jobs!\n"
-        f"Run time: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n"
-    )
-    for job in new_jobs[:30]:
-        body += f"{'=' * 50}\n"
-        body += f"Title    : {job['title']}\n"
-        body += f"Company  : {job['company']}\n"
-        body += f"Category : {job['category']}\n"
-        body += f"State    : {job['state']}\n"
-        body += f"Score    : {job.get('score', 0)}\n"
-        body += f"Posted   : {job['posted_at']}\n"
-        body += f"Apply    : {job['apply_url']}\n\n"
-
-    msg            = MIMEMultipart()
-    msg["From"]    = email_cfg["sender"]
-    msg["To"]      = email_cfg["recipient"]
-    msg["Subject"] = (
-        f"{len(new_jobs)} New Jobs — "
-        f"{datetime.now().strftime('%Y-%m-%d')}"
-    )
-    msg.attach(MIMEText(body, "plain"))
+def notify_settings(config):
+    return {**NOTIFY_DEFAULTS, **config.get("notifications", {})}
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(email_cfg["sender"], email_cfg["password"])
-            server.send_message(msg)
-        logger.info(f"Email sent to {email_cfg['recipient']}")
-    except Exception as e:
-        logger.warning(f"Email failed: {e}")
+def job_lines(job):
+    lines = [
+        "=" * 50,
+        f"Title    : {job['title']}",
+        f"Company  : {job['company']}",
+        f"Category : {job['category']}",
+        f"State    : {job['state']}",
+    ]
+    if job.get("locations"):
+        lines.append(f"Locations: {' | '.join(job['locations'])}")
+    lines.append(f"Score    : {job.get('score', 0)}")
+    lines.append(f"Posted   : {job['posted_at']}")
+    for i, url in enumerate(job.get("apply_urls") or [job["apply_url"]]):
+        lines.append(f"{'Apply    :' if i == 0 else ' ' * 10} {url}")
+    lines.append("")
+    return lines
+
+def notification_text(jobs, instant, listed):
+    now     = datetime.now()
+    ranked  = heapq.nlargest(listed, jobs, key=lambda job: job.get("score", 0))
+    if instant and len(jobs) == 1:
+        job     = jobs[0]
+        subject = f"New match: {job['title']} at {job['company']} (score {job.get('score', 0)})"
+    elif instant:
+        subject = f"{len(jobs)} New High-Score Jobs — {now.strftime('%Y-%m-%d %H:%M')}"
+    else:
+        subject = f"{len(jobs)} New Jobs — {now.strftime('%Y-%m-%d')}"
+    lines = [f"Found {len(jobs)} new USA jobs!", f"Run time: {now.strftime('%Y-%m-%d %H:%M')}", ""]
+    for job in ranked:
+        lines.extend(job_lines(job))
+    if len(jobs) > listed:
+        lines.append(f"... and {len(jobs) - listed} more")
+    return subject, "\n".join(lines)
+
+class SmtpSink:
+    name = "smtp"
+
+    def __init__(self, settings):
+        self.settings = {**SMTP_DEFAULTS, **settings}
+        self.server   = None
+        self.connects = 0
+        # Held by the sending thread until it finishes: a send that timed out
+        # keeps running in its thread, and the next one must not share the
+        # connection with it
+        self.lock     = threading.Lock()
+
+    def connect(self):
+        s      = self.settings
+        server = (smtplib.SMTP_SSL if s["ssl"] else smtplib.SMTP)(
+            s["host"], s["port"], timeout=s.get("timeout_seconds", 30)
+        )
+        if s["starttls"]:
+            server.starttls()
+        if s.get("password"):
+            server.login(s.get("username", s["sender"]), s["password"])
+        self.connects += 1
+        return server
+
+    def deliver(self, message):
+        # Reuse the open session; reconnect once if the server dropped it
+        with self.lock:
+            for attempt in range(2):
+                if self.server is None:
+                    self.server = self.connect()
+                try:
+                    self.server.send_message(message)
+                    return
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    self.server = None
+                    if attempt:
+                        raise
+
+    def quit(self):
+        with self.lock:
+            server, self.server = self.server, None
+            if server is not None:
+                try:
+                    server.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+
+    async def send(self, subject, text, jobs):
+        recipient      = self.settings["recipient"]
+        msg            = MIMEMultipart()
+        msg["From"]    = self.settings["sender"]
+        msg["To"]      = recipient if isinstance(recipient, str) else ", ".join(recipient)
+        msg["Subject"] = subject
+        msg.attach(MIMEText(text, "plain"))
+        await asyncio.to_thread(self.deliver, msg)
+
+    async def close(self):
+        await asyncio.to_thread(self.quit)
+
+class WebhookSink:
+    name = "webhook"
+
+    def __init__(self, settings):
+        self.url      = settings["url"]
+        self.headers  = settings.get("headers", {})
+        self.format   = settings.get("format", "json")     # "text": {"text": ...} only
+        self.timeout  = settings.get("timeout_seconds", 30)
+        self.session  = None
+
+    async def send(self, subject, text, jobs):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        payload = (
+            {"text": f"{subject}\n\n{text}"} if self.format == "text"
+            else {"subject": subject, "text": text, "jobs": jobs}
+        )
+        async with self.session.post(self.url, json=payload, headers=self.headers) as r:
+            r.raise_for_status()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+SINK_TYPES = {"smtp": SmtpSink, "webhook": WebhookSink}
+
+def notification_sinks(config):
+    sinks = [
+        SINK_TYPES[sink["type"]](sink)
+        for sink in config.get("notifications", {}).get("sinks", [])
+    ]
+    if config.get("email"):
+        sinks.append(SmtpSink(config["email"]))
+    return sinks
+
+class Notifier:
+    def __init__(self, sinks, settings, alerts=None):
+        self.sinks    = sinks
+        self.settings = settings
+        self.alerts   = alerts     # SeenJobsStore: instant alerts recorded as they go out
+        self.queue    = asyncio.Queue(settings["queue_size"])
+        self.sent     = set()      # job hashes already queued as instant alerts
+        self.clusters = None       # near-duplicate index of those alerts
+        self.messages = 0
+        self.deferred = 0
+        self.worker   = asyncio.create_task(self.run())
+
+    def offer(self, job):
+        """Queue one posting for immediate delivery; never blocks — on a
+        full queue it is left for the digest instead. True unless it was
+        left for the digest."""
+        key = job_hash(job)
+        if self.already_sent(key):
+            return True
+        try:
+            self.queue.put_nowait((job, True))
+        except asyncio.QueueFull:
+            self.deferred += 1
+            return False
+        self.sent.add(key)
+        return True
+
+    def already_sent(self, key):
+        return key in self.sent or (self.alerts is not None and self.alerts.was_alerted(key))
+
+    def run_clusters(self, index):
+        # Instant alerts since the last digest, indexed like `index`, so one
+        # role posted several times in a run is alerted once
+        if self.clusters is None:
+            self.clusters = NearDuplicateIndex(
+                ":memory:", threshold=index.threshold, confirm=index.confirm
+            )
+        return self.clusters
+
+    async def publish(self, jobs):
+        """Queue postings for the digest, skipping ones already sent instantly"""
+        for job in jobs:
+            if not self.already_sent(job_hash(job)):
+                await self.queue.put((job, False))
+        self.sent.clear()
+        if self.clusters is not None:
+            self.clusters.close()
+            self.clusters = None
+
+    async def run(self):
+        digest, deadline = [], None
+        max_jobs = self.settings["digest_max_jobs"]
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                batch = [await asyncio.wait_for(self.queue.get(), timeout)]
+            except asyncio.TimeoutError:
+                await self.flush(digest, False)
+                digest, deadline = [], None
+                continue
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            closing = any(job is None for job, _ in batch)
+            instant = [job for job, now in batch if now and job is not None]
+            digest.extend(job for job, now in batch if not now and job is not None)
+            if instant:
+                await self.flush(instant, True)
+            if digest and deadline is None:
+                deadline = time.monotonic() + self.settings["digest_seconds"]
+            if digest and (closing or len(digest) >= max_jobs):
+                await self.flush(digest, False)
+                digest, deadline = [], None
+            if closing:
+                return
+
+    async def flush(self, jobs, instant):
+        subject, text = notification_text(jobs, instant, self.settings["digest_max_jobs"])
+        results = await asyncio.gather(*(
+            asyncio.wait_for(sink.send(subject, text, jobs), self.settings["timeout_seconds"])
+            for sink in self.sinks
+        ), return_exceptions=True)
+        for sink, result in zip(self.sinks, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Notification via {sink.name} failed: {result!r}")
+        delivered = not all(isinstance(result, BaseException) for result in results)
+        if instant and delivered and self.alerts is not None:
+            self.alerts.record_alerts(job_hash(job) for job in jobs)
+        self.messages += 1
+        logger.info(f"Notified: {subject}")
+
+    async def close(self):
+        await self.queue.put((None, False))
+        await self.worker
+        for sink in self.sinks:
+            await sink.close()
+        if self.deferred:
+            logger.info(f"Notifications: {self.deferred} instant alerts deferred to the digest (queue full)")
+
+def start_notifier(config, seen_jobs=None):
+    sinks = notification_sinks(config)
+    return Notifier(sinks, notify_settings(config), seen_jobs) if sinks else None
+
+def offer_high_scores(notifier, config, seen_jobs, near_dupes, jobs):
+    """Send a finished board's unseen postings that score ≥ instant_score now"""
+    threshold = notifier.settings["instant_score"]
+    if threshold is None or not jobs:
+        return
+    rank_jobs(jobs, config.get("preferences"))
+    for job in jobs:
+        if job["score"] < threshold or is_seen(job, job_hash(job), seen_jobs):
+            continue
+        if near_dupes is None:
+            notifier.offer(job)
+            continue
+        signature, keys, title = near_duplicate_keys(job)
+        if earlier_repost(near_dupes.lookup(signature, keys, title), title):
+            continue
+        clusters = notifier.run_clusters(near_dupes)
+        if clusters.lookup(signature, keys, title) is not None:
+            continue
+        if notifier.offer(job):
+            posting = job_hash(job)
+            clusters.add(posting, posting, signature, keys, title)
 
 
 # =============================================================================
-#  STEP 18 — SAVE OUTPUT JSON
+#  STEP 25 — SAVE OUTPUT (jobs_output.json, or NDJSON + sidecar index)
 # =============================================================================
-def save_output(organized):
+# "output": {"format": "ndjson", "gzip": true} writes one compact JSON line
+# per job, grouped into (category, state) blocks. The sidecar index holds
+# the counts plus each block's byte offset and length, so a reader can
+# get totals without touching the data, or seek straight to one category.
+# With gzip every block is its own gzip member, so offsets stay seekable.
+OUTPUT_JSON_FILE   = "jobs_output.json"
+OUTPUT_NDJSON_FILE = "jobs_output.ndjson"
+OUTPUT_INDEX_FILE  = "jobs_output.index.json"
+
+def output_paths(settings):
+    compress = settings.get("gzip", False)
+    path     = settings.get("path") or (
+        OUTPUT_NDJSON_FILE + (".gz" if compress else "")
+    )
+    return path, settings.get("index_path", OUTPUT_INDEX_FILE), compress
+
+def empty_output_index(path, compress):
+    return {
+        "format":       "ndjson",
+        "path":         path,
+        "gzip":         compress,
+        "generated_at": None,
+        "total_jobs":   0,
+        "by_category":  {cat: {"total": 0, "by_state": {}} for cat in CATEGORIES},
+        "blocks":       [],
+    }
+
+def read_output_index(index_path=OUTPUT_INDEX_FILE):
+    with open(index_path, "r") as f:
+        return json.load(f)
+
+class NdjsonOutput:
+    def __init__(self, settings, append=False):
+        self.path, self.index_path, self.compress = output_paths(settings)
+        self.index = None
+        if append and os.path.exists(self.index_path) and os.path.exists(self.path):
+            self.index = read_output_index(self.index_path)
+        if self.index is None or self.index.get("gzip") != self.compress:
+            self.index = empty_output_index(self.path, self.compress)
+            append     = False
+        self.file = open(self.path, "ab" if append else "wb")
+
+    def write_block(self, category, state, jobs):
+        if not jobs:
+            return
+        data = "".join(
+            json.dumps(job, separators=(",", ":")) + "\n" for job in jobs
+        ).encode()
+        if self.compress:
+            data = gzip.compress(data)
+        offset = self.file.tell()
+        self.file.write(data)
+
+        self.index["blocks"].append({
+            "category": category, "state": state, "count": len(jobs),
+            "offset":   offset,   "length": len(data),
+        })
+        by_cat = self.index["by_category"].setdefault(category, {"total": 0, "by_state": {}})
+        by_cat["total"] += len(jobs)
+        by_cat["by_state"][state] = by_cat["by_state"].get(state, 0) + len(jobs)
+        self.index["total_jobs"] += len(jobs)
+
+    def close(self):
+        self.file.close()
+        self.index["generated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M UTC")
+        with open(f"{self.index_path}.tmp", "w") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+
+def iter_output_jobs(index_path=OUTPUT_INDEX_FILE, category=None, state=None):
+    index = read_output_index(index_path)
+    with open(index["path"], "rb") as f:
+        for block in index["blocks"]:
+            if category and block["category"] != category:
+                continue
+            if state and block["state"] != state:
+                continue
+            f.seek(block["offset"])
+            data = f.read(block["length"])
+            if index["gzip"]:
+                data = gzip.decompress(data)
+            for line in data.splitlines():
+                yield json.loads(line)
+
+def save_output(organized, settings=None, append=False):
+    settings = settings or {}
+    if settings.get("format") == "ndjson":
+        out     = NdjsonOutput(settings, append)
+        written = 0
+        for cat in CATEGORIES:
+            for state, jobs in organized[cat].items():
+                out.write_block(cat, state, jobs)
+                written += len(jobs)
+        out.close()
+        logger.info(
+            f"Saved to {out.path} ({written} new USA jobs"
+            f"{', appended' if append else ''}) | index: {out.index_path}"
+        )
+        return
+
     sorted_jobs = []
     for cat in CATEGORIES:
         for state, jobs in organized[cat].items():
@@ -803,49 +3409,951 @@ def save_output(organized):
         "all_jobs": sorted_jobs
     }
 
-    with open("jobs_output.json", "w") as f:
+    with open(OUTPUT_JSON_FILE, "w") as f:
         json.dump(output, f, indent=2)
 
-    logger.info(f"Saved to jobs_output.json ({len(sorted_jobs)} new USA jobs)")
+    logger.info(f"Saved to {OUTPUT_JSON_FILE} ({len(sorted_jobs)} new USA jobs)")
+
+
+# =============================================================================
+#  STEP 26 — JOB HISTORY (SQLite + FTS5, `job_scraper.py query`)
+# =============================================================================
+# Every accepted posting is upserted once per run into job_history.db, so
+# results outlive jobs_output.json. Filter columns are indexed and titles
+# go into an FTS5 index kept in sync by triggers; on an SQLite built
+# without FTS5, title search falls back to LIKE.
+JOB_HISTORY_DB = "job_history.db"
+
+JOB_HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id         INTEGER PRIMARY KEY,
+    title      TEXT NOT NULL,
+    company    TEXT COLLATE NOCASE,
+    ats        TEXT COLLATE NOCASE,
+    category   TEXT COLLATE NOCASE,
+    state      TEXT COLLATE NOCASE,
+    location   TEXT,
+    posted_at  TEXT,
+    posted_ts  INTEGER,
+    apply_url  TEXT,
+    score      INTEGER,
+    first_seen INTEGER NOT NULL,
+    last_seen  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_company   ON jobs(company);
+CREATE INDEX IF NOT EXISTS jobs_ats       ON jobs(ats);
+CREATE INDEX IF NOT EXISTS jobs_category  ON jobs(category);
+CREATE INDEX IF NOT EXISTS jobs_state     ON jobs(state);
+CREATE INDEX IF NOT EXISTS jobs_posted_ts ON jobs(posted_ts);
+"""
+
+JOB_HISTORY_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, content='jobs', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, title) VALUES (new.id, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title) VALUES ('delete', old.id, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    INSERT INTO jobs_fts(rowid, title) VALUES (new.id, new.title);
+END;
+"""
+
+JOB_HISTORY_UPSERT = """
+INSERT INTO jobs (id, title, company, ats, category, state, location,
+                  posted_at, posted_ts, apply_url, score, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET last_seen = excluded.last_seen,
+                              score     = excluded.score
+"""
+
+JOB_HISTORY_COLUMNS = (
+    "title", "company", "ats", "category", "state", "location",
+    "posted_at", "apply_url", "score", "first_seen", "last_seen",
+)
+
+def posted_timestamp(posted_at, fallback):
+    try:
+        return int(datetime.strptime(posted_at, "%Y-%m-%d %H:%M UTC")
+                   .replace(tzinfo=timezone.utc).timestamp())
+    except (TypeError, ValueError):
+        return fallback
+
+def fts_query(text):
+    # Quote each word so user input can't be parsed as FTS5 operators
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", text))
+
+class JobHistory:
+    def __init__(self, path=JOB_HISTORY_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(JOB_HISTORY_SCHEMA)
+        try:
+            self.conn.executescript(JOB_HISTORY_FTS)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+
+    def record(self, jobs, now=None):
+        now  = int(now or time.time())
+        rows = [
+            (
+                job_hash(job), job["title"], job["company"], job["ats"],
+                job.get("category"), job.get("state"), job.get("location"),
+                job.get("posted_at"), posted_timestamp(job.get("posted_at"), now),
+                job.get("apply_url"), job.get("score", 0), now, now,
+            )
+            for job in jobs
+        ]
+        with self.conn:
+            self.conn.executemany(JOB_HISTORY_UPSERT, rows)
+        return len(rows)
+
+    def search(self, text=None, company=None, ats=None, category=None,
+               state=None, days=None, limit=50):
+        where, params = [], []
+        if text and self.fts:
+            where.append("id IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)")
+            params.append(fts_query(text))
+        elif text:
+            for word in re.findall(r"\w+", text):
+                where.append("title LIKE ?")
+                params.append(f"%{word}%")
+        for column, value in (
+            ("company", company), ("ats", ats), ("category", category), ("state", state)
+        ):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if days:
+            where.append("posted_ts >= ?")
+            params.append(int(time.time() - days * 86400))
+
+        sql = (
+            f"SELECT {', '.join(JOB_HISTORY_COLUMNS)} FROM jobs"
+            + (f" WHERE {' AND '.join(where)}" if where else "")
+            + " ORDER BY posted_ts DESC LIMIT ?"
+        )
+        rows = self.conn.execute(sql, (*params, limit)).fetchall()
+        return [dict(zip(JOB_HISTORY_COLUMNS, row)) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+def record_job_history(config, jobs):
+    settings = config.get("history", {})
+    if not settings.get("enabled", True) or not jobs:
+        return
+    path    = settings.get("path", JOB_HISTORY_DB)
+    history = JobHistory(path)
+    try:
+        recorded = history.record(jobs)
+    finally:
+        history.close()
+    logger.info(f"Job history: {recorded} postings recorded in {path}")
+
+def run_query(args):
+    path = args.db
+    if not path:
+        try:
+            path = load_config(CONFIG_PATH).get("history", {}).get("path", JOB_HISTORY_DB)
+        except (OSError, ValueError):
+            path = JOB_HISTORY_DB
+    if not os.path.exists(path):
+        raise SystemExit(f"No job history at {path}")
+
+    history = JobHistory(path)
+    started = time.perf_counter()
+    try:
+        jobs = history.search(
+            " ".join(args.text), args.company, args.ats, args.category,
+            args.state, args.days, args.limit,
+        )
+    finally:
+        history.close()
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        for job in jobs:
+            print(json.dumps(job))
+        return
+    for job in jobs:
+        print(f"{job['posted_at'] or 'Unknown':<21} {job['company'][:20]:<20} "
+              f"{(job['state'] or '-')[:14]:<14} {job['title']}")
+        print(f"{'':<21} {job['apply_url']}")
+    print(f"\n{len(jobs)} job(s) in {elapsed * 1000:.1f} ms")
+
+
+# =============================================================================
+#  STEP 27 — PROFILING MODE (--profile)
+# =============================================================================
+# Off by default: profile_stage() hands back a shared nullcontext and the
+# parse hook is a single None check. With --profile every stage is timed;
+# "cpu" adds a cProfile per stage, "memory" a tracemalloc diff per stage.
+PROFILE_REPORT_FILE = "profile_report.json"
+PROFILE_TOP_N       = 15
+PROFILER            = None
+NO_PROFILE          = nullcontext()
+
+class StageProfiler:
+    def __init__(self, cpu=False, memory=False):
+        self.cpu     = cpu
+        self.memory  = memory
+        self.started = time.perf_counter()
+        self.stages  = {}
+        self.order   = []
+        if memory:
+            tracemalloc.start()
+
+    def entry(self, name):
+        if name not in self.stages:
+            self.order.append(name)
+            self.stages[name] = {"seconds": 0.0, "calls": 0}
+        return self.stages[name]
+
+    def add(self, name, seconds):
+        # For work interleaved with another stage (parse runs inside fetch)
+        entry = self.entry(name)
+        entry["seconds"] += seconds
+        entry["calls"]   += 1
+
+    @contextmanager
+    def stage(self, name):
+        entry   = self.entry(name)
+        profile = cProfile.Profile() if self.cpu else None
+        if self.memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+        if profile:
+            profile.enable()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry["seconds"] += time.perf_counter() - started
+            entry["calls"]   += 1
+            if profile:
+                profile.disable()
+                entry["cpu_hotspots"] = cpu_hotspots(profile)
+            if self.memory:
+                _, peak = tracemalloc.get_traced_memory()
+                entry["peak_mem_mb"] = round(peak / 2 ** 20, 2)
+                entry["mem_hotspots"] = memory_hotspots(before, tracemalloc.take_snapshot())
+
+    def report(self):
+        total = time.perf_counter() - self.started
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "total_s":      round(total, 3),
+            "stages": {
+                name: {
+                    **self.stages[name],
+                    "seconds": round(self.stages[name]["seconds"], 4),
+                    "share":   round(self.stages[name]["seconds"] / total, 3) if total else 0,
+                }
+                for name in self.order
+            },
+        }
+
+def cpu_hotspots(profile, top=PROFILE_TOP_N):
+    stats = pstats.Stats(profile).stats
+    rows  = sorted(stats.items(), key=lambda kv: kv[1][2], reverse=True)[:top]
+    return [
+        {
+            "function":   f"{os.path.basename(file)}:{line}({func})",
+            "calls":      nc,
+            "own_s":      round(tt, 4),
+            "cumulative_s": round(ct, 4),
+        }
+        for (file, line, func), (cc, nc, tt, ct, callers) in rows
+    ]
+
+def memory_hotspots(before, after, top=PROFILE_TOP_N):
+    return [
+        {
+            "where":     str(stat.traceback[0]),
+            "size_kb":   round(stat.size_diff / 1024, 1),
+            "count":     stat.count_diff,
+        }
+        for stat in after.compare_to(before, "lineno")[:top]
+        if stat.size_diff > 0
+    ]
+
+def profile_stage(name):
+    return PROFILER.stage(name) if PROFILER is not None else NO_PROFILE
+
+def start_profiler(modes):
+    global PROFILER
+    modes    = set(modes.split(",")) if modes else set()
+    PROFILER = StageProfiler(cpu="cpu" in modes, memory="memory" in modes)
+    return PROFILER
+
+def write_profile_report(path=PROFILE_REPORT_FILE):
+    if PROFILER is None:
+        return
+    report = PROFILER.report()
+    if PROFILER.memory:
+        tracemalloc.stop()
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    logger.info(f"Profile ({report['total_s']:.1f}s total) → {path}")
+    for name, entry in report["stages"].items():
+        top = entry.get("cpu_hotspots") or [{}]
+        logger.info(
+            f"  {name:<10} {entry['seconds']:>8.3f}s {entry['share']:>6.1%}"
+            + (f"  peak {entry['peak_mem_mb']:.1f} MB" if "peak_mem_mb" in entry else "")
+            + (f"  top: {top[0]['function']}" if top[0] else "")
+        )
+
+
+# =============================================================================
+#  STEP 28 — DAEMON MODE (--daemon: warm session, adaptive per-board polling)
+# =============================================================================
+# Each board keeps a smoothed rate of new matching postings per hour; its
+# next poll is scheduled when ~target_new_per_poll new postings are
+# expected, clamped to [min, max] interval. Boards without history start
+# at initial_interval. The config file is re-read whenever it changes.
+POLL_STATE_FILE = "poll_state.json"
+POLL_STATE      = {}
+DAEMON_DEFAULTS = {
+    "min_interval_minutes":     5,
+    "max_interval_minutes":     360,
+    "initial_interval_minutes": 60,
+    "target_new_per_poll":      1,
+    "rate_smoothing":           0.3,
+    "checkpoint_minutes":       15,
+    "reload_seconds":           30,
+    "keepalive_seconds":        120,
+    "dns_cache_seconds":        600,
+}
+
+def daemon_settings(config):
+    return {**DAEMON_DEFAULTS, **config.get("daemon", {})}
+
+def load_poll_state():
+    if os.path.exists(POLL_STATE_FILE):
+        try:
+            with open(POLL_STATE_FILE, "r") as f:
+                POLL_STATE.update(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {POLL_STATE_FILE}: {e}")
+
+def save_poll_state():
+    with open(POLL_STATE_FILE, "w") as f:
+        json.dump(POLL_STATE, f, indent=2)
+
+def poll_interval(record, settings):
+    low  = settings["min_interval_minutes"] * 60
+    high = settings["max_interval_minutes"] * 60
+    rate = record.get("rate")
+    if rate is None:
+        return settings["initial_interval_minutes"] * 60
+    if rate <= 0:
+        return high
+    return min(high, max(low, settings["target_new_per_poll"] / rate * 3600))
+
+def record_poll(key, new_count, settings, now=None):
+    now    = now or time.time()
+    record = POLL_STATE.setdefault(key, {"rate": None, "polls": 0, "new": 0})
+    last   = record.get("last_poll")
+
+    # The first poll only sets a baseline — everything looks new to it
+    if last:
+        hours    = max((now - last) / 3600, 1 / 60)
+        observed = new_count / hours
+        alpha    = settings["rate_smoothing"]
+        record["rate"] = (
+            observed if record["rate"] is None
+            else alpha * observed + (1 - alpha) * record["rate"]
+        )
+    record["polls"]    += 1
+    record["new"]      += new_count
+    record["last_poll"] = int(now)
+    record["interval"]  = int(poll_interval(record, settings))
+    record["next_poll"] = int(now) + record["interval"]
+    return record
+
+def board_display(company):
+    return company["display"] if isinstance(company, dict) else company.upper()
+
+class ScraperDaemon:
+    def __init__(self, config_path):
+        self.config_path = config_path
+        self.config      = None
+        self.mtime       = None
+        self.boards      = {}
+        self.pending     = {}
+        self.new_jobs    = []
+        self.accepted    = []
+        self.notifier    = None
+        self.stopping    = asyncio.Event()
+
+    def reload_config(self):
+        try:
+            mtime = os.path.getmtime(self.config_path)
+            if mtime == self.mtime:
+                return False
+            self.mtime = mtime
+            config = load_config(self.config_path)
+            validate_config(config)
+        except (OSError, ValueError, SystemExit) as e:
+            if self.config is None:
+                raise
+            logger.warning(f"Config reload failed, keeping previous config: {e}")
+            return False
+
+        # Host limits and retry settings apply on reload; transport pools and
+        # notification sinks need a restart since they are fixed at startup
+        if self.config is None or config.get("scheduler") != self.config.get("scheduler"):
+            self.scheduler = RequestScheduler(config.get("scheduler", {}))
+        if self.config is None or config.get("retry") != self.config.get("retry"):
+            start_retry_policy(config)
+        RETRY_POLICY.scheduler = self.scheduler
+        load_ranking_corpus(config)
+        self.config   = config
+        self.settings = daemon_settings(config)
+        self.boards   = {
+            board_key(ats, company): (ats, company)
+            for ats in config["ats_sources"]
+            for company in ats["companies"]
+        }
+        logger.info(f"Config loaded: {len(self.boards)} boards")
+        return True
+
+    def dispatch_due(self, session, cache):
+        now       = time.time()
+        in_flight = {key for key, _, _ in self.pending.values()}
+        filters   = self.config["filters"]
+
+        for key, (ats, company) in self.boards.items():
+            record = POLL_STATE.get(key)
+            if key in in_flight or (record and record.get("next_poll", 0) > now):
+                continue
+            if not board_is_due(key):
+                continue
+            tkey = task_key(ats, company)
+            task = self.scheduler.submit(
+                tkey,
+                lambda ats=ats, company=company: fetch_jobs_async(
+                    session, ats, company, filters, cache
+                )
+            )
+            if task not in self.pending:
+                self.pending[task] = (key, tkey, company)
+                in_flight.add(key)
+
+    def complete(self, task, seen_jobs, near_dupes):
+        key, tkey, company = self.pending.pop(task)
+        self.scheduler.forget(tkey)
+        if task.exception() is not None:
+            logger.warning(f"  Error fetching {board_display(company)}: {task.exception()}")
+            new = []
+        else:
+            jobs = task.result() or []
+            if self.notifier:
+                offer_high_scores(self.notifier, self.config, seen_jobs, near_dupes, jobs)
+            new  = unseen_jobs(jobs, seen_jobs)
+            self.accepted.extend(jobs)
+
+        record = record_poll(key, len(new), self.settings)
+        if new:
+            self.new_jobs.extend(new)
+            logger.info(
+                f"  {board_display(company):<30} {len(new)} new "
+                f"(next poll in {record['interval'] // 60} min)"
+            )
+
+    def seconds_until_next_poll(self):
+        now       = time.time()
+        in_flight = {key for key, _, _ in self.pending.values()}
+        polls     = [
+            max(
+                POLL_STATE.get(key, {}).get("next_poll", 0),
+                BOARD_HEALTH.get(key, {}).get("next_check", 0),
+            )
+            for key in self.boards if key not in in_flight
+        ]
+        return max(1.0, min(polls, default=now + 60) - now)
+
+    async def checkpoint(self, seen_jobs, cache, near_dupes):
+        self.new_jobs = rank_jobs(self.new_jobs, self.config.get("preferences"))
+        self.new_jobs = collapse_near_duplicates(self.new_jobs, near_dupes)
+        if self.notifier:
+            await self.notifier.publish(self.new_jobs)
+        if self.new_jobs:
+            organized = organize_jobs(self.new_jobs)
+            print_summary(organized)
+            save_output(organized, self.config.get("output"), append=True)
+            self.new_jobs = []
+        record_job_history(self.config, self.accepted)
+        self.accepted = []
+
+        seen_jobs.save()
+        if near_dupes is not None:
+            near_dupes.save()
+        save_http_cache(cache)
+        save_workday_facets()
+        save_board_health()
+        save_poll_state()
+        save_ranking_corpus()
+        write_prune_report()
+        if self.config.get("location_cache", {}).get("persist", True):
+            save_location_cache()
+        write_metrics(self.config)
+
+    async def run(self):
+        self.reload_config()
+        seen_jobs  = load_seen_jobs(self.config)
+        near_dupes = load_near_duplicates(self.config)
+        load_workday_facets()
+        load_board_health()
+        load_poll_state()
+        if self.config.get("location_cache", {}).get("persist", True):
+            load_location_cache()
+        cache = load_http_cache()
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stopping.set)
+        stop_waiter = asyncio.ensure_future(self.stopping.wait())
+
+        settings   = self.settings
+        session    = Transport({
+            "keepalive_seconds": settings["keepalive_seconds"],
+            "dns_cache_seconds": settings["dns_cache_seconds"],
+            **self.config.get("transport", {}),
+        })
+        await session.warm(warmup_origins(self.boards.values(), session.settings["warmup_hosts"]))
+        last_check = last_reload = time.time()
+        start_metrics(self.config)
+        self.notifier = start_notifier(self.config, seen_jobs)
+        lag_monitor = asyncio.create_task(monitor_loop_lag(METRICS)) if METRICS else None
+        logger.info(f"Daemon started: {len(self.boards)} boards")
+
+        try:
+            while not self.stopping.is_set():
+                now = time.time()
+                if now - last_reload >= self.settings["reload_seconds"]:
+                    last_reload = now
+                    self.reload_config()
+
+                self.dispatch_due(session, cache)
+                timeout = min(
+                    self.seconds_until_next_poll(),
+                    self.settings["reload_seconds"],
+                    max(1.0, last_check + self.settings["checkpoint_minutes"] * 60 - now),
+                )
+                done, _ = await asyncio.wait(
+                    [*self.pending, stop_waiter], timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task in self.pending:
+                        self.complete(task, seen_jobs, near_dupes)
+
+                if time.time() - last_check >= self.settings["checkpoint_minutes"] * 60:
+                    last_check = time.time()
+                    if lag_monitor:
+                        lag_monitor.cancel()
+                    await self.checkpoint(seen_jobs, cache, near_dupes)
+                    start_metrics(self.config)
+                    lag_monitor = (
+                        asyncio.create_task(monitor_loop_lag(METRICS)) if METRICS else None
+                    )
+        finally:
+            logger.info("Daemon stopping — saving state")
+            for task in self.pending:
+                task.cancel()
+            await asyncio.gather(*self.pending, return_exceptions=True)
+            stop_waiter.cancel()
+            if lag_monitor:
+                lag_monitor.cancel()
+            await self.checkpoint(seen_jobs, cache, near_dupes)
+            if self.notifier:
+                await self.notifier.close()
+            save_seen_jobs(seen_jobs)
+            save_near_duplicates(near_dupes)
+            await session.close()
+
+
+# =============================================================================
+#  STEP 29 — SHARDED EXECUTION (multi-process / multi-host)
+# =============================================================================
+# Boards are split into N shards by a stable hash of their board_key, so
+# every host computes the same split. Shard numbers sit in an SQLite lease
+# queue under the shard dir (a shared filesystem for multi-host); workers
+# lease one shard at a time, fetch + filter it, and write shard-NNN.json
+# with the matched jobs plus the cache / health / facet entries they
+# changed. The merge step folds those into the global state and runs the
+# usual dedup → organize → output → notify tail.
+SHARD_DIR           = "shards"
+SHARD_QUEUE_FILE    = "queue.db"
+SHARD_LEASE_SECONDS = 900
+SHARD_MAX_ATTEMPTS  = 3
+
+def shard_of(key, count):
+    return int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], "big") % count
+
+def shard_config(config, index, count):
+    sources = [
+        {**ats, "companies": [
+            c for c in ats["companies"] if shard_of(board_key(ats, c), count) == index
+        ]}
+        for ats in config["ats_sources"]
+    ]
+    return {**config, "ats_sources": sources}
+
+def sharding_settings(config):
+    return {
+        "shards":        8,
+        "lease_seconds": SHARD_LEASE_SECONDS,
+        "dir":           SHARD_DIR,
+        **config.get("sharding", {}),
+    }
+
+class ShardQueue:
+    def __init__(self, path, timeout=30):
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS shards ("
+            " shard INTEGER PRIMARY KEY, total INTEGER NOT NULL,"
+            " state TEXT NOT NULL DEFAULT 'pending', worker TEXT,"
+            " lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    def transaction(self, fn):
+        # BEGIN IMMEDIATE takes the write lock up front so two workers
+        # can't both read the same shard as free
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn()
+            self.conn.execute("COMMIT")
+            return result
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def reset(self, total):
+        def fill():
+            self.conn.execute("DELETE FROM shards")
+            self.conn.executemany(
+                "INSERT INTO shards (shard, total) VALUES (?, ?)",
+                [(i, total) for i in range(total)],
+            )
+        self.transaction(fill)
+
+    def lease(self, worker, lease_seconds):
+        def take():
+            now = time.time()
+            row = self.conn.execute(
+                "SELECT shard, total FROM shards WHERE attempts < ? AND"
+                " (state = 'pending' OR (state = 'leased' AND lease_until < ?))"
+                " ORDER BY attempts, shard LIMIT 1",
+                (SHARD_MAX_ATTEMPTS, now),
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE shards SET state = 'leased', worker = ?,"
+                    " lease_until = ?, attempts = attempts + 1 WHERE shard = ?",
+                    (worker, now + lease_seconds, row[0]),
+                )
+            return row
+        return self.transaction(take)
+
+    def complete(self, shard, worker):
+        self.conn.execute(
+            "UPDATE shards SET state = 'done', lease_until = NULL"
+            " WHERE shard = ? AND worker = ?", (shard, worker),
+        )
+
+    def release(self, shard, worker):
+        self.conn.execute(
+            "UPDATE shards SET state = 'pending', lease_until = NULL"
+            " WHERE shard = ? AND worker = ?", (shard, worker),
+        )
+
+    def remaining(self):
+        # Shards still pending or held by a live lease; ones that have
+        # exhausted their attempts count as given up
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM shards WHERE state != 'done' AND"
+            " (attempts < ? OR (state = 'leased' AND lease_until >= ?))",
+            (SHARD_MAX_ATTEMPTS, time.time()),
+        ).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+def snapshot(state):
+    return json.loads(json.dumps(state))
+
+def changed_entries(before, after):
+    return {k: v for k, v in after.items() if before.get(k) != v}
+
+def shard_path(shard_dir, index):
+    return os.path.join(shard_dir, f"shard-{index:03d}.json")
+
+async def fetch_shard(config, index, count, shard_dir, cache):
+    sub    = shard_config(config, index, count)
+    before = snapshot({
+        "http_cache":     cache["entries"],
+        "board_health":   BOARD_HEALTH,
+        "workday_facets": WORKDAY_FACET_CACHE,
+    })
+    if RANKING_SAMPLE is not None:
+        RANKING_SAMPLE.clear()
+
+    start_metrics(sub)
+    jobs = await run_all_fetches(sub, cache)
+    write_metrics({**sub, "metrics": {
+        **sub.get("metrics", {}),
+        "report_file":     os.path.join(shard_dir, f"run_report-{index:03d}.json"),
+        "prometheus_file": os.path.join(shard_dir, f"metrics-{index:03d}.prom"),
+    }})
+
+    output = {
+        "shard":          index,
+        "shards":         count,
+        "boards":         sum(len(ats["companies"]) for ats in sub["ats_sources"]),
+        "jobs":           jobs,
+        "http_cache":     changed_entries(before["http_cache"], cache["entries"]),
+        "board_health":   changed_entries(before["board_health"], BOARD_HEALTH),
+        "workday_facets": changed_entries(before["workday_facets"], WORKDAY_FACET_CACHE),
+        "ranking_sample": RANKING_SAMPLE or {},
+    }
+    path = shard_path(shard_dir, index)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(output, f)
+    os.replace(f"{path}.tmp", path)
+    logger.info(f"Shard {index}/{count}: {output['boards']} boards → {len(jobs)} jobs")
+
+def run_worker(shard_dir):
+    config = load_config(CONFIG_PATH)
+    validate_config(config)
+    settings = sharding_settings(config)
+    worker   = f"{socket.gethostname()}:{os.getpid()}"
+    queue    = ShardQueue(os.path.join(shard_dir, SHARD_QUEUE_FILE))
+
+    # Global state is read, never written, by workers — the merge step
+    # applies each shard's changed entries
+    load_workday_facets()
+    load_board_health()
+    if config.get("location_cache", {}).get("persist", True):
+        load_location_cache()
+    load_ranking_corpus(config)
+    cache = load_http_cache()
+
+    try:
+        while True:
+            lease = queue.lease(worker, settings["lease_seconds"])
+            if lease is None:
+                if not queue.remaining():
+                    break
+                time.sleep(2)   # others hold the rest; wait in case a lease expires
+                continue
+            index, count = lease
+            try:
+                asyncio.run(fetch_shard(config, index, count, shard_dir, cache))
+            except Exception as e:
+                logger.warning(f"Shard {index}/{count} failed on {worker}: {e}")
+                queue.release(index, worker)
+                continue
+            queue.complete(index, worker)
+    finally:
+        queue.close()
+
+def run_sharded(shards, workers, shard_dir):
+    os.makedirs(shard_dir, exist_ok=True)
+    for name in os.listdir(shard_dir):
+        if name.startswith(("shard-", "run_report-", "metrics-")):
+            os.remove(os.path.join(shard_dir, name))
+
+    queue = ShardQueue(os.path.join(shard_dir, SHARD_QUEUE_FILE))
+    queue.reset(shards)
+    queue.close()
+    logger.info(f"Queued {shards} shards in {shard_dir}; starting {workers} local workers")
+
+    procs = [
+        subprocess.Popen([
+            sys.executable, os.path.abspath(__file__), "--worker", "--shard-dir", shard_dir
+        ])
+        for _ in range(workers)
+    ]
+    failed = sum(1 for p in procs if p.wait() != 0)
+    if failed:
+        logger.warning(f"{failed} worker process(es) exited with an error")
+
+def merge_shards(shard_dir, cache):
+    all_jobs = []
+    merged   = 0
+    expected = None
+    for name in sorted(os.listdir(shard_dir)):
+        if not (name.startswith("shard-") and name.endswith(".json")):
+            continue
+        with open(os.path.join(shard_dir, name), "r") as f:
+            data = json.load(f)
+        all_jobs.extend(data["jobs"])
+        cache["entries"].update(data["http_cache"])
+        BOARD_HEALTH.update(data["board_health"])
+        WORKDAY_FACET_CACHE.update(data["workday_facets"])
+        if RANKING_SAMPLE is not None:
+            RANKING_SAMPLE.update(data.get("ranking_sample", {}))
+        expected = data["shards"]
+        merged  += 1
+
+    if expected is None or merged < expected:
+        logger.warning(f"Merged {merged}/{expected or '?'} shards — some shards are missing")
+    else:
+        logger.info(f"Merged {merged} shards from {shard_dir}")
+    return all_jobs
 
 
 # =============================================================================
 #  MAIN
 # =============================================================================
-async def main_async():
+CONFIG_PATH = "JobScraper/ats_config.json"
+
+async def main_async(shard_dir=None):
     logger.info("Job scraper starting...")
     logger.info(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
 
-    config = load_config("JobScraper/ats_config.json")
-    validate_config(config)
+    with profile_stage("config"):
+        config = load_config(CONFIG_PATH)
+        validate_config(config)
 
-    seen_jobs = load_seen_jobs()
-    logger.info(f"Loaded {len(seen_jobs)} previously seen job hashes")
+        seen_jobs = load_seen_jobs(config)
+        logger.info(f"Loaded {len(seen_jobs)} previously seen job hashes")
+        near_dupes = load_near_duplicates(config)
+        load_ranking_corpus(config)
 
-    start    = time.time()
-    all_jobs = await run_all_fetches(config)
-    elapsed  = time.time() - start
+        load_workday_facets()
+        load_board_health()
+        persist_locations = config.get("location_cache", {}).get("persist", True)
+        if persist_locations:
+            load_location_cache()
+
+        http_cache = load_http_cache()
+        if not shard_dir:
+            start_metrics(config)
+        notifier = start_notifier(config, seen_jobs)
+        on_jobs  = notifier and partial(offer_high_scores, notifier, config, seen_jobs, near_dupes)
+
+    with profile_stage("fetch"):
+        start    = time.time()
+        all_jobs = (
+            merge_shards(shard_dir, http_cache) if shard_dir
+            else await run_all_fetches(config, http_cache, on_jobs)
+        )
+        elapsed  = time.time() - start
     logger.info(f"Fetched {len(all_jobs)} total jobs in {elapsed:.1f}s")
+    if not shard_dir:
+        log_http_cache_stats(http_cache)
+        write_metrics(config)
 
-    preferences = config.get("preferences")
-    if preferences:
-        all_jobs = [score_job(j, preferences) for j in all_jobs]
+    ranking = config.get("ranking", {})
+    with profile_stage("rank"):
+        all_jobs = rank_jobs(all_jobs, config.get("preferences"))
 
-    new_jobs = filter_new_jobs(all_jobs, seen_jobs)
+    with profile_stage("dedup"):
+        new_jobs = filter_new_jobs(all_jobs, seen_jobs)
+        new_jobs = collapse_near_duplicates(new_jobs, near_dupes)
 
-    organized = organize_jobs(new_jobs)
+    with profile_stage("organize"):
+        # top_k only trims the console listing: every new job is already
+        # marked seen, so the output and summary keep all of them
+        organized = organize_jobs(new_jobs)
+        top_k     = ranking.get("top_k")
+        shown     = organize_jobs(new_jobs, top_k) if top_k else organized
 
-    print_results(organized)
-    print_summary(organized)
+    with profile_stage("output"):
+        print_results(shown)
+        print_summary(organized)
 
-    save_seen_jobs(seen_jobs)
-    save_output(organized)
+        seen_jobs.save()
+        save_near_duplicates(near_dupes)
+        save_http_cache(http_cache)
+        save_workday_facets()
+        save_board_health()
+        save_ranking_corpus()
+        write_prune_report()
+        if persist_locations:
+            save_location_cache()
+        save_output(organized, config.get("output"))
+        record_job_history(config, all_jobs)
 
-    send_email_notification(new_jobs, config)
+    with profile_stage("notify"):
+        if notifier:
+            await notifier.publish(new_jobs)
+            await notifier.close()
+    save_seen_jobs(seen_jobs)
 
+    write_profile_report()
     logger.info("Done!")
 
 def main():
+    parser = argparse.ArgumentParser(description="ATS job scraper")
+    parser.add_argument(
+        "--profile", nargs="?", const="timers", metavar="cpu,memory",
+        help="time each pipeline stage and write profile_report.json; "
+             "add cpu (cProfile) and/or memory (tracemalloc) hotspots per stage",
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="keep running: one warm session, per-board adaptive polling, "
+             "config hot-reload (see the \"daemon\" config block)",
+    )
+    parser.add_argument(
+        "--shards", type=int, nargs="?", const=0, metavar="N",
+        help="split boards into N shards (default from the \"sharding\" config "
+             "block), fetch them in worker processes, then merge",
+    )
+    parser.add_argument("--workers", type=int, help="local worker processes for --shards")
+    parser.add_argument(
+        "--worker", action="store_true",
+        help="join an existing shard queue (e.g. from another host on a shared filesystem)",
+    )
+    parser.add_argument("--merge", action="store_true", help="only merge finished shards")
+    parser.add_argument("--shard-dir", help=f"shard queue / output directory (default {SHARD_DIR})")
+
+    commands = parser.add_subparsers(dest="command")
+    query    = commands.add_parser("query", help="search the job history database")
+    query.add_argument("text", nargs="*", help="title words, e.g. kafka backend")
+    query.add_argument("--company")
+    query.add_argument("--ats")
+    query.add_argument("--category", choices=CATEGORIES)
+    query.add_argument("--state", help="full state name, Remote or \"Other USA\"")
+    query.add_argument("--days", type=int, help="only postings from the last N days")
+    query.add_argument("--limit", type=int, default=50)
+    query.add_argument("--db", help=f"history database (default from config, else {JOB_HISTORY_DB})")
+    query.add_argument("--json", action="store_true", help="print one JSON object per line")
+
+    args = parser.parse_args()
+    if args.command == "query":
+        run_query(args)
+        return
+    if args.daemon:
+        asyncio.run(ScraperDaemon(CONFIG_PATH).run())
+        return
+    if args.profile:
+        start_profiler(args.profile)
+
+    if args.worker or args.merge or args.shards is not None:
+        settings  = sharding_settings(load_config(CONFIG_PATH))
+        shard_dir = args.shard_dir or settings["dir"]
+        if args.worker:
+            run_worker(shard_dir)
+            return
+        if not args.merge:
+            shards  = args.shards or settings["shards"]
+            workers = args.workers or min(shards, os.cpu_count() or 1)
+            with profile_stage("shards"):
+                run_sharded(shards, workers, shard_dir)
+        asyncio.run(main_async(shard_dir))
+        return
     asyncio.run(main_async())
 
 if __name__ == "__main__":
@@ -1,8 +1,16 @@
 import requests
+import aiohttp
+import argparse
+import asyncio
 import json
+import os
+import random
+import re
 import time
 from datetime import datetime
-from urllib.parse import quote
+from functools import lru_cache
+from html import unescape
+from urllib.parse import quote, unquote
 
 # ─────────────────────────────────────────
 #  CLOSED ATS COMPANIES CONFIG
@@ -76,28 +84,32 @@ KEYWORDS = ["java", "software engineer", "backend", "python", "spring boot", "fu
 #  Uses Google's public search with site: operator
 # ─────────────────────────────────────────
 
+GOOGLE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+
+def google_time_filter(days_back=1):
+    # tbs=qdr:d = past day, qdr:w = past week
+    return "qdr:d" if days_back <= 1 else f"qdr:d{days_back}"
+
+def google_search_url(site, keyword, days_back=1):
+    query = f'site:{site} "{keyword}" software engineer OR java OR python OR backend'
+    return (
+        f"https://www.google.com/search?q={quote(query)}"
+        f"&tbs={google_time_filter(days_back)}&num=10"
+    )
+
 def google_search_jobs(company_name, site, keyword, days_back=1):
     """
     Search Google for: site:[company_site] [keyword] java
     Filters to past N days using Google's date filter
     """
-    # Build Google search URL
-    query = f'site:{site} "{keyword}" software engineer OR java OR python OR backend'
-    encoded = quote(query)
-    
-    # tbs=qdr:d = past day, qdr:w = past week
-    time_filter = "qdr:d" if days_back <= 1 else f"qdr:d{days_back}"
-    
-    url = f"https://www.google.com/search?q={encoded}&tbs={time_filter}&num=10"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-    }
-    
+    url = google_search_url(site, keyword, days_back)
+
     try:
-        r = requests.get(url, headers=headers, timeout=15)
+        r = requests.get(url, headers=GOOGLE_HEADERS, timeout=15)
         if r.status_code == 200:
             # Parse job links from Google results
             results = parse_google_results(r.text, site, company_name)
@@ -109,42 +121,277 @@ def google_search_jobs(company_name, site, keyword, days_back=1):
     except Exception as e:
         return []
 
-def parse_google_results(html, site, company_name):
+GOOGLE_RESULT_LIMIT = 5
+
+# Only the tags that matter are tokenised and script/style bodies are
+# skipped whole. Google serves lowercase markup, so matching stays
+# case-sensitive and the scans keep the regex engine's literal fast path
+GOOGLE_TAG   = re.compile(r"<(/?)(a|h3|script|style)(?=[\s>])([^>]*)>")
+GOOGLE_HREF  = re.compile(r"""\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+GOOGLE_INNER = re.compile(r"<[^>]*>")
+
+@lru_cache(maxsize=256)
+def site_url_pattern(site):
+    return re.compile(r"https?://" + re.escape(site.replace("www.", "")))
+
+def result_url(attrs, pattern):
+    # Cheap reject first: most anchors on the page never mention the site
+    if not pattern.search(attrs):
+        return ""
+    m = GOOGLE_HREF.search(attrs)
+    if not m:
+        return ""
+    href = m.group(1) or m.group(2) or m.group(3)
+    if "&" in href:
+        href = unescape(href)
+    # Older result markup links through /url?q=<target>&sa=...
+    if href.startswith("/url?"):
+        query = dict(p.partition("=")[::2] for p in href[5:].split("&"))
+        return unquote(query.get("q", ""))
+    return href
+
+class GoogleResultParser:
+    """
+    One pass over a results page, pairing each result link with its own
+    heading — <a><h3>title</h3></a> (current) or <h3><a>title</a></h3>
+    (legacy) — and stopping once `limit` results have their titles.
+    """
+
+    def __init__(self, site, limit=GOOGLE_RESULT_LIMIT):
+        self.pattern  = site_url_pattern(site)
+        self.limit    = limit
+        self.results  = {}      # url → title (None until its heading is seen)
+        self.anchor   = None    # url of the result <a> currently open
+        self.h3_depth = 0
+        self.h3_text  = []
+        self.h3_link  = None    # result <a> opened inside the current <h3>
+
+    @property
+    def done(self):
+        return (
+            len(self.results) >= self.limit
+            and self.anchor is None and not self.h3_depth
+        )
+
+    def parse(self, html):
+        pos = 0
+        while not self.done:
+            m = GOOGLE_TAG.search(html, pos)
+            if not m:
+                break
+            if self.h3_depth:
+                self.h3_text.append(html[pos:m.start()])
+            closing, tag, attrs = m.groups()
+            pos = m.end()
+            if tag in ("script", "style"):
+                if not closing:
+                    end = html.find(f"</{tag}", pos)
+                    pos = len(html) if end < 0 else end
+            elif closing:
+                self.end_tag(tag)
+            else:
+                self.start_tag(tag, attrs)
+        return self.results
+
+    def start_tag(self, tag, attrs):
+        if tag == "h3":
+            self.h3_depth += 1
+            if self.h3_depth == 1:
+                self.h3_text = []
+                self.h3_link = None
+            return
+        url = result_url(attrs, self.pattern)
+        if not self.pattern.match(url):
+            self.anchor = None
+            return
+        if url not in self.results:
+            if len(self.results) >= self.limit:
+                self.anchor = None
+                return
+            self.results[url] = None
+        # A repeat link (thumbnail, sitelink) may still carry the heading
+        self.anchor = url if self.results[url] is None else None
+        if self.h3_depth:
+            self.h3_link = self.anchor
+
+    def end_tag(self, tag):
+        if tag == "a":
+            self.anchor = None
+        elif self.h3_depth:
+            self.h3_depth -= 1
+            if self.h3_depth:
+                return
+            url = self.anchor or self.h3_link
+            if url and self.results.get(url) is None:
+                text = "".join(self.h3_text)
+                if "<" in text:
+                    text = GOOGLE_INNER.sub("", text)
+                if "&" in text:
+                    text = unescape(text)
+                self.results[url] = " ".join(text.split()) or None
+
+def parse_google_results(html, site, company_name, limit=GOOGLE_RESULT_LIMIT):
     """Extract job URLs and titles from Google search HTML"""
-    from html.parser import HTMLParser
-    
-    results = []
-    lines = html.split('\n')
-    
-    # Simple extraction — look for href links pointing to the target site
-    import re
-    
-    # Find all URLs in the page that match our site
-    url_pattern = re.compile(r'href="(https?://' + re.escape(site.replace('www.','')) + r'[^"]*)"')
-    title_pattern = re.compile(r'<h3[^>]*>([^<]+)</h3>')
-    
-    urls   = url_pattern.findall(html)
-    titles = title_pattern.findall(html)
-    
-    seen = set()
-    for i, url in enumerate(urls[:5]):  # top 5 results
-        if url in seen:
-            continue
-        seen.add(url)
-        title = titles[i] if i < len(titles) else "Job Opening"
-        # Clean HTML entities
-        title = title.replace('&#39;', "'").replace('&amp;', '&').replace('&quot;', '"')
-        results.append({
-            "title":     title,
+    results = GoogleResultParser(site, limit).parse(html)
+
+    return [
+        {
+            "title":     title or "Job Opening",
             "company":   company_name,
             "ats":       "Manual Search",
             "location":  "USA (verify on site)",
             "posted_at": "Within last 24h (Google filtered)",
             "apply_url": url,
             "note":      "⚠️ Verify posting date on company site"
-        })
-    
-    return results
+        }
+        for url, title in results.items()
+    ]
+
+# ─────────────────────────────────────────
+#  ASYNC GOOGLE RUNNER
+#  Every (company, site, keyword) search runs
+#  concurrently behind one token bucket; a 429
+#  pauses only the Google queue, and results
+#  are cached on disk per (site, keyword, window)
+# ─────────────────────────────────────────
+
+GOOGLE_CACHE_FILE      = "google_search_cache.json"
+GOOGLE_CACHE_TTL_HOURS = 20
+GOOGLE_RATE            = 0.2    # requests / second
+GOOGLE_BURST           = 2
+GOOGLE_CONCURRENCY     = 4
+GOOGLE_MAX_ATTEMPTS    = 3
+GOOGLE_BACKOFF_SECONDS = 60
+
+class GoogleRateLimiter:
+    """Token bucket shared by every search, plus a global pause for 429s"""
+
+    def __init__(self, rate=GOOGLE_RATE, burst=GOOGLE_BURST):
+        self.rate         = rate
+        self.capacity     = max(1.0, float(burst))
+        self.tokens       = self.capacity
+        self.updated      = time.monotonic()
+        self.paused_until = 0.0
+        self.lock         = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def backoff(self, seconds):
+        # Later requests wait it out; cache hits and parsing carry on
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens       = 0
+
+def google_cache_key(site, keyword, days_back):
+    return f"{site}|{keyword}|{google_time_filter(days_back)}"
+
+def load_google_cache(path=GOOGLE_CACHE_FILE, ttl_hours=GOOGLE_CACHE_TTL_HOURS):
+    """Load cached searches, dropping anything older than the TTL"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    cutoff = time.time() - ttl_hours * 3600
+    return {k: v for k, v in cache.items() if v.get("fetched_at", 0) >= cutoff}
+
+def save_google_cache(cache, path=GOOGLE_CACHE_FILE):
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(cache, f)
+    os.replace(f"{path}.tmp", path)
+
+def retry_after_seconds(r, attempt):
+    try:
+        return max(1.0, float(r.headers.get("Retry-After", "")))
+    except ValueError:
+        return GOOGLE_BACKOFF_SECONDS * 2 ** attempt * (0.5 + random.random() / 2)
+
+async def google_search_async(session, limiter, cache, stats, company_name, site,
+                              keyword, days_back=1):
+    """One cached, rate-limited Google search; returns parsed results"""
+    key = google_cache_key(site, keyword, days_back)
+    if key in cache:
+        stats["cached"] += 1
+        return cache[key]["results"]
+
+    url = google_search_url(site, keyword, days_back)
+    for attempt in range(GOOGLE_MAX_ATTEMPTS):
+        await limiter.acquire()
+        try:
+            async with session.get(
+                url, headers=GOOGLE_HEADERS, timeout=aiohttp.ClientTimeout(total=15)
+            ) as r:
+                if r.status == 429:
+                    stats["rate_limited"] += 1
+                    wait = retry_after_seconds(r, attempt)
+                    print(f"      ⚠️  Google rate limited — pausing searches {wait:.0f}s")
+                    limiter.backoff(wait)
+                    continue
+                if r.status != 200:
+                    stats["failed"] += 1
+                    return []
+                html = await r.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            continue
+
+        stats["fetched"] += 1
+        results    = parse_google_results(html, site, company_name)
+        cache[key] = {"fetched_at": time.time(), "results": results}
+        return results
+
+    stats["failed"] += 1
+    return []
+
+async def run_google_searches(companies=None, keywords=None, days_back=1,
+                              rate=GOOGLE_RATE, burst=GOOGLE_BURST,
+                              concurrency=GOOGLE_CONCURRENCY,
+                              cache_path=GOOGLE_CACHE_FILE,
+                              cache_ttl_hours=GOOGLE_CACHE_TTL_HOURS):
+    """
+    Search every (company, site, keyword) in CLOSED_ATS_COMPANIES × KEYWORDS
+    Returns de-duplicated results and per-run counters
+    """
+    companies = companies or CLOSED_ATS_COMPANIES
+    keywords  = keywords or KEYWORDS
+    cache     = load_google_cache(cache_path, cache_ttl_hours)
+    limiter   = GoogleRateLimiter(rate, burst)
+    stats     = {"searches": 0, "cached": 0, "fetched": 0, "rate_limited": 0, "failed": 0}
+    combos    = [
+        (company["name"], company["site"], keyword)
+        for entries in companies.values()
+        for company in entries
+        for keyword in keywords
+    ]
+    stats["searches"] = len(combos)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        batches = await asyncio.gather(*[
+            google_search_async(session, limiter, cache, stats, name, site, keyword, days_back)
+            for name, site, keyword in combos
+        ])
+    save_google_cache(cache, cache_path)
+
+    results, seen = [], set()
+    for batch in batches:
+        for job in batch:
+            if job["apply_url"] not in seen:
+                seen.add(job["apply_url"])
+                results.append(job)
+    return results, stats
 
 # ─────────────────────────────────────────
 #  DIRECT CAREER PAGE LINKS
@@ -361,7 +608,49 @@ def generate_google_search_urls(days=1):
 # ─────────────────────────────────────────
 #  PRINT & SAVE
 # ─────────────────────────────────────────
+def run_search(args):
+    print("\n" + "═"*70)
+    print("  🔍  GOOGLE SEARCH RUNNER  —  Closed ATS Companies")
+    print(f"  ⏰  {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    print("═"*70)
+
+    started = time.time()
+    results, stats = asyncio.run(run_google_searches(
+        days_back=args.days, rate=args.rate, concurrency=args.concurrency,
+        cache_ttl_hours=args.cache_ttl,
+    ))
+
+    for i, job in enumerate(results, 1):
+        print(f"\n  {i}. 🏢 {job['company']}  —  {job['title']}")
+        print(f"     🔗 {job['apply_url']}")
+
+    with open("manual_search_results.json", "w") as f:
+        json.dump({
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "stats":        stats,
+            "results":      results,
+        }, f, indent=2)
+
+    print(f"\n\n  📊  {stats['searches']} searches in {time.time() - started:.0f}s  |  "
+          f"{stats['cached']} cached  |  {stats['fetched']} fetched  |  "
+          f"{stats['rate_limited']} rate limited  |  {stats['failed']} failed")
+    print(f"  💾  Saved → manual_search_results.json  ({len(results)} results)")
+    print("═"*70 + "\n")
+
 def main():
+    parser = argparse.ArgumentParser(description="Manual search helper for closed-ATS companies")
+    parser.add_argument("--search", action="store_true",
+                        help="run the Google site: searches instead of printing links")
+    parser.add_argument("--days", type=int, default=1, help="Google date window in days")
+    parser.add_argument("--rate", type=float, default=GOOGLE_RATE, help="Google requests per second")
+    parser.add_argument("--concurrency", type=int, default=GOOGLE_CONCURRENCY)
+    parser.add_argument("--cache-ttl", type=float, default=GOOGLE_CACHE_TTL_HOURS,
+                        help="hours a cached search stays fresh")
+    args = parser.parse_args()
+    if args.search:
+        run_search(args)
+        return
+
     print("\n" + "═"*70)
     print("  🔍  MANUAL SEARCH HELPER  —  Closed ATS Companies")
     print(f"  ⏰  {datetime.now().strftime('%Y-%m-%d %H:%M')}")